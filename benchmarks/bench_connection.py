@@ -0,0 +1,270 @@
+"""
+Throughput and latency benchmarks for the connection path.
+
+Runs against an in-process echo server and writes results as JSON so
+runs can be compared between versions:
+
+    python -m benchmarks.bench_connection -o bench.json
+    python -m benchmarks.bench_connection --compare bench.json
+"""
+import argparse
+import json
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from src.core.app_logic import AppLogic
+from src.core.fingerprint import identify
+from src.core.framing import StreamReceiver, RawFramer
+from src.utils.network import (RouteCache, SynAckSniffer, get_default_gateway,
+                               get_remote_ttl, is_gateway)
+
+
+class EchoServer:
+    """Threaded TCP echo server bound to an ephemeral loopback port"""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._echo, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _echo(conn):
+        buf = bytearray(65536)
+        with conn:
+            while True:
+                try:
+                    n = conn.recv_into(buf)
+                except OSError:
+                    return
+                if not n:
+                    return
+                conn.sendall(memoryview(buf)[:n])
+
+    def close(self):
+        self.sock.close()
+
+
+def summarize(samples: list, unit: str = 'ms') -> dict:
+    """Reduce timing samples (seconds) to percentile statistics"""
+    ordered = sorted(samples)
+    scale = 1000.0 if unit == 'ms' else 1e6
+
+    def pct(p):
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[index] * scale
+
+    return {
+        'unit': unit,
+        'n': len(ordered),
+        'mean': sum(ordered) / len(ordered) * scale,
+        'p50': pct(50),
+        'p90': pct(90),
+        'p99': pct(99),
+        'max': ordered[-1] * scale,
+    }
+
+
+def bench_connect(port: int, iterations: int) -> dict:
+    logic = AppLogic()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = logic.connect('127.0.0.1', str(port))
+        samples.append(time.perf_counter() - start)
+        assert result['status'] == 'connected', result
+        logic.disconnect()
+    return summarize(samples)
+
+
+def bench_round_trip(port: int, iterations: int) -> dict:
+    logic = AppLogic()
+    logic.connect('127.0.0.1', str(port))
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        result = logic.send_message(f'ping {i}')
+        samples.append(time.perf_counter() - start)
+        assert 'response' in result, result
+    logic.disconnect()
+    return summarize(samples)
+
+
+def bench_throughput(port: int, messages: int, size: int) -> dict:
+    """Pipelined sends on one connection, echoes counted by a StreamReceiver"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    total = messages * size
+    received = [0]
+    done = threading.Event()
+
+    def on_message(chunk):
+        received[0] += len(chunk)
+        if received[0] >= total:
+            done.set()
+
+    receiver = StreamReceiver(sock, RawFramer(), on_message)
+    receiver.start()
+    payload = memoryview(b'x' * size)
+    start = time.perf_counter()
+    for _ in range(messages):
+        sock.sendall(payload)
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    receiver.stop()
+    sock.close()
+
+    return {
+        'unit': 'per_s',
+        'messages': messages,
+        'message_size': size,
+        'messages_per_s': messages / elapsed,
+        'bytes_per_s': received[0] / elapsed,
+        'complete': received[0] >= total,
+    }
+
+
+def bench_lookup(func, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, unit='us')
+
+
+def run_benchmarks(iterations: int = 200, throughput_messages: int = 20000,
+                   message_size: int = 128) -> dict:
+    """Run every benchmark and return a JSON-serialisable report"""
+    server = EchoServer()
+    try:
+        results = {
+            'connect_latency': bench_connect(server.port, iterations),
+            'round_trip_latency': bench_round_trip(server.port, iterations),
+            'throughput': bench_throughput(server.port, throughput_messages, message_size),
+        }
+
+        # Fingerprint of an established socket: the captured SYN-ACK where
+        # raw sockets are permitted, TCP_INFO otherwise
+        sniffer = SynAckSniffer.open()
+        probe = socket.create_connection(('127.0.0.1', server.port))
+        results['fingerprint_lookup'] = bench_lookup(lambda: identify(probe, sniffer), iterations)
+        probe.close()
+        if sniffer:
+            sniffer.close()
+
+        results['remote_ttl_lookup'] = bench_lookup(
+            lambda: get_remote_ttl('127.0.0.1', server.port), max(1, iterations // 10))
+    finally:
+        server.close()
+
+    results['gateway_lookup'] = bench_lookup(get_default_gateway, iterations)
+    results['is_gateway'] = bench_lookup(lambda: is_gateway('127.0.0.1'), iterations)
+    results['route_table_refresh'] = bench_lookup(
+        lambda: RouteCache(watch=False).default_gateway(), max(1, iterations // 10))
+
+    return {'meta': _metadata(), 'results': results}
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, timeout=2).stdout.strip()
+    except Exception:
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'commit': commit or None,
+    }
+
+
+# For each result: (metric, True if higher is better)
+_COMPARED = {
+    'connect_latency': ('p50', False),
+    'round_trip_latency': ('p50', False),
+    'throughput': ('messages_per_s', True),
+    'fingerprint_lookup': ('p50', False),
+    'remote_ttl_lookup': ('p50', False),
+    'gateway_lookup': ('p50', False),
+    'is_gateway': ('p50', False),
+    'route_table_refresh': ('p50', False),
+}
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Compare two reports. Returns a list of dicts with 'name', 'metric',
+    'baseline', 'current', 'change' and 'regression' keys.
+    """
+    rows = []
+    for name, (metric, higher_is_better) in _COMPARED.items():
+        old = baseline['results'].get(name, {}).get(metric)
+        new = current['results'].get(name, {}).get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        rows.append({
+            'name': name,
+            'metric': metric,
+            'baseline': old,
+            'current': new,
+            'change': change,
+            'regression': worse > threshold,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='LinxTap connection path benchmarks')
+    parser.add_argument('-o', '--output', help='write the JSON report to this file')
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--messages', type=int, default=20000,
+                        help='messages sent for the throughput benchmark')
+    parser.add_argument('--size', type=int, default=128, help='message size in bytes')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='compare against a previous report; exit 1 on regression')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown counted as a regression (default 0.25)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.iterations, args.messages, args.size)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.threshold)
+        for row in rows:
+            flag = 'REGRESSION' if row['regression'] else 'ok'
+            print(f"{row['name']:<22} {row['metric']:<15} {row['baseline']:>12.2f} -> "
+                  f"{row['current']:>12.2f} ({row['change']:+.1%}) {flag}", file=sys.stderr)
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
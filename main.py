@@ -1,14 +1,32 @@
+import time
+
+# Taken before the Qt imports, which dominate startup
+_STARTED = time.perf_counter()
+
+import os
 import sys
+from PySide6.QtCore import QTimer
 from PySide6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 
+# Set to print "startup_ms=<n>" once the window is up, then exit
+STARTUP_PROBE_ENV = 'LINXTAP_STARTUP_PROBE'
+
 
 def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    if os.environ.get(STARTUP_PROBE_ENV):
+        # First event-loop pass: the window has been shown and laid out
+        QTimer.singleShot(0, lambda: _report_startup(app))
     sys.exit(app.exec())
 
 
+def _report_startup(app):
+    print(f"startup_ms={(time.perf_counter() - _STARTED) * 1000:.1f}", flush=True)
+    app.quit()
+
+
 if __name__ == "__main__":
     main()
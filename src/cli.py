@@ -0,0 +1,350 @@
+"""
+Headless command-line interface.
+
+Drives AppLogic and the network utilities directly and prints JSON, so
+single checks from scripts or cron jobs skip Qt entirely. Nothing in this
+module (or what it imports) may import PySide6.
+"""
+import argparse
+import json
+import socket
+import sys
+
+from src.core.app_logic import AppLogic
+from src.core.metrics import get_metrics
+from src.core.payload import PAYLOAD_FORMATS, decode_escapes, parse_payload
+from src.core.profiles import PROFILES, load_profiles
+from src.utils.interfaces import get_inventory
+from src.utils.network import get_hostname, get_local_ip, get_route_cache
+
+
+class _Output:
+    """Writes records as NDJSON lines, or collects them into one JSON document"""
+
+    def __init__(self, fmt: str, stream=None):
+        self.fmt = fmt
+        self.stream = stream or sys.stdout
+        self._records = []
+
+    def emit(self, record: dict):
+        if self.fmt == 'ndjson':
+            self.stream.write(json.dumps(record) + '\n')
+            self.stream.flush()
+        else:
+            self._records.append(record)
+
+    def close(self, single: bool = False):
+        if self.fmt == 'json':
+            document = self._records[0] if single and len(self._records) == 1 else self._records
+            self.stream.write(json.dumps(document, indent=2) + '\n')
+
+
+def _cmd_connect(args, out: _Output) -> int:
+    messages = args.message or []
+    if args.payload_format != 'text':
+        try:
+            messages = [parse_payload(message, args.payload_format) for message in messages]
+        except ValueError as e:
+            out.emit({'status': 'error', 'message': f'Error: {e}', 'step': 'send'})
+            return 1
+
+    logic = AppLogic()
+    # The first message goes out with the connect (in the SYN with a fastopen profile)
+    result = logic.connect(args.ip, args.port, args.profile,
+                           first_payload=messages[0] if messages else None)
+    first = result.pop('send', None)
+    out.emit(dict(result, step='connect'))
+    if result['status'] != 'connected':
+        return 1
+
+    def sends():
+        if first is not None:
+            yield first
+        for message in messages[1:]:
+            yield logic.send_message(message)
+        for path in args.file or []:
+            yield logic.send_file(path)
+
+    exit_code = 0
+    for sent in sends():
+        if isinstance(sent.get('response'), bytes):
+            # JSON has no bytes: binary responses are reported in hex
+            sent['response'] = sent['response'].hex()
+        out.emit(dict(sent, step='send'))
+        if sent['status'] != 'success':
+            exit_code = 1
+            break
+
+    if logic.connected:
+        out.emit(dict(logic.disconnect(), step='disconnect'))
+    return exit_code
+
+
+def _cmd_scan(args, out: _Output) -> int:
+    # Imported lazily so 'connect' and 'info' don't pay for asyncio
+    from src.core.scanner import PortScanner
+
+    scanner = PortScanner(concurrency=args.concurrency, timeout=args.timeout,
+                          per_host_rate=args.rate)
+
+    def emit(result):
+        if not args.open_only or result['status'] == 'open':
+            out.emit(result)
+
+    try:
+        scanner.run(args.targets, args.ports, callback=emit)
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    return 0
+
+
+def _cmd_ping(args, out: _Output) -> int:
+    from src.core.scanner import expand_targets
+    from src.utils.icmp import IcmpPinger
+
+    try:
+        hosts = expand_targets(args.targets)
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    pinger = IcmpPinger.open()
+    if pinger is None:
+        out.emit({'status': 'error',
+                  'message': 'Error: ICMP sockets not permitted (see net.ipv4.ping_group_range)'})
+        return 2
+
+    alive = 0
+    with pinger:
+        for result in pinger.ping_many(hosts, timeout=args.timeout, rate=args.rate):
+            alive += result['status'] == 'alive'
+            if not args.alive_only or result['status'] == 'alive':
+                out.emit(result)
+    return 0 if alive else 1
+
+
+def _cmd_load(args, out: _Output) -> int:
+    import asyncio
+    from src.core.loadgen import LoadGenerator
+
+    try:
+        generator = LoadGenerator(
+            args.ip, args.port,
+            payload_template=decode_escapes(args.payload),
+            rate=args.rate, byte_rate=args.byte_rate, connections=args.connections,
+            duration=args.duration, framer=None if args.no_replies else 'newline',
+            on_progress=out.emit if args.progress else None, progress_interval=1.0,
+            profile=args.profile)
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    try:
+        result = asyncio.run(generator.run())
+    except KeyboardInterrupt:
+        result = dict(generator.snapshot(), status='stopped')
+    out.emit(result)
+    return 0 if result['sent'] and not result['errors'] else 1
+
+
+def _cmd_monitor(args, out: _Output) -> int:
+    import asyncio
+    from src.core.monitor import HealthMonitor
+
+    try:
+        monitor = HealthMonitor(
+            interval=args.interval, timeout=args.timeout, mode=args.mode,
+            payload=decode_escapes(args.payload),
+            concurrency=args.concurrency, fall=args.fall, rise=args.rise,
+            on_event=lambda event, info: out.emit(dict(info, event=event)))
+        monitor.add_targets(args.targets, args.ports)
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    try:
+        result = asyncio.run(monitor.run(duration=args.duration or None))
+    except KeyboardInterrupt:
+        result = dict(monitor.summary(), status='stopped')
+    if args.report:
+        for info in monitor.snapshot():
+            out.emit(info)
+    out.emit(result)
+    return 0 if not result['down'] else 1
+
+
+def _cmd_trace(args, out: _Output) -> int:
+    from src.utils.traceroute import traceroute
+
+    try:
+        result = traceroute(args.host, protocol=args.protocol, port=args.port,
+                            max_hops=args.max_hops, probes=args.queries, timeout=args.timeout,
+                            first_ttl=args.first_ttl)
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    if result['status'] == 'error':
+        out.emit(result)
+        return 2
+    for hop in result.pop('hops'):
+        out.emit(hop)
+    out.emit(result)
+    return 0 if result['reached'] else 1
+
+
+def _cmd_info(args, out: _Output) -> int:
+    routes = get_route_cache()
+    out.emit({
+        'hostname': get_hostname(),
+        'local_ip': get_local_ip(),
+        'gateway': routes.default_gateway(),
+        'local_ipv6': get_local_ip(socket.AF_INET6),
+        'gateway_ipv6': routes.default_gateway(socket.AF_INET6),
+    })
+    return 0
+
+
+def _cmd_interfaces(args, out: _Output) -> int:
+    inventory = get_inventory()
+    families = {socket.AF_INET: 'inet', socket.AF_INET6: 'inet6'}
+    for iface in inventory.interfaces():
+        for address in iface['addresses']:
+            address['family'] = families.get(address['family'], address['family'])
+        out.emit(iface)
+    for destination in args.source_for or []:
+        out.emit({'destination': destination, 'source': inventory.source_address(destination)})
+    return 0
+
+
+def _cmd_profiles(args, out: _Output) -> int:
+    try:
+        profiles = load_profiles()
+    except ValueError as e:
+        out.emit({'status': 'error', 'message': f'Error: {str(e)}'})
+        return 2
+    for name, profile in profiles.items():
+        out.emit(dict(name=name, description=profile.description, **profile.to_dict()))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='linxtap-cli',
+        description='LinxTap headless TCP connectivity checks (JSON output)')
+    parser.add_argument('--format', choices=('json', 'ndjson'), default='ndjson',
+                        help='output format (default: ndjson, one record per line)')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='collect phase timings/counters and write them to PATH '
+                             'in Prometheus text format on exit')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    connect = sub.add_parser('connect', help='connect to IP:PORT, optionally send messages')
+    connect.add_argument('ip')
+    connect.add_argument('port')
+    connect.add_argument('-m', '--message', action='append',
+                         help='message to send after connecting (repeatable)')
+    connect.add_argument('--payload-format', choices=PAYLOAD_FORMATS, default='text',
+                         help='how --message is encoded; binary responses are printed in hex')
+    connect.add_argument('-f', '--file', action='append',
+                         help='send a file after the messages (repeatable)')
+    connect.add_argument('--profile', default='default',
+                         help=f"connection profile ({', '.join(PROFILES)} or one from "
+                              f"profiles.json; see 'profiles')")
+    connect.set_defaults(func=_cmd_connect)
+
+    scan = sub.add_parser('scan', help='scan CIDR ranges and port lists')
+    scan.add_argument('targets', help="IPs or CIDR ranges, e.g. '192.168.1.0/24,10.0.0.5'")
+    scan.add_argument('-p', '--ports', required=True, help="e.g. '22,80,8000-8010'")
+    scan.add_argument('-c', '--concurrency', type=int, default=256)
+    scan.add_argument('-t', '--timeout', type=float, default=1.0)
+    scan.add_argument('-r', '--rate', type=float, default=None,
+                      help='max connection attempts per second per host')
+    scan.add_argument('--open-only', action='store_true',
+                      help='only report open ports')
+    scan.set_defaults(func=_cmd_scan)
+
+    ping = sub.add_parser('ping', help='ICMP echo many hosts in parallel')
+    ping.add_argument('targets', help="IPs or CIDR ranges, e.g. '192.168.1.0/24,10.0.0.5'")
+    ping.add_argument('-t', '--timeout', type=float, default=1.0)
+    ping.add_argument('-r', '--rate', type=float, default=None,
+                      help='max echo requests per second')
+    ping.add_argument('--alive-only', action='store_true',
+                      help='only report hosts that replied')
+    ping.set_defaults(func=_cmd_ping)
+
+    load = sub.add_parser('load', help='send at a sustained rate and report throughput/latency')
+    load.add_argument('ip')
+    load.add_argument('port')
+    load.add_argument('--payload', default='ping {seq}\\n',
+                      help="payload template; {seq} is a sequence number (default: 'ping {seq}\\n')")
+    load.add_argument('-r', '--rate', type=float, default=100.0, help='messages per second')
+    load.add_argument('-b', '--byte-rate', type=float, default=None,
+                      help='bytes per second (overrides --rate)')
+    load.add_argument('-c', '--connections', type=int, default=1)
+    load.add_argument('-d', '--duration', type=float, default=10.0, help='seconds')
+    load.add_argument('--no-replies', action='store_true',
+                      help="don't read newline-framed replies or measure latency")
+    load.add_argument('--progress', action='store_true',
+                      help='emit a progress record every second')
+    load.add_argument('--profile', default=None,
+                      help="connection profile for source binding, socket options and "
+                           "TCP Fast Open (see 'profiles'; default: none)")
+    load.set_defaults(func=_cmd_load)
+
+    monitor = sub.add_parser('monitor',
+                             help='probe targets on an interval and report up/down changes')
+    monitor.add_argument('targets', help="IPs, CIDR ranges or host names, e.g. '10.0.0.0/24,db1'")
+    monitor.add_argument('-p', '--ports', required=True, help="e.g. '22,80,8000-8010'")
+    monitor.add_argument('-i', '--interval', type=float, default=5.0, help='seconds between probes')
+    monitor.add_argument('-t', '--timeout', type=float, default=1.0)
+    monitor.add_argument('--mode', choices=('connect', 'echo'), default='connect',
+                         help='time the handshake, or send --payload and time the reply')
+    monitor.add_argument('--payload', default='\\n', help="echo payload (default: '\\n')")
+    monitor.add_argument('-c', '--concurrency', type=int, default=512)
+    monitor.add_argument('--fall', type=int, default=2, help='failures before a target is down')
+    monitor.add_argument('--rise', type=int, default=1, help='successes before a target is up')
+    monitor.add_argument('-d', '--duration', type=float, default=0.0,
+                         help='seconds to run (default: until interrupted)')
+    monitor.add_argument('--report', action='store_true',
+                         help="emit every target's state and RTT statistics at the end")
+    monitor.set_defaults(func=_cmd_monitor)
+
+    trace = sub.add_parser('trace', help='discover the path to a host, probing all hops at once')
+    trace.add_argument('host')
+    trace.add_argument('-P', '--protocol', choices=('udp', 'icmp', 'tcp'), default='udp',
+                       help='probe type; tcp needs CAP_NET_RAW (default: udp)')
+    trace.add_argument('-p', '--port', type=int, default=None,
+                       help='destination port (default: 33434 for udp, 80 for tcp)')
+    trace.add_argument('-m', '--max-hops', type=int, default=30)
+    trace.add_argument('-f', '--first-ttl', type=int, default=1)
+    trace.add_argument('-q', '--queries', type=int, default=3, help='probes per hop')
+    trace.add_argument('-t', '--timeout', type=float, default=2.0,
+                       help='seconds to wait for replies')
+    trace.set_defaults(func=_cmd_trace)
+
+    info = sub.add_parser('info', help='show local hostname, IP and default gateway')
+    info.set_defaults(func=_cmd_info)
+
+    interfaces = sub.add_parser('interfaces', help='list interfaces, addresses, MTUs and link state')
+    interfaces.add_argument('--source-for', metavar='IP', action='append',
+                            help='also show the source address used to reach IP (repeatable)')
+    interfaces.set_defaults(func=_cmd_interfaces)
+
+    profiles = sub.add_parser('profiles', help='list connection profiles and their socket options')
+    profiles.set_defaults(func=_cmd_profiles)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    out = _Output(args.format)
+    if args.metrics_file:
+        get_metrics().enabled = True
+    exit_code = args.func(args, out)
+    out.close(single=args.command == 'info')
+    if args.metrics_file:
+        get_metrics().write_textfile(args.metrics_file)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
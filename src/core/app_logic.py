@@ -1,72 +1,196 @@
+import errno
+import os
 import socket
-from src.utils.network import get_remote_ttl, detect_os_from_ttl, is_gateway
+import time
+from src.core.fingerprint import identify
+from src.core.framing import StreamReceiver, make_framer
+from src.core.metrics import get_metrics
+from src.core.profiles import PROFILES, get_profile
+from src.utils.network import (SynAckSniffer, fastopen_connect, happy_eyeballs_connect,
+                               is_gateway, resolve_addresses)
+
+
+def validate_target(ip: str, port: str):
+    """
+    Validate an IP address and port as entered by the user.
+    Returns (port_number, None) on success or (None, error_dict) on failure.
+    """
+    if not ip or not port:
+        return None, {
+            'status': 'error',
+            'message': 'Error: IP address and port are required'
+        }
+
+    # Validate port is a number
+    try:
+        port_num = int(port)
+        if port_num < 1 or port_num > 65535:
+            return None, {
+                'status': 'error',
+                'message': 'Error: Port must be between 1 and 65535'
+            }
+    except ValueError:
+        return None, {
+            'status': 'error',
+            'message': 'Error: Port must be a valid number'
+        }
+
+    return port_num, None
 
 
 class AppLogic:
-    def __init__(self):
+    def __init__(self, pool=None, metrics=None, host_cache=None, profile=None):
+        self.pool = pool
+        # Known hosts skip TTL/OS probing and are refreshed in the background
+        self.host_cache = host_cache
+        # Phase timings and traffic counters (a no-op unless enabled)
+        self.metrics = metrics if metrics is not None else get_metrics()
+        # Socket tuning and timeouts; connect() may switch to another profile
+        try:
+            self.profile = get_profile(profile)
+        except ValueError:
+            if profile is not None:
+                raise
+            # A broken profiles.json is reported when a profile is picked, not here
+            self.profile = PROFILES['default']
         self.connected = False
         self.socket = None
         self.current_ip = None
         self.current_port = None
         self.remote_os = None
         self.is_gateway_device = False
+        self.receiver = None
+        # Bytes of the first message already sent with the SYN (TCP Fast Open)
+        self._early_sent = None
+        # Reused by every synchronous response read (recv_into, no per-call allocation)
+        self._recv_buffer = memoryview(bytearray(65536))
 
-    def connect(self, ip: str, port: str) -> dict:
+    def connect(self, ip: str, port: str, profile=None, first_payload=None) -> dict:
         """
         Attempt to connect to the specified IP and port.
+        profile is a connection profile name or ConnectionProfile (see
+        src.core.profiles); None keeps the current one.
+        first_payload, if given, is sent (as by send_message) as soon as the
+        connection is up, in the SYN when the profile has fastopen; its
+        result is returned under 'send'.
         Returns a dict with 'status' and 'message' keys.
         """
         # If already connected, disconnect
         if self.connected:
             return self._disconnect()
 
-        # Validate inputs
-        if not ip or not port:
+        self._early_sent = None
+        result = self._connect(ip, port, profile, first_payload)
+        if first_payload is not None and result['status'] == 'connected':
+            result['send'] = self._send_first(first_payload)
+        return result
+
+    def _connect(self, ip: str, port: str, profile, first_payload) -> dict:
+        port_num, error = validate_target(ip, port)
+        if error:
+            return error
+
+        try:
+            profile = get_profile(profile if profile is not None else self.profile)
+        except ValueError as e:
             return {
                 'status': 'error',
-                'message': 'Error: IP address and port are required'
+                'message': f'Error: {str(e)}'
             }
 
-        # Validate port is a number
-        try:
-            port_num = int(port)
-            if port_num < 1 or port_num > 65535:
+        metrics = self.metrics
+        target = {'target': f'{ip}:{port_num}'}
+        started = time.perf_counter()
+
+        # Reuse a warm pooled connection: no handshake, no OS probing
+        if self.pool:
+            with metrics.span('connect.pool', **target):
+                pooled = self.pool.acquire(ip, port_num, profile.name)
+            if pooled:
+                self.socket, metadata = pooled
+                self.profile = profile
+                profile.tune(self.socket)
+                self.connected = True
+                self.current_ip = ip
+                self.current_port = port_num
+                self.remote_os = metadata.get('remote_os', 'Unknown')
+                self.is_gateway_device = metadata.get('is_gateway', False)
+                metrics.inc('connections', result='reused', **target)
+                metrics.observe('connect', time.perf_counter() - started, **target)
                 return {
-                    'status': 'error',
-                    'message': 'Error: Port must be between 1 and 65535'
+                    'status': 'connected',
+                    'message': f'Connected to {ip}:{port_num} (reused)',
+                    'remote_os': self.remote_os,
+                    'is_gateway': self.is_gateway_device,
+                    'profile': profile.name,
+                    'reused': True
                 }
-        except ValueError:
-            return {
-                'status': 'error',
-                'message': 'Error: Port must be a valid number'
-            }
+
+        cached = self.host_cache.get(ip) if self.host_cache else None
+
+        # Capture the SYN-ACK for OS detection (None without CAP_NET_RAW);
+        # not needed when the host's fingerprint is already cached
+        sniffer = None if cached else SynAckSniffer.open()
 
         # Attempt connection
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(5)  # 5 second timeout
-            self.socket.connect((ip, port_num))
+            with metrics.span('connect.resolve', **target):
+                addresses = profile.filter_addresses(resolve_addresses(ip, port_num))
+            if not addresses:
+                raise OSError(errno.EADDRNOTAVAIL,
+                              f'No address of {ip} matches bind address {profile.bind_address}')
+            # Dual-stack hosts: race IPv6/IPv4 and keep whichever answers first
+            with metrics.span('connect.handshake', **target):
+                handshake_started = time.perf_counter()
+                if profile.fastopen and first_payload:
+                    # Payload first: it can ride in the SYN (no address racing then)
+                    self.socket, self._early_sent = fastopen_connect(
+                        addresses, self._as_buffer(first_payload)[0],
+                        timeout=profile.connect_timeout, prepare=profile.prepare)
+                else:
+                    self.socket = happy_eyeballs_connect(addresses, timeout=profile.connect_timeout,
+                                                         prepare=profile.prepare)
+            rtt_ms = (time.perf_counter() - handshake_started) * 1000.0
+            profile.tune(self.socket)
 
+            self.profile = profile
             self.connected = True
             self.current_ip = ip
             self.current_port = port_num
 
-            # Detect remote device information
-            self.is_gateway_device = is_gateway(ip)
+            # Always live: an O(1) lookup kept current by netlink route events.
+            # Checked against the peer address, since ip may be a host name
+            with metrics.span('connect.gateway', **target):
+                self.is_gateway_device = is_gateway(self.socket.getpeername()[0])
 
-            # Try to detect OS via TTL
-            ttl = get_remote_ttl(ip, port_num, timeout=2.0)
-            if ttl:
-                self.remote_os = detect_os_from_ttl(ttl)
+            if cached:
+                # Show what we know now; refresh old results off the hot path
+                self.remote_os = cached['remote_os'] or 'Unknown'
+                self.host_cache.touch(ip, rtt_ms)
+                if cached['stale']:
+                    self.host_cache.refresh_async(ip, port_num)
             else:
-                self.remote_os = 'Unknown'
+                # Fingerprint the OS from the SYN-ACK of the established socket
+                with metrics.span('connect.fingerprint', **target):
+                    fingerprint = identify(self.socket, sniffer)
+                self.remote_os = fingerprint['remote_os']
+                os_guesses = fingerprint['guesses']
+                if self.host_cache:
+                    self.host_cache.put(ip, fingerprint['ttl'], self.remote_os, rtt_ms)
 
-            return {
+            metrics.inc('connections', result='connected', **target)
+            result = {
                 'status': 'connected',
                 'message': f'Connected to {ip}:{port_num}',
                 'remote_os': self.remote_os,
-                'is_gateway': self.is_gateway_device
+                'is_gateway': self.is_gateway_device,
+                'profile': profile.name
             }
+            if cached:
+                result['cached'] = True
+            else:
+                result['os_guesses'] = os_guesses
+            return result
         except socket.timeout:
             self._cleanup_socket()
             return {
@@ -97,9 +221,33 @@ class AppLogic:
                 'status': 'error',
                 'message': f'Error: Unexpected error - {str(e)}'
             }
+        finally:
+            if sniffer:
+                sniffer.close()
+            if not self.connected:
+                metrics.inc('connections', result='error', **target)
+            metrics.observe('connect', time.perf_counter() - started, **target)
+
+    def disconnect(self) -> dict:
+        """
+        Disconnect from the current device, if any.
+        Returns a dict with 'status' and 'message' keys.
+        """
+        return self._disconnect()
 
     def _disconnect(self) -> dict:
         """Disconnect from current connection"""
+        if self.pool and self.connected and self.socket:
+            # The reader hit EOF, an error or a broken frame: the stream is not reusable
+            reusable = not (self.receiver and self.receiver.closed_reason)
+            self.stop_receiving()
+            if reusable:
+                # Park the socket in the pool instead of closing it
+                self.pool.release(self.current_ip, self.current_port, self.socket, {
+                    'remote_os': self.remote_os,
+                    'is_gateway': self.is_gateway_device,
+                }, tag=self.profile.name)
+                self.socket = None
         self._cleanup_socket()
         self.connected = False
 
@@ -114,8 +262,42 @@ class AppLogic:
             'message': f'Disconnected from {old_connection}'
         }
 
+    def start_receiving(self, on_message, framer=None, on_closed=None) -> bool:
+        """
+        Start a background reader for the current connection.
+        Complete messages (split by framer, raw chunks by default) are passed
+        to on_message(bytes) as they arrive, on the reader thread.
+        While receiving, send_message no longer waits for a response.
+        Returns False if not connected.
+        """
+        if not self.connected or not self.socket:
+            return False
+        self.stop_receiving()
+        if framer is None:
+            framer = make_framer('raw')
+        metrics = self.metrics
+        target = self._target_labels()
+
+        def deliver(message: bytes):
+            metrics.inc('messages_received', **target)
+            metrics.inc('bytes_received', len(message), **target)
+            on_message(message)
+
+        after_read = self.profile.rearm if self.profile.quickack else None
+        self.receiver = StreamReceiver(self.socket, framer, deliver, on_closed,
+                                       after_read=after_read)
+        self.receiver.start()
+        return True
+
+    def stop_receiving(self):
+        """Stop the background reader, if any"""
+        if self.receiver:
+            self.receiver.stop()
+            self.receiver = None
+
     def _cleanup_socket(self):
         """Clean up socket connection"""
+        self.stop_receiving()
         if self.socket:
             try:
                 self.socket.close()
@@ -123,9 +305,12 @@ class AppLogic:
                 pass
             self.socket = None
 
-    def send_message(self, message: str) -> dict:
+    def send_message(self, message) -> dict:
         """
         Send a message via TCP to the connected device.
+        message is a str (sent as UTF-8) or any bytes-like object, which is
+        sent straight from its buffer. A response to a bytes message is
+        returned as bytes, otherwise as text.
         Returns a dict with 'status', 'message', and optionally 'response' keys.
         """
         if not self.connected or not self.socket:
@@ -140,38 +325,113 @@ class AppLogic:
                 'message': 'Message cannot be empty'
             }
 
+        payload, binary = self._as_buffer(message)
+
+        def transmit():
+            self.socket.sendall(payload)
+            return len(payload)
+
+        return self._send(transmit, 'send.sendall', binary)
+
+    @staticmethod
+    def _as_buffer(message):
+        """Return (memoryview of the bytes to send, True if message was binary)"""
+        binary = not isinstance(message, str)
+        # memoryview: sendall works on the caller's buffer without copying it
+        payload = memoryview(message).cast('B') if binary else memoryview(message.encode('utf-8'))
+        return payload, binary
+
+    def _send_first(self, message) -> dict:
+        """Send connect()'s first_payload, minus what already went out with the SYN"""
+        early, self._early_sent = self._early_sent, None
+        if early is None:
+            return self.send_message(message)
+        payload, binary = self._as_buffer(message)
+
+        def transmit():
+            if early < len(payload):
+                self.socket.sendall(payload[early:])
+            return len(payload)
+
+        return self._send(transmit, 'send.fastopen', binary)
+
+    def send_file(self, path: str) -> dict:
+        """
+        Send a file's contents with socket.sendfile (zero-copy where the
+        platform supports it). A response is returned as bytes.
+        Returns a dict like send_message().
+        """
+        if not self.connected or not self.socket:
+            return {
+                'status': 'error',
+                'message': 'Not connected to any device'
+            }
+
+        try:
+            payload_file = open(path, 'rb')
+        except OSError as e:
+            return {
+                'status': 'error',
+                'message': f'Error: Cannot read {path}: {e.strerror or str(e)}'
+            }
+        with payload_file:
+            if not os.fstat(payload_file.fileno()).st_size:
+                return {
+                    'status': 'error',
+                    'message': 'Message cannot be empty'
+                }
+            return self._send(lambda: self.socket.sendfile(payload_file), 'send.sendfile', True)
+
+    def _send(self, transmit, span: str, binary: bool) -> dict:
+        """Run transmit() (returns the byte count) and collect any response"""
+        target = self._target_labels()
         try:
-            # Encode and send the message
-            message_bytes = message.encode('utf-8')
-            self.socket.sendall(message_bytes)
+            with self.metrics.span(span, **target):
+                sent = transmit()
+            self.metrics.inc('messages_sent', **target)
+            self.metrics.inc('bytes_sent', sent, **target)
+
+            # Responses are delivered by the background reader
+            if self.receiver and self.receiver.running:
+                return {
+                    'status': 'success',
+                    'message': f'Sent {sent} bytes',
+                    'bytes_sent': sent
+                }
 
             # Try to receive a response (with short timeout)
-            self.socket.settimeout(1.0)
+            self.socket.settimeout(self.profile.response_wait)
             try:
-                response = self.socket.recv(4096)
-                if response:
-                    response_text = response.decode('utf-8', errors='replace')
+                started = time.perf_counter()
+                n = self.socket.recv_into(self._recv_buffer)
+                self.profile.rearm(self.socket)
+                if n:
+                    self.metrics.observe('send.first_byte', time.perf_counter() - started, **target)
+                    self.metrics.inc('messages_received', **target)
+                    self.metrics.inc('bytes_received', n, **target)
+                    response = self._recv_buffer[:n]
                     return {
                         'status': 'success',
-                        'message': f'Sent {len(message_bytes)} bytes',
-                        'bytes_sent': len(message_bytes),
-                        'response': response_text
+                        'message': f'Sent {sent} bytes',
+                        'bytes_sent': sent,
+                        'response': bytes(response) if binary else str(response, 'utf-8', 'replace')
                     }
                 else:
                     return {
                         'status': 'success',
-                        'message': f'Sent {len(message_bytes)} bytes (no response)',
-                        'bytes_sent': len(message_bytes)
+                        'message': f'Sent {sent} bytes (no response)',
+                        'bytes_sent': sent
                     }
             except socket.timeout:
                 # No response received, but message was sent
                 return {
                     'status': 'success',
-                    'message': f'Sent {len(message_bytes)} bytes (no response)',
-                    'bytes_sent': len(message_bytes)
+                    'message': f'Sent {sent} bytes (no response)',
+                    'bytes_sent': sent
                 }
 
         except BrokenPipeError:
+            self.metrics.inc('errors', op='send', **target)
             self._cleanup_socket()
             self.connected = False
             return {
@@ -179,6 +439,7 @@ class AppLogic:
                 'message': 'Connection broken - device disconnected'
             }
         except ConnectionResetError:
+            self.metrics.inc('errors', op='send', **target)
             self._cleanup_socket()
             self.connected = False
             return {
@@ -186,18 +447,23 @@ class AppLogic:
                 'message': 'Connection reset by remote device'
             }
         except Exception as e:
+            self.metrics.inc('errors', op='send', **target)
             return {
                 'status': 'error',
                 'message': f'Failed to send: {str(e)}'
             }
         finally:
-            # Restore original timeout
+            # Restore the profile's read timeout
             if self.socket:
                 try:
-                    self.socket.settimeout(5.0)
+                    self.socket.settimeout(self.profile.read_timeout)
                 except:
                     pass
 
+    def _target_labels(self) -> dict:
+        """Metric labels identifying the current connection"""
+        return {'target': f'{self.current_ip}:{self.current_port}'}
+
     def __del__(self):
         """Cleanup when object is destroyed"""
         self._cleanup_socket()
@@ -0,0 +1,246 @@
+"""Non-blocking connection engine built on asyncio streams"""
+import asyncio
+import socket
+import threading
+
+from src.core.app_logic import validate_target
+from src.core.fingerprint import identify
+from src.utils.network import HAPPY_EYEBALLS_DELAY, SynAckSniffer, is_gateway
+
+
+class AsyncAppLogic:
+    """
+    Coroutine-based equivalent of AppLogic.
+
+    Every method returns the same result dicts as AppLogic, but no call
+    blocks the event loop, so one process can hold hundreds of sessions
+    (one AsyncAppLogic each) without a thread per socket.
+    """
+
+    def __init__(self, connect_timeout: float = 5.0, response_timeout: float = 1.0):
+        self.connected = False
+        self.reader = None
+        self.writer = None
+        self.current_ip = None
+        self.current_port = None
+        self.remote_os = None
+        self.is_gateway_device = False
+        self.connect_timeout = connect_timeout
+        self.response_timeout = response_timeout
+
+    async def connect(self, ip: str, port: str) -> dict:
+        """
+        Attempt to connect to the specified IP and port.
+        Returns a dict with 'status' and 'message' keys.
+        """
+        # If already connected, disconnect
+        if self.connected:
+            return await self.disconnect()
+
+        port_num, error = validate_target(ip, port)
+        if error:
+            return error
+
+        # Capture the SYN-ACK for OS detection (None without CAP_NET_RAW)
+        sniffer = SynAckSniffer.open()
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(ip, port_num,
+                                        happy_eyeballs_delay=HAPPY_EYEBALLS_DELAY),
+                timeout=self.connect_timeout)
+            # Reuse the established socket; the sniffer read never blocks
+            fingerprint = identify(self.writer.get_extra_info('socket'), sniffer)
+        except asyncio.TimeoutError:
+            await self._cleanup_stream()
+            return {
+                'status': 'error',
+                'message': f'Error: Connection timeout to {ip}:{port_num}'
+            }
+        except socket.gaierror:
+            await self._cleanup_stream()
+            return {
+                'status': 'error',
+                'message': f'Error: Invalid IP address {ip}'
+            }
+        except ConnectionRefusedError:
+            await self._cleanup_stream()
+            return {
+                'status': 'error',
+                'message': f'Error: Connection refused by {ip}:{port_num}'
+            }
+        except OSError as e:
+            await self._cleanup_stream()
+            return {
+                'status': 'error',
+                'message': f'Error: {str(e)}'
+            }
+        except Exception as e:
+            await self._cleanup_stream()
+            return {
+                'status': 'error',
+                'message': f'Error: Unexpected error - {str(e)}'
+            }
+        finally:
+            if sniffer:
+                sniffer.close()
+
+        self.connected = True
+        self.current_ip = ip
+        self.current_port = port_num
+
+        # Served from the route cache, cheap enough to call on the loop;
+        # the peer address, since ip may be a host name
+        self.is_gateway_device = is_gateway(self.writer.get_extra_info('peername')[0])
+
+        self.remote_os = fingerprint['remote_os']
+
+        return {
+            'status': 'connected',
+            'message': f'Connected to {ip}:{port_num}',
+            'remote_os': self.remote_os,
+            'is_gateway': self.is_gateway_device
+        }
+
+    async def disconnect(self) -> dict:
+        """Disconnect from current connection"""
+        await self._cleanup_stream()
+        self.connected = False
+
+        old_connection = f"{self.current_ip}:{self.current_port}" if self.current_ip else "server"
+        self.current_ip = None
+        self.current_port = None
+        self.remote_os = None
+        self.is_gateway_device = False
+
+        return {
+            'status': 'disconnected',
+            'message': f'Disconnected from {old_connection}'
+        }
+
+    async def _cleanup_stream(self):
+        """Close the stream writer, if any"""
+        if self.writer:
+            try:
+                self.writer.close()
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+
+    async def send_message(self, message: str) -> dict:
+        """
+        Send a message via TCP to the connected device.
+        Returns a dict with 'status', 'message', and optionally 'response' keys.
+        """
+        if not self.connected or not self.writer:
+            return {
+                'status': 'error',
+                'message': 'Not connected to any device'
+            }
+
+        if not message:
+            return {
+                'status': 'error',
+                'message': 'Message cannot be empty'
+            }
+
+        message_bytes = message.encode('utf-8')
+        try:
+            self.writer.write(message_bytes)
+            await self.writer.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            await self._cleanup_stream()
+            self.connected = False
+            return {
+                'status': 'error',
+                'message': ('Connection broken - device disconnected'
+                            if isinstance(e, BrokenPipeError)
+                            else 'Connection reset by remote device')
+            }
+        except Exception as e:
+            return {
+                'status': 'error',
+                'message': f'Failed to send: {str(e)}'
+            }
+
+        response = await self.recv(self.response_timeout)
+        if response:
+            return {
+                'status': 'success',
+                'message': f'Sent {len(message_bytes)} bytes',
+                'bytes_sent': len(message_bytes),
+                'response': response.decode('utf-8', errors='replace')
+            }
+        return {
+            'status': 'success',
+            'message': f'Sent {len(message_bytes)} bytes (no response)',
+            'bytes_sent': len(message_bytes)
+        }
+
+    async def recv(self, timeout: float, max_bytes: int = 4096) -> bytes:
+        """
+        Wait up to timeout seconds for data from the device.
+        Returns the bytes read, or b'' on timeout, EOF or error.
+        """
+        if not self.reader:
+            return b''
+        try:
+            return await asyncio.wait_for(self.reader.read(max_bytes), timeout=timeout)
+        except (asyncio.TimeoutError, OSError):
+            return b''
+
+
+class EventLoopThread:
+    """
+    Runs an asyncio event loop on a daemon thread.
+
+    Lets synchronous code (such as the Qt GUI thread) schedule coroutines
+    and receive their results through callbacks, without running asyncio
+    on the calling thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name='linxtap-asyncio', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, callback=None):
+        """
+        Schedule a coroutine on the loop.
+        callback(result) is invoked when it completes; exceptions and
+        cancellation are converted to an error result dict.
+        Returns a concurrent.futures.Future.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if callback is not None:
+            def _done(fut):
+                # CancelledError is a BaseException: check before result()
+                if fut.cancelled():
+                    callback({
+                        'status': 'error',
+                        'message': 'Error: Operation cancelled'
+                    })
+                    return
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    result = {
+                        'status': 'error',
+                        'message': f'Error: Unexpected error - {str(e)}'
+                    }
+                callback(result)
+            future.add_done_callback(_done)
+        return future
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the loop and wait for the thread to exit"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,300 @@
+"""
+Passive OS fingerprinting from a connection's SYN-ACK.
+
+Features come from the SynAckSniffer capture when raw sockets are
+permitted (remote TTL, window, option layout, MSS, window scale) and
+otherwise from the kernel's TCP_INFO for the connected socket (negotiated
+options, window scale, MSS). They are scored against a signature table
+modelled on p0f's SYN+ACK signatures.
+"""
+import socket
+import struct
+from typing import Optional
+
+# TCP option kinds, as letters in a layout string such as "M,S,T,N,W"
+_OPTION_LETTERS = {0: 'E', 1: 'N', 2: 'M', 3: 'W', 4: 'S', 5: 'K', 8: 'T'}
+
+# linux/tcp.h: tcp_info.tcpi_options bits
+TCPI_OPT_TIMESTAMPS = 1
+TCPI_OPT_SACK = 2
+TCPI_OPT_WSCALE = 4
+
+# Relative weight of each feature in a signature match
+WEIGHTS = {
+    'initial_ttl': 3,
+    'layout': 4,
+    'window': 3,
+    'wscale': 2,
+    'timestamps': 1,
+    'sack': 1,
+    'mss': 1,
+}
+_WEIGHT_TOTAL = sum(WEIGHTS.values())
+
+# Credit for a feature the signature leaves open, and for one that falls in
+# a signature's range rather than equalling its exact value
+_UNSPECIFIED_CREDIT = 0.5
+_RANGE_CREDIT = 0.75
+
+# (os, initial TTL, window, window scale, option layout, mss)
+# window is an int, 'mss*N' or None; wscale an int or a range (Linux sizes
+# it from tcp_rmem); None anywhere matches anything.
+# Generic TTL-only entries come first so thin evidence falls back to them.
+SIGNATURES = (
+    ('Linux/Unix', 64, None, None, None, None),
+    ('Windows', 128, None, None, None, None),
+    ('Cisco/Network Device', 255, None, None, None, None),
+    ('Linux 3.x+', 64, None, range(7, 15), 'M,S,T,N,W', None),
+    ('Linux 3.x+', 64, 'mss*10', None, 'M,S,T,N,W', None),
+    ('Linux 2.6', 64, 'mss*4', None, 'M,S,T,N,W', None),
+    ('Linux (no timestamps)', 64, None, range(7, 15), 'M,N,N,S,N,W', None),
+    ('Windows 7+', 128, 8192, 8, 'M,N,W,S,T', None),
+    ('Windows 7+', 128, 8192, 8, 'M,N,W,N,N,S', None),
+    ('Windows Server 2016+', 128, 65535, 8, 'M,N,W,N,N,S', None),
+    ('Windows XP', 128, 64240, None, 'M,N,N,S', None),
+    ('macOS/iOS', 64, 65535, 6, 'M,N,W,N,N,T,S,E', None),
+    ('macOS/iOS', 64, 65535, 5, 'M,N,W,N,N,T,S,E', None),
+    ('FreeBSD', 64, 65535, 6, 'M,N,W,S,T', None),
+    ('OpenBSD', 64, 16384, 3, 'M,N,N,S,N,W,N,N,T', None),
+    ('Juniper JunOS', 64, 16384, 0, 'M,N,W,N,N,T', None),
+    ('Solaris', 255, None, None, 'N,N,T,M,N,W,N,N,S', None),
+    ('Cisco IOS', 255, 4128, None, 'M', None),
+    ('Embedded TCP/IP stack', 255, None, None, 'M', None),
+    ('Embedded TCP/IP stack', 64, None, None, 'M', 536),
+)
+
+
+def initial_ttl(ttl: int) -> int:
+    """Round an observed TTL up to the nearest common initial TTL"""
+    for candidate in (32, 64, 128, 255):
+        if ttl <= candidate:
+            return candidate
+    return 255
+
+
+def parse_options(data: bytes) -> list:
+    """Split raw TCP options into a list of (kind, payload bytes)"""
+    options = []
+    i = 0
+    while i < len(data):
+        kind = data[i]
+        if kind == 0:
+            options.append((0, b''))
+            break
+        if kind == 1:
+            options.append((1, b''))
+            i += 1
+            continue
+        if i + 1 >= len(data) or data[i + 1] < 2:
+            break
+        length = data[i + 1]
+        options.append((kind, bytes(data[i + 2:i + length])))
+        i += length
+    return options
+
+
+def synack_features(synack: dict) -> dict:
+    """Features of a SynAckSniffer.synack_for() capture"""
+    options = parse_options(synack['options'])
+    features = {
+        'source': 'synack',
+        'ttl': synack['ttl'],
+        'initial_ttl': initial_ttl(synack['ttl']),
+        'hops': initial_ttl(synack['ttl']) - synack['ttl'],
+        'df': synack['df'],
+        'window': synack['window'],
+        'layout': ','.join(_OPTION_LETTERS.get(kind, f'?{kind}') for kind, _ in options),
+        'timestamps': False,
+        'sack': False,
+        'wscale': None,
+        'mss': None,
+    }
+    for kind, payload in options:
+        if kind == 2 and len(payload) == 2:
+            features['mss'] = struct.unpack('!H', payload)[0]
+        elif kind == 3 and len(payload) == 1:
+            features['wscale'] = payload[0]
+        elif kind == 4:
+            features['sack'] = True
+        elif kind == 8:
+            features['timestamps'] = True
+    return features
+
+
+def tcp_info_features(sock) -> Optional[dict]:
+    """
+    Features the kernel negotiated for a connected socket (Linux TCP_INFO).
+    No remote TTL, window or option order: those need the raw capture.
+    """
+    if not hasattr(socket, 'TCP_INFO'):
+        return None
+    try:
+        info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 24)
+    except OSError:
+        return None
+    if len(info) < 20:
+        return None
+    options = info[5]
+    snd_mss = struct.unpack_from('I', info, 16)[0]
+    timestamps = bool(options & TCPI_OPT_TIMESTAMPS)
+    return {
+        'source': 'tcp_info',
+        'timestamps': timestamps,
+        'sack': bool(options & TCPI_OPT_SACK),
+        'wscale': info[6] & 0x0F if options & TCPI_OPT_WSCALE else None,
+        # snd_mss has the timestamp option's 12 bytes taken off already
+        'mss': snd_mss + 12 if timestamps else snd_mss,
+    }
+
+
+class FingerprintEngine:
+    """
+    Scores observed features against a compiled signature table.
+
+    Signatures are indexed by initial TTL and by option layout, so only
+    plausible candidates are scored. A feature the signature does not
+    specify counts as half a match and one inside a range (Linux window
+    scale) as three quarters. The confidence is the weighted share of
+    observed features that match, scaled down by how much of the full
+    feature set was observed: TCP_INFO alone, with no TTL, window or
+    option layout, cannot be as sure as a SYN-ACK capture.
+    """
+
+    def __init__(self, signatures=SIGNATURES):
+        self.signatures = []
+        self._by_ttl = {}
+        self._by_layout = {}
+        for index, (os_name, ittl, window, wscale, layout, mss) in enumerate(signatures):
+            sig = {
+                'os': os_name,
+                'initial_ttl': ittl,
+                'window': _compile_window(window),
+                'wscale': wscale,
+                'layout': layout,
+                'timestamps': None if layout is None else 'T' in layout.split(','),
+                'sack': None if layout is None else 'S' in layout.split(','),
+                'mss': mss,
+            }
+            self.signatures.append(sig)
+            self._by_ttl.setdefault(ittl, []).append(index)
+            self._by_layout.setdefault(layout, []).append(index)
+
+    def candidates(self, features: dict) -> list:
+        """Indexes of signatures worth scoring for features"""
+        ittl = features.get('initial_ttl')
+        layout = features.get('layout')
+        if ittl is None and layout is None:
+            return range(len(self.signatures))
+        indexes = set(self._by_ttl.get(None, ())) | set(self._by_layout.get(None, ()))
+        indexes.update(self._by_ttl.get(ittl, ()))
+        indexes.update(self._by_layout.get(layout, ()))
+        return sorted(indexes)
+
+    def match(self, features: dict, limit: int = 3) -> list:
+        """
+        Rank OS guesses for features.
+        Returns up to limit dicts with 'os', 'confidence' (0-1) and the
+        names of the 'matched' features, best first, one per OS.
+        """
+        observed = [name for name in WEIGHTS if features.get(name) is not None]
+        total = sum(WEIGHTS[name] for name in observed)
+        if not total:
+            return []
+        coverage = 0.5 + 0.5 * total / _WEIGHT_TOTAL
+
+        guesses = []
+        for index in self.candidates(features):
+            sig = self.signatures[index]
+            score = 0.0
+            matched = []
+            for name in observed:
+                expected = sig[name]
+                if expected is None:
+                    score += WEIGHTS[name] * _UNSPECIFIED_CREDIT
+                elif _feature_matches(name, expected, features):
+                    credit = _RANGE_CREDIT if isinstance(expected, range) else 1.0
+                    score += WEIGHTS[name] * credit
+                    matched.append(name)
+            guesses.append({'os': sig['os'],
+                            'confidence': round(score / total * coverage, 3),
+                            'matched': matched})
+
+        guesses.sort(key=lambda g: -g['confidence'])
+        ranked = []
+        seen = set()
+        for guess in guesses:
+            if guess['os'] not in seen:
+                seen.add(guess['os'])
+                ranked.append(guess)
+                if len(ranked) == limit:
+                    break
+        return ranked
+
+
+def _compile_window(window):
+    if isinstance(window, str) and window.startswith('mss*'):
+        return ('mss', int(window[4:]))
+    return window
+
+
+def _feature_matches(name: str, expected, features: dict) -> bool:
+    if name == 'window' and isinstance(expected, tuple):
+        mss = features.get('mss')
+        return bool(mss) and features['window'] == mss * expected[1]
+    if isinstance(expected, range):
+        return features[name] in expected
+    return features[name] == expected
+
+
+_engine = None
+
+
+def get_engine() -> FingerprintEngine:
+    """Return the shared engine over the built-in signatures"""
+    global _engine
+    if _engine is None:
+        _engine = FingerprintEngine()
+    return _engine
+
+
+def best_guess(guesses: list) -> tuple:
+    """
+    Name for the top of a ranking and whether it is ambiguous.
+    OSes tied for the best confidence are all named, 'A / B (ambiguous)',
+    rather than letting table order pick one.
+    """
+    if not guesses:
+        return 'Unknown', False
+    tied = [g['os'] for g in guesses if g['confidence'] == guesses[0]['confidence']]
+    if len(tied) == 1:
+        return tied[0], False
+    return f"{' / '.join(tied)} (ambiguous)", True
+
+
+def identify(sock, sniffer=None) -> dict:
+    """
+    Fingerprint the peer of a connected socket.
+    Returns a dict with 'remote_os' (best guess or 'Unknown'), 'ambiguous'
+    (the best confidence was shared), 'ttl' (the remote TTL, None without a
+    raw capture), 'guesses' and 'features'.
+    """
+    features = None
+    if sniffer is not None:
+        try:
+            synack = sniffer.synack_for(sock.getsockname(), sock.getpeername())
+            if synack:
+                features = synack_features(synack)
+        except (OSError, IndexError, struct.error):
+            features = None
+    if features is None:
+        features = tcp_info_features(sock) or {}
+
+    guesses = get_engine().match(features) if features else []
+    remote_os, ambiguous = best_guess(guesses)
+    return {
+        'remote_os': remote_os,
+        'ambiguous': ambiguous,
+        'ttl': features.get('ttl'),
+        'guesses': guesses,
+        'features': features,
+    }
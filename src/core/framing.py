@@ -0,0 +1,280 @@
+"""Streaming receive loop with pluggable message framing"""
+import abc
+import select
+import struct
+import threading
+
+
+class RingBuffer:
+    """
+    Growable circular byte buffer.
+
+    Incoming chunks are copied in once; framers then search and consume
+    from the front without shifting the remaining bytes.
+    """
+
+    def __init__(self, capacity: int = 65536):
+        self._buf = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def write(self, data):
+        """Append data, growing the buffer if it does not fit"""
+        n = len(data)
+        if self._size + n > len(self._buf):
+            self._grow(self._size + n)
+        end = (self._start + self._size) % len(self._buf)
+        first = min(n, len(self._buf) - end)
+        self._buf[end:end + first] = data[:first]
+        if first < n:
+            self._buf[:n - first] = data[first:]
+        self._size += n
+
+    def peek(self, n: int) -> bytes:
+        """Return up to n bytes from the front without consuming them"""
+        n = min(n, self._size)
+        end = self._start + n
+        if end <= len(self._buf):
+            return bytes(self._buf[self._start:end])
+        return bytes(self._buf[self._start:]) + bytes(self._buf[:end - len(self._buf)])
+
+    def read(self, n: int) -> bytes:
+        """Remove and return up to n bytes from the front"""
+        data = self.peek(n)
+        self.consume(len(data))
+        return data
+
+    def consume(self, n: int):
+        """Drop n bytes from the front"""
+        n = min(n, self._size)
+        self._start = (self._start + n) % len(self._buf)
+        self._size -= n
+        if self._size == 0:
+            self._start = 0
+
+    def find(self, sep: bytes, start: int = 0) -> int:
+        """Return the offset of sep from the front, or -1"""
+        if self._start + self._size <= len(self._buf):
+            index = self._buf.find(sep, self._start + start, self._start + self._size)
+            return index - self._start if index >= 0 else -1
+        return self.peek(self._size).find(sep, start)
+
+    def _grow(self, needed: int):
+        capacity = len(self._buf)
+        while capacity < needed:
+            capacity *= 2
+        data = self.peek(self._size)
+        self._buf = bytearray(capacity)
+        self._buf[:len(data)] = data
+        self._start = 0
+
+
+class Framer(abc.ABC):
+    """
+    Splits a byte stream into messages.
+    feed() accepts any chunk and returns the list of completed messages;
+    subclasses implement _extract() over the buffered bytes. ValueError
+    means the stream cannot be framed any further.
+    """
+    name = 'raw'
+
+    def __init__(self):
+        self.buffer = RingBuffer()
+
+    def feed(self, data) -> list:
+        self.buffer.write(data)
+        return self._extract()
+
+    def reset(self):
+        self.buffer = RingBuffer()
+
+    @abc.abstractmethod
+    def _extract(self) -> list:
+        """Remove and return every complete message in the buffer"""
+
+
+class RawFramer(Framer):
+    """Every chunk received is delivered as-is"""
+    name = 'raw'
+
+    def feed(self, data) -> list:
+        # Skips the buffer entirely
+        return [bytes(data)] if data else []
+
+    def _extract(self) -> list:
+        return [self.buffer.read(len(self.buffer))] if len(self.buffer) else []
+
+
+class NewlineFramer(Framer):
+    """Messages end with a delimiter (b'\\n' by default), which is stripped"""
+    name = 'newline'
+
+    def __init__(self, delimiter: bytes = b'\n', max_length: int = 1 << 20):
+        super().__init__()
+        self.delimiter = delimiter
+        self.max_length = max_length
+        self._scanned = 0
+
+    def _extract(self) -> list:
+        messages = []
+        while True:
+            # Resume the search where the previous feed left off
+            index = self.buffer.find(self.delimiter, self._scanned)
+            if index < 0:
+                self._scanned = max(0, len(self.buffer) - len(self.delimiter) + 1)
+                if len(self.buffer) > self.max_length:
+                    # Runaway line: flush it rather than grow forever
+                    messages.append(self.buffer.read(len(self.buffer)))
+                    self._scanned = 0
+                return messages
+            message = self.buffer.read(index)
+            self.buffer.consume(len(self.delimiter))
+            self._scanned = 0
+            messages.append(message.rstrip(b'\r') if self.delimiter == b'\n' else message)
+
+
+class LengthPrefixFramer(Framer):
+    """Messages are preceded by an unsigned big-endian length header"""
+    name = 'length'
+    _formats = {1: '!B', 2: '!H', 4: '!I', 8: '!Q'}
+
+    def __init__(self, header_size: int = 4, max_length: int = 16 << 20):
+        super().__init__()
+        if header_size not in self._formats:
+            raise ValueError('Header size must be 1, 2, 4 or 8 bytes')
+        self.header_size = header_size
+        self.max_length = max_length
+        self._format = self._formats[header_size]
+
+    def _extract(self) -> list:
+        messages = []
+        while len(self.buffer) >= self.header_size:
+            (length,) = struct.unpack(self._format, self.buffer.peek(self.header_size))
+            if length > self.max_length:
+                # A garbage header must not make us buffer gigabytes
+                raise ValueError(f'Frame of {length} bytes exceeds {self.max_length}')
+            if len(self.buffer) < self.header_size + length:
+                break
+            self.buffer.consume(self.header_size)
+            messages.append(self.buffer.read(length))
+        return messages
+
+
+class FixedSizeFramer(Framer):
+    """Every message is exactly `size` bytes"""
+    name = 'fixed'
+
+    def __init__(self, size: int = 64):
+        super().__init__()
+        if size < 1:
+            raise ValueError('Message size must be positive')
+        self.size = size
+
+    def _extract(self) -> list:
+        messages = []
+        while len(self.buffer) >= self.size:
+            messages.append(self.buffer.read(self.size))
+        return messages
+
+
+FRAMERS = {
+    'raw': RawFramer,
+    'newline': NewlineFramer,
+    'length': LengthPrefixFramer,
+    'fixed': FixedSizeFramer,
+}
+
+
+def make_framer(name: str, **options) -> Framer:
+    """Create a framer by name ('raw', 'newline', 'length', 'fixed')"""
+    try:
+        return FRAMERS[name](**options)
+    except KeyError:
+        raise ValueError(f'Unknown framer: {name}')
+
+
+class StreamReceiver:
+    """
+    Background reader for one connected socket.
+
+    Reads continuously into a preallocated buffer, feeds the framer and
+    calls on_message(bytes) for each complete message as soon as it
+    arrives. on_closed(reason) is called once when the peer closes the
+    connection or an error occurs (the reason is also kept in
+    closed_reason); after_read(sock), if given, after every read (e.g. to
+    re-arm TCP_QUICKACK). Callbacks run on the reader thread.
+    """
+
+    def __init__(self, sock, framer: Framer, on_message, on_closed=None,
+                 chunk_size: int = 65536, poll_interval: float = 0.2, after_read=None):
+        self.sock = sock
+        self.framer = framer
+        self.on_message = on_message
+        self.on_closed = on_closed
+        self.after_read = after_read
+        self.poll_interval = poll_interval
+        self.bytes_received = 0
+        self.messages_received = 0
+        self.closed_reason = None
+        self._chunk = bytearray(chunk_size)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='linxtap-receiver', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop reading; safe to call from any thread, including callbacks"""
+        self._stop.set()
+        if self._thread.is_alive() and threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        view = memoryview(self._chunk)
+        reason = None
+        while not self._stop.is_set():
+            try:
+                # Poll so stop() is honoured without closing the socket
+                readable, _, _ = select.select([self.sock], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                n = self.sock.recv_into(view)
+            except (OSError, ValueError) as e:
+                reason = str(e) or 'Connection error'
+                break
+            if n == 0:
+                reason = 'Connection closed by remote device'
+                break
+
+            self.bytes_received += n
+            if self.after_read:
+                self.after_read(self.sock)
+            try:
+                messages = self.framer.feed(view[:n])
+            except ValueError as e:
+                reason = str(e)
+                break
+            for message in messages:
+                self.messages_received += 1
+                try:
+                    self.on_message(message)
+                except Exception:
+                    pass
+
+        self.closed_reason = reason
+        if reason and not self._stop.is_set() and self.on_closed:
+            try:
+                self.on_closed(reason)
+            except Exception:
+                pass
@@ -0,0 +1,193 @@
+"""Persistent per-host cache of OS fingerprint and reachability results"""
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from src.core.fingerprint import identify
+from src.utils.network import SynAckSniffer
+
+
+def default_cache_path() -> str:
+    """Return the path of the shared host cache database"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'linxtap', 'hosts.sqlite')
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    ip          TEXT PRIMARY KEY,
+    ttl         INTEGER,
+    remote_os   TEXT,
+    rtt_ms      REAL,
+    probed_at   REAL NOT NULL,
+    last_seen   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hosts_last_seen ON hosts (last_seen);
+"""
+
+# Gateway status is not cached: it follows the live routing table (is_gateway).
+# Databases from older versions still carry an is_gateway column, which is ignored.
+_COLUMNS = ('ip', 'ttl', 'remote_os', 'rtt_ms', 'probed_at', 'last_seen')
+
+
+class HostCache:
+    """
+    SQLite-backed cache of what was learned about each host: TTL, inferred
+    OS, last handshake RTT and when it was last probed/seen.
+
+    Entries older than max_age (since the last probe) are reported as
+    stale: still usable for display, but worth re-probing. Once more than
+    max_entries hosts are stored the least recently seen are evicted.
+    Safe to share between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024,
+                 max_age: float = 7 * 86400.0):
+        if path is None:
+            path = default_cache_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._probing = set()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ':memory:':
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+
+    def get(self, ip: str) -> Optional[dict]:
+        """
+        Look up a host and mark it as recently seen.
+        Returns the entry (with a 'stale' flag) or None, also when the
+        database cannot be read: a broken cache must never block a connect.
+        """
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    f'SELECT {", ".join(_COLUMNS)} FROM hosts WHERE ip = ?', (ip,)).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                self._db.execute('UPDATE hosts SET last_seen = ? WHERE ip = ?', (now, ip))
+        except sqlite3.Error:
+            return None
+        entry = dict(zip(_COLUMNS, row))
+        entry['last_seen'] = now
+        entry['stale'] = now - entry['probed_at'] > self.max_age
+        return entry
+
+    def put(self, ip: str, ttl: Optional[int], remote_os: Optional[str],
+            rtt_ms: Optional[float] = None):
+        """Store fresh probe results for ip, evicting the LRU hosts if full"""
+        now = time.time()
+        try:
+            with self._lock:
+                self._db.execute(
+                    'INSERT INTO hosts (ip, ttl, remote_os, rtt_ms, probed_at, last_seen) '
+                    'VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(ip) DO UPDATE SET ttl = excluded.ttl, remote_os = excluded.remote_os, '
+                    'rtt_ms = COALESCE(excluded.rtt_ms, hosts.rtt_ms), '
+                    'probed_at = excluded.probed_at, last_seen = excluded.last_seen',
+                    (ip, ttl, remote_os, rtt_ms, now, now))
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def touch(self, ip: str, rtt_ms: Optional[float] = None):
+        """Record a new contact with ip (and its RTT) without re-probing"""
+        try:
+            with self._lock:
+                self._db.execute(
+                    'UPDATE hosts SET last_seen = ?, rtt_ms = COALESCE(?, rtt_ms) WHERE ip = ?',
+                    (time.time(), rtt_ms, ip))
+        except sqlite3.Error:
+            pass
+
+    def remove(self, ip: str):
+        try:
+            with self._lock:
+                self._db.execute('DELETE FROM hosts WHERE ip = ?', (ip,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._db.execute('DELETE FROM hosts')
+        except sqlite3.Error:
+            pass
+
+    def __len__(self):
+        try:
+            with self._lock:
+                return self._db.execute('SELECT COUNT(*) FROM hosts').fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def refresh_async(self, ip: str, port: int, probe=None) -> bool:
+        """
+        Re-probe ip in a background thread and store the result.
+        probe(ip, port) must return probe_host()-style results or None.
+        Returns False if a probe for ip is already running.
+        """
+        with self._lock:
+            if ip in self._probing:
+                return False
+            self._probing.add(ip)
+
+        def run():
+            try:
+                result = (probe or probe_host)(ip, port)
+                if result:
+                    self.put(ip, result['ttl'], result['remote_os'], result['rtt_ms'])
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._probing.discard(ip)
+
+        threading.Thread(target=run, name='linxtap-reprobe', daemon=True).start()
+        return True
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        excess = self._db.execute('SELECT COUNT(*) FROM hosts').fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                'DELETE FROM hosts WHERE ip IN '
+                '(SELECT ip FROM hosts ORDER BY last_seen ASC LIMIT ?)', (excess,))
+
+
+def probe_host(ip: str, port: int, timeout: float = 5.0) -> Optional[dict]:
+    """
+    Open (and immediately close) a connection to learn a host's TTL, OS
+    and handshake RTT.
+    Returns a dict with those keys or None if the host cannot be reached.
+    """
+    sniffer = SynAckSniffer.open()
+    try:
+        started = time.perf_counter()
+        sock = socket.create_connection((ip, port), timeout=timeout)
+        rtt_ms = (time.perf_counter() - started) * 1000.0
+        try:
+            fingerprint = identify(sock, sniffer)
+        finally:
+            sock.close()
+        return {
+            'ttl': fingerprint['ttl'],
+            'remote_os': fingerprint['remote_os'],
+            'rtt_ms': rtt_ms,
+        }
+    except OSError:
+        return None
+    finally:
+        if sniffer:
+            sniffer.close()
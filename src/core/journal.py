@@ -0,0 +1,214 @@
+"""Append-only on-disk session journal"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+# Retention: all journals together stay within MAX_BYTES. Starting a session
+# deletes the oldest journals beyond MAX_SESSIONS or beyond what leaves room
+# for the new one, which stops recording once it reaches MAX_SESSION_BYTES
+MAX_SESSIONS = 20
+MAX_BYTES = 64 << 20
+MAX_SESSION_BYTES = 16 << 20
+
+
+def journal_enabled() -> bool:
+    """Return False when LINXTAP_JOURNAL=0 opts out of session journals"""
+    return os.environ.get('LINXTAP_JOURNAL', '1') not in ('', '0')
+
+
+def prune_journals(directory: str, max_files: int = MAX_SESSIONS,
+                   max_bytes: int = MAX_BYTES) -> int:
+    """
+    Delete the oldest session journals in directory beyond max_files or
+    max_bytes in total. Returns the number of files deleted.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0
+    journals = []
+    for name in names:
+        if not (name.startswith('session_') and name.endswith('.jsonl')):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        journals.append((stat.st_mtime, path, stat.st_size))
+
+    journals.sort(reverse=True)  # Newest first
+    kept = total = removed = 0
+    over_limit = False
+    for _, path, size in journals:
+        over_limit = over_limit or kept >= max_files or total + size > max_bytes
+        if not over_limit:
+            kept += 1
+            total += size
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def default_journal_dir() -> str:
+    """Return the directory session journals are written to"""
+    base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, 'linxtap', 'journal')
+
+
+def format_record(record: dict) -> str:
+    """Render a journal record as a plain-text log line"""
+    timestamp = time.strftime("%H:%M:%S", time.localtime(record['ts']))
+    return f"[{timestamp}] {record['text']}"
+
+
+class SessionJournal:
+    """
+    Append-only JSONL journal of sent/received/system events.
+
+    Each event is written as it happens (one JSON object per line with
+    'ts', 'type', 'text' and 'bytes'), through a buffered binary file
+    that is flushed at most every flush_interval seconds. Call
+    flush_pending() on a timer so a session that goes quiet is written
+    out too. Export streams from the file, so memory use does not grow
+    with session length.
+
+    A new session file in the journal directory first prunes old sessions
+    (see prune_journals) down to max_bytes less its own allowance, so the
+    directory as a whole stays within max_bytes; recording stops, with a
+    final note, once the file holds max_session_bytes.
+    """
+
+    def __init__(self, path: Optional[str] = None, directory: Optional[str] = None,
+                 flush_interval: float = 1.0, buffer_size: int = 65536,
+                 max_files: int = MAX_SESSIONS, max_bytes: int = MAX_BYTES,
+                 max_session_bytes: int = MAX_SESSION_BYTES):
+        self.max_bytes = min(max_session_bytes, max_bytes)
+        if path is None:
+            directory = directory or default_journal_dir()
+            os.makedirs(directory, exist_ok=True)
+            # Make room for the session about to start, counting its allowance
+            prune_journals(directory, max_files - 1, max_bytes - self.max_bytes)
+            name = f"session_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl"
+            path = os.path.join(directory, name)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.bytes_written = 0
+        self.truncated = False
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab', buffering=buffer_size)
+        self._last_flush = time.monotonic()
+        self._pending = False
+        # Any float timestamp is at most 24 characters longer than '0'
+        self._marker_room = len(self._marker(0)) + 24
+
+    def _marker(self, ts: float) -> bytes:
+        """The final note written when the session reaches max_bytes"""
+        return json.dumps({
+            'ts': ts,
+            'type': 'system',
+            'text': f'Journal limit of {self.max_bytes} bytes reached; recording stopped',
+            'bytes': None,
+        }).encode('utf-8') + b'\n'
+
+    def record(self, msg_type: str, text: str, nbytes: Optional[int] = None):
+        """Append one event"""
+        line = json.dumps({
+            'ts': time.time(),
+            'type': msg_type,
+            'text': text,
+            'bytes': nbytes,
+        }, ensure_ascii=False).encode('utf-8') + b'\n'
+
+        with self._lock:
+            if self._file.closed or self.truncated:
+                return
+            # Room for the final note is kept free, so the file never exceeds max_bytes
+            if self.bytes_written + len(line) + self._marker_room > self.max_bytes:
+                self.truncated = True
+                if self.bytes_written + self._marker_room > self.max_bytes:
+                    return  # A limit too small even for the note
+                line = self._marker(time.time())
+            self._file.write(line)
+            self.bytes_written += len(line)
+            self.records_written += 1
+            self._pending = True
+            self._flush_if_due()
+
+    def flush_pending(self):
+        """Write out buffered records once flush_interval has passed since the last flush"""
+        with self._lock:
+            self._flush_if_due()
+
+    def _flush_if_due(self):
+        now = time.monotonic()
+        if self._pending and not self._file.closed and now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+            self._pending = False
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._last_flush = time.monotonic()
+                self._pending = False
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def iter_records(self, types=None):
+        """Yield journal records, oldest first, optionally filtered by type"""
+        self.flush()
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Partial line from an interrupted write
+                if types is None or record.get('type') in types:
+                    yield record
+
+    def export(self, dest_path: str, fmt: str = 'text', types=None) -> int:
+        """
+        Stream the journal to dest_path as plain text or JSONL.
+        Returns the number of records written.
+        """
+        if fmt == 'jsonl' and types is None:
+            # Unfiltered JSONL export is a straight chunked copy
+            self.flush()
+            count = 0
+            with open(self.path, 'rb') as src, open(dest_path, 'wb') as out:
+                while True:
+                    chunk = src.read(1 << 16)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    count += chunk.count(b'\n')
+            return count
+
+        count = 0
+        with open(dest_path, 'w', encoding='utf-8') as out:
+            for record in self.iter_records(types):
+                if fmt == 'jsonl':
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                else:
+                    out.write(format_record(record) + '\n')
+                count += 1
+        return count
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
@@ -0,0 +1,327 @@
+"""Sustained-rate TCP load generation with pipelined requests"""
+import asyncio
+import errno
+import time
+from collections import deque
+from typing import Optional
+
+from src.core.app_logic import validate_target
+from src.core.framing import make_framer
+from src.core.profiles import get_profile
+from src.utils.network import fastopen_connect, happy_eyeballs_connect, resolve_addresses
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of integer values (microseconds).
+
+    Values below 2**sub_bucket_bits are stored exactly; above that each
+    power-of-two range is split into 2**(sub_bucket_bits - 1) buckets, so
+    every recorded value keeps a relative error under 1 / 2**(bits - 1)
+    (under 1% with the default 8 bits) in constant memory.
+    """
+
+    def __init__(self, sub_bucket_bits: int = 8):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._sub = 1 << sub_bucket_bits
+        self._half = self._sub >> 1
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return shift * self._half + (value >> shift)
+
+    def _value_at(self, index: int) -> int:
+        """Highest value that maps to bucket index"""
+        if index < self._sub:
+            return index
+        shift = (index - self._half) // self._half
+        mantissa = index - shift * self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def percentile(self, p: float) -> Optional[int]:
+        """Value at or below which p percent of recorded values fall"""
+        if not self.count:
+            return None
+        target = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._value_at(index), self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        """Percentiles in milliseconds"""
+        def ms(value):
+            return None if value is None else value / 1000.0
+        return {
+            'count': self.count,
+            'mean_ms': ms(self.total / self.count) if self.count else None,
+            'min_ms': ms(self.min),
+            'p50_ms': ms(self.percentile(50)),
+            'p90_ms': ms(self.percentile(90)),
+            'p99_ms': ms(self.percentile(99)),
+            'p999_ms': ms(self.percentile(99.9)),
+            'max_ms': ms(self.max),
+        }
+
+
+# Sends a connection makes back to back, when behind schedule, before yielding
+_MAX_BURST = 64
+
+
+class LoadGenerator:
+    """
+    Open-loop load test against one TCP service.
+
+    Sends payload_template (str, sent as UTF-8, or bytes) with each {seq}
+    replaced by a sequence number (other braces are sent as written, so
+    JSON templates work) across `connections` connections at a combined
+    target rate (msgs/s, or bytes/s via byte_rate) without waiting for
+    replies. With a framer,
+    replies are matched to requests in order per connection and latency is
+    measured from each request's *scheduled* send time, so a stalled
+    server shows up as latency instead of silently lowering the rate.
+    on_progress(snapshot) is called every progress_interval seconds.
+    With a connection profile, connections are made from its source
+    address with its socket options, and with fastopen each connection's
+    first message goes out in the SYN; its timeouts are not used.
+    """
+
+    def __init__(self, ip: str, port, payload_template='ping {seq}\n',
+                 rate: float = 100.0, byte_rate: Optional[float] = None,
+                 connections: int = 1, duration: float = 10.0,
+                 framer: Optional[str] = 'newline', connect_timeout: float = 5.0,
+                 on_progress=None, progress_interval: float = 0.5, profile=None):
+        port_num, error = validate_target(ip, str(port))
+        if error:
+            raise ValueError(error['message'])
+        # None: plain asyncio connects
+        self.profile = get_profile(profile) if profile is not None else None
+        self.ip = ip
+        self.port = port_num
+        self.payload_template = payload_template
+        if isinstance(payload_template, str):
+            payload_template = payload_template.encode('utf-8')
+        # Split once: each send only joins the parts around the sequence number
+        self._payload_parts = bytes(payload_template).split(b'{seq}')
+        self.connections = max(1, connections)
+        if byte_rate:
+            rate = byte_rate / max(1, len(self._payload(0)))
+        if rate <= 0:
+            raise ValueError('Rate must be positive')
+        self.rate = rate
+        self.duration = duration
+        self.framer = framer
+        self.connect_timeout = connect_timeout
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.errors = 0
+        self.last_error = None
+        self._seq = 0
+        self._start = None
+        self._stopping = False
+
+    def stop(self):
+        """Ask a running load test to finish early (call on the loop thread)"""
+        self._stopping = True
+
+    def snapshot(self) -> dict:
+        """Current counters, achieved throughput and latency percentiles"""
+        elapsed = time.monotonic() - self._start if self._start else 0.0
+        per_second = (lambda n: n / elapsed if elapsed > 0 else 0.0)
+        return {
+            'target': f'{self.ip}:{self.port}',
+            'elapsed_s': elapsed,
+            'target_rate': self.rate,
+            'connections': self.connections,
+            'sent': self.sent,
+            'received': self.received,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'msgs_per_s': per_second(self.sent),
+            'bytes_per_s': per_second(self.bytes_sent),
+            'responses_per_s': per_second(self.received),
+            'latency': self.histogram.summary(),
+        }
+
+    async def run(self) -> dict:
+        """Run the load test and return the final snapshot"""
+        self._start = time.monotonic()
+        end = self._start + self.duration
+        interval = self.connections / self.rate
+        tasks = [asyncio.create_task(self._connection(i, interval, end))
+                 for i in range(self.connections)]
+        reporter = asyncio.create_task(self._report())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(reporter, *tasks, return_exceptions=True)
+
+        result = self.snapshot()
+        result['status'] = 'complete' if not self._stopping else 'stopped'
+        return result
+
+    async def _report(self):
+        if not self.on_progress:
+            return
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            self.on_progress(self.snapshot())
+
+    async def _connection(self, index: int, interval: float, end: float):
+        first = None
+        if self.profile and self.profile.fastopen:
+            first = self._payload(self._seq)
+            self._seq += 1
+        started = time.monotonic()
+        try:
+            if self.profile:
+                sock = await asyncio.get_running_loop().run_in_executor(
+                    None, self._open_socket, first)
+                reader, writer = await asyncio.open_connection(sock=sock)
+            else:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.ip, self.port), self.connect_timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self._error(f'Connect failed: {str(e) or type(e).__name__}')
+            return
+
+        pending = deque()
+        if first:
+            # Sent with the connect: its latency counts from when that started
+            self.sent += 1
+            self.bytes_sent += len(first)
+            if self.framer:
+                pending.append(started)
+        receiver = None
+        if self.framer:
+            receiver = asyncio.create_task(self._receive(reader, pending))
+
+        # Stagger connections so their sends interleave evenly
+        next_send = self._start + index * interval / self.connections
+        burst = 0
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                # Wall-clock end too: behind schedule, next_send trails far behind
+                if next_send >= end or now >= end:
+                    break
+                if next_send > now:
+                    await asyncio.sleep(next_send - now)
+                    burst = 0
+                elif burst >= _MAX_BURST:
+                    # Behind schedule: still let the receiver, the progress
+                    # reporter and stop() run now and then
+                    await asyncio.sleep(0)
+                    burst = 0
+                burst += 1
+                payload = self._payload(self._seq)
+                self._seq += 1
+                if self.framer:
+                    pending.append(next_send)
+                writer.write(payload)
+                self.sent += 1
+                self.bytes_sent += len(payload)
+                # Only block when the socket buffer is actually full
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+                next_send += interval
+
+            await writer.drain()
+            if receiver and pending:
+                # Give in-flight replies a moment to arrive
+                try:
+                    await asyncio.wait_for(asyncio.shield(receiver), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+        except (OSError, ConnectionError) as e:
+            self._error(f'Send failed: {str(e)}')
+        finally:
+            if receiver:
+                receiver.cancel()
+                await asyncio.gather(receiver, return_exceptions=True)
+            writer.close()
+
+    def _open_socket(self, first: Optional[bytes]):
+        """Runs on an executor thread: resolve and connect as the profile says"""
+        profile = self.profile
+        addresses = profile.filter_addresses(
+            resolve_addresses(self.ip, self.port, timeout=self.connect_timeout))
+        if not addresses:
+            raise OSError(errno.EADDRNOTAVAIL,
+                          f'No address of {self.ip} matches bind address {profile.bind_address}')
+        if first:
+            sock, sent = fastopen_connect(addresses, first, timeout=self.connect_timeout,
+                                          prepare=profile.prepare)
+            if sent < len(first):
+                sock.sendall(first[sent:])
+        else:
+            sock = happy_eyeballs_connect(addresses, timeout=self.connect_timeout,
+                                          prepare=profile.prepare)
+        profile.tune(sock)
+        return sock
+
+    def _payload(self, seq: int) -> bytes:
+        return str(seq).encode('ascii').join(self._payload_parts)
+
+    async def _receive(self, reader, pending: deque):
+        framer = make_framer(self.framer)
+        while True:
+            try:
+                data = await reader.read(65536)
+            except (OSError, ConnectionError) as e:
+                self._error(f'Receive failed: {str(e)}')
+                return
+            if not data:
+                return
+            now = time.monotonic()
+            self.bytes_received += len(data)
+            for _ in framer.feed(data):
+                self.received += 1
+                if pending:
+                    self.histogram.record((now - pending.popleft()) * 1e6)
+            if not pending and (self._stopping or now >= self._start + self.duration):
+                return
+
+    def _error(self, message: str):
+        self.errors += 1
+        self.last_error = message
@@ -0,0 +1,224 @@
+"""Phase timings and traffic counters, exportable in Prometheus text format"""
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the span duration histogram buckets
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'linxtap'
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while metrics are disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _SpanStats:
+    __slots__ = ('count', 'total', 'max', 'last', 'buckets')
+
+    def __init__(self, n_buckets):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.buckets = [0] * n_buckets
+
+
+class Metrics:
+    """
+    Registry of span timings (per phase histograms) and counters, both
+    optionally labelled: connection-scoped series carry a target label
+    ('ip:port') so concurrent connections can be told apart.
+
+    While disabled, span() returns a shared no-op context manager and
+    inc()/observe() return after one attribute check, so instrumented code
+    paths cost next to nothing.
+    """
+
+    def __init__(self, enabled: bool = False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._spans = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def span(self, name: str, **labels):
+        """Context manager timing one phase, e.g. `with metrics.span('connect.handshake')`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, labels)
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration for span name (with optional labels)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            stats = self._spans.get(key)
+            if stats is None:
+                stats = self._spans[key] = _SpanStats(len(self.buckets))
+            stats.count += 1
+            stats.total += seconds
+            stats.last = seconds
+            if seconds > stats.max:
+                stats.max = seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+                    break
+
+    def inc(self, name: str, value=1, **labels):
+        """Add value to counter name (with optional labels)"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def counter(self, name: str, **labels):
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Copy of the current values.
+        Returns {'spans': {(name, labels): {count, mean_ms, max_ms, last_ms}},
+                 'counters': {(name, labels): value}}
+        with labels a sorted tuple of (label, value) pairs.
+        """
+        with self._lock:
+            spans = {
+                key: {
+                    'count': s.count,
+                    'mean_ms': s.total / s.count * 1000.0 if s.count else 0.0,
+                    'max_ms': s.max * 1000.0,
+                    'last_ms': s.last * 1000.0,
+                }
+                for key, s in self._spans.items()
+            }
+            counters = dict(self._counters)
+        return {'spans': spans, 'counters': counters}
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)"""
+        lines = [
+            f'# HELP {PREFIX}_span_seconds Time spent per instrumented phase',
+            f'# TYPE {PREFIX}_span_seconds histogram',
+        ]
+        with self._lock:
+            for (name, labels), s in sorted(self._spans.items()):
+                series = ','.join([f'phase="{_escape(name)}"'] +
+                                  [f'{k}="{_escape(str(v))}"' for k, v in labels])
+                cumulative = 0
+                for bound, n in zip(self.buckets, s.buckets):
+                    cumulative += n
+                    lines.append(f'{PREFIX}_span_seconds_bucket{{{series},le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}_span_seconds_bucket{{{series},le="+Inf"}} {s.count}')
+                lines.append(f'{PREFIX}_span_seconds_sum{{{series}}} {s.total!r}')
+                lines.append(f'{PREFIX}_span_seconds_count{{{series}}} {s.count}')
+
+            seen = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f'{PREFIX}_{name}_total'
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                label_text = ','.join(f'{k}="{_escape(str(v))}"' for k, v in labels)
+                lines.append(f'{metric}{{{label_text}}} {value}' if label_text else f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """
+        Write render_prometheus() to path atomically, for a scraper (e.g.
+        node_exporter's textfile collector) that may read it at any moment.
+        """
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def serve(self, port: int = 9464, host: str = '127.0.0.1'):
+        """
+        Serve /metrics over HTTP on a daemon thread.
+        Returns the bound (host, port); port 0 picks a free one.
+        """
+        if self._server:
+            return self._server.server_address[:2]
+        # Imported here so the CLI and GUI don't pay for http.server unless exporting
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='linxtap-metrics',
+                         daemon=True).start()
+        return self._server.server_address[:2]
+
+    def stop_serving(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_metrics = None
+
+
+def get_metrics() -> Metrics:
+    """Return the shared process-wide Metrics (enabled by LINXTAP_METRICS=1)"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(enabled=os.environ.get('LINXTAP_METRICS', '') not in ('', '0'))
+    return _metrics
@@ -0,0 +1,489 @@
+"""Continuous health monitoring: scheduled TCP probes for many targets"""
+import array
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import socket
+import struct
+import time
+from collections import deque
+from typing import Optional
+
+from src.core.app_logic import validate_target
+from src.core.metrics import get_metrics
+from src.core.scanner import expand_targets, parse_ports
+from src.utils.network import HAPPY_EYEBALLS_DELAY
+from src.utils.resolver import get_resolver
+
+# 'connect' times the TCP handshake; 'echo' also sends a payload and times the first reply byte
+PROBE_MODES = ('connect', 'echo')
+
+# Close probe sockets with a RST: thousands of checks a second would
+# otherwise leave enough TIME_WAIT sockets to run out of local ports
+_LINGER_RESET = struct.pack('ii', 1, 0)
+
+# Largest millisecond offset a TimeSeries slot (uint32) holds
+_MAX_OFFSET_MS = 0xFFFFFFFF
+
+
+def format_target(host: str, port: int) -> str:
+    """'host:port', with IPv6 literals in brackets"""
+    return f'[{host}]:{port}' if ':' in host else f'{host}:{port}'
+
+
+class TimeSeries:
+    """
+    Ring buffer of the last `capacity` probe results in two typed arrays:
+    milliseconds since epoch (uint32) and RTT in ms (float32, NaN for a
+    failed probe), so each sample costs 8 bytes. A uint32 holds about 49.7
+    days of milliseconds, so before an offset would overflow the epoch is
+    moved up to the oldest sample (or, across a longer gap, as far as needed,
+    clamping older samples to the new epoch).
+    """
+
+    def __init__(self, capacity: int = 256, epoch: Optional[float] = None):
+        if capacity < 1:
+            raise ValueError('History capacity must be positive')
+        self.capacity = capacity
+        self.epoch = time.time() if epoch is None else epoch
+        self._times = array.array('I', bytes(4 * capacity))
+        self._rtts = array.array('f', bytes(4 * capacity))
+        self._next = 0
+        self._count = 0
+
+    def append(self, timestamp: float, rtt_ms: Optional[float]):
+        offset = int((timestamp - self.epoch) * 1000)
+        if offset > _MAX_OFFSET_MS:
+            oldest = offset
+            if self._count:
+                oldest = self._times[(self._next - self._count) % self.capacity]
+            self._rebase(max(oldest, offset - _MAX_OFFSET_MS))
+            offset = int((timestamp - self.epoch) * 1000)
+        index = self._next
+        self._times[index] = min(max(offset, 0), _MAX_OFFSET_MS)
+        self._rtts[index] = math.nan if rtt_ms is None else rtt_ms
+        self._next = (index + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _rebase(self, shift_ms: int):
+        self.epoch += shift_ms / 1000.0
+        for index in range(self.capacity):
+            self._times[index] = max(self._times[index] - shift_ms, 0)
+
+    def __len__(self):
+        return self._count
+
+    def samples(self, last: Optional[int] = None) -> list:
+        """Oldest-first (timestamp, rtt_ms) pairs; rtt_ms is None for failures"""
+        count = self._count if last is None else min(last, self._count)
+        start = (self._next - count) % self.capacity
+        samples = []
+        for offset in range(count):
+            index = (start + offset) % self.capacity
+            rtt = self._rtts[index]
+            samples.append((self.epoch + self._times[index] / 1000.0,
+                            None if math.isnan(rtt) else rtt))
+        return samples
+
+    def availability(self) -> Optional[float]:
+        """Fraction of the buffered probes that succeeded, or None if empty"""
+        if not self._count:
+            return None
+        # Until the ring wraps, the samples are exactly the first _count slots
+        failed = sum(1 for index in range(self._count) if math.isnan(self._rtts[index]))
+        return 1.0 - failed / self._count
+
+
+class MonitorTarget:
+    """Schedule, state and history of one monitored host:port"""
+
+    def __init__(self, host: str, port: int, interval: float, mode: str, payload: bytes,
+                 history: int):
+        self.key = format_target(host, port)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.mode = mode
+        self.payload = payload
+        self.state = 'unknown'
+        self.changed_at = None
+        self.rtt_ms = None
+        self.rtt_avg_ms = None
+        self.rtt_dev_ms = None
+        self.checks = 0
+        self.failures = 0
+        self.streak = 0
+        self.transitions = deque()
+        self.flapping = False
+        self.last_error = None
+        self.last_check = None
+        self.in_flight = False
+        self.removed = False
+        self.history = TimeSeries(history)
+
+    def info(self) -> dict:
+        """Snapshot of this target's state, RTT statistics and counters"""
+        return {
+            'target': self.key,
+            'host': self.host,
+            'port': self.port,
+            'mode': self.mode,
+            'interval': self.interval,
+            'state': self.state,
+            'since': self.changed_at,
+            'rtt_ms': self.rtt_ms,
+            'rtt_avg_ms': self.rtt_avg_ms,
+            'rtt_dev_ms': self.rtt_dev_ms,
+            'checks': self.checks,
+            'failures': self.failures,
+            'availability': self.history.availability(),
+            'flapping': self.flapping,
+            'flaps': len(self.transitions),
+            'last_error': self.last_error,
+            'last_check': self.last_check,
+        }
+
+
+class HealthMonitor:
+    """
+    Probes many host:port targets on a fixed interval from one event loop.
+
+    Due probes come off a heap ordered by next run time. Each target starts
+    at a random phase within its interval and every run is jittered by up
+    to `jitter` of the interval, so thousands of targets spread out instead
+    of firing in bursts. At most `concurrency` probes are in flight; a
+    target whose previous probe is still running skips that round.
+
+    A target goes down after `fall` consecutive failures and up after
+    `rise` consecutive successes (its first result decides at once), and
+    is flapping while it has changed state at least flap_threshold times
+    within flap_window seconds. RTT is smoothed as in RFC 6298 (average
+    and mean deviation). on_event(event, info) is called on the loop
+    thread with event one of 'up', 'down', 'flapping' and 'stable'.
+
+    add_target(), remove_target() and stop() must be called on the loop
+    thread (or before run()); snapshot() and summary() may be read from
+    any thread.
+    """
+
+    def __init__(self, interval: float = 5.0, timeout: float = 1.0, mode: str = 'connect',
+                 payload: bytes = b'\n', concurrency: int = 512, jitter: float = 0.1,
+                 rise: int = 1, fall: int = 2, flap_threshold: int = 4,
+                 flap_window: float = 60.0, alpha: float = 0.125, history: int = 256,
+                 on_event=None, metrics=None):
+        if interval <= 0 or timeout <= 0:
+            raise ValueError('Interval and timeout must be positive')
+        if mode not in PROBE_MODES:
+            raise ValueError(f'Unknown probe mode: {mode}')
+        self.interval = interval
+        self.timeout = timeout
+        self.mode = mode
+        self.payload = payload
+        self.concurrency = max(1, concurrency)
+        self.jitter = min(max(jitter, 0.0), 0.5)
+        self.rise = max(1, rise)
+        self.fall = max(1, fall)
+        self.flap_threshold = max(2, flap_threshold)
+        self.flap_window = flap_window
+        self.alpha = alpha
+        self.history = history
+        self.on_event = on_event
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.targets = {}
+        self.skipped = 0
+        self.lag_ms = 0.0
+        self._heap = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._wake = None
+        self._stopping = False
+
+    def add_target(self, host: str, port, interval: Optional[float] = None,
+                   mode: Optional[str] = None, payload: Optional[bytes] = None) -> str:
+        """Start monitoring host:port; returns its key. Raises ValueError"""
+        port_num, error = validate_target(host, str(port))
+        if error:
+            raise ValueError(error['message'].replace('Error: ', ''))
+        mode = mode or self.mode
+        if mode not in PROBE_MODES:
+            raise ValueError(f'Unknown probe mode: {mode}')
+        key = format_target(host, port_num)
+        if key in self.targets:
+            return key
+        interval = interval or self.interval
+        target = MonitorTarget(host, port_num, interval, mode,
+                               self.payload if payload is None else payload, self.history)
+        self.targets[key] = target
+        # Random phase: targets added together do not all fire together
+        self._schedule(target, time.monotonic() + random.uniform(0, interval))
+        if self._wake:
+            self._wake.set()
+        return key
+
+    def add_targets(self, targets, ports, **options) -> list:
+        """
+        Monitor every host in targets (IPs, CIDR ranges or host names,
+        comma-separated or a list) on every port in ports ('22,80,8000-8010').
+        Returns the keys added. Raises ValueError.
+        """
+        if isinstance(targets, str):
+            targets = targets.split(',')
+        ports = parse_ports(ports) if isinstance(ports, (str, int)) else list(ports)
+        keys = []
+        for entry in (t.strip() for t in targets):
+            if not entry:
+                continue
+            try:
+                hosts = expand_targets(entry)
+            except ValueError:
+                hosts = [entry]  # a host name, resolved (and cached) per probe
+            for host in hosts:
+                keys.extend(self.add_target(host, port, **options) for port in ports)
+        if not keys:
+            raise ValueError('No targets given')
+        return keys
+
+    def remove_target(self, key: str):
+        """Stop monitoring a target (its heap entry is dropped when it comes due)"""
+        target = self.targets.pop(key, None)
+        if target:
+            target.removed = True
+
+    def snapshot(self) -> list:
+        """info() of every target, in the order they were added"""
+        return [target.info() for target in list(self.targets.values())]
+
+    def summary(self) -> dict:
+        """Target counts by state plus scheduler health"""
+        counts = {'up': 0, 'down': 0, 'unknown': 0}
+        flapping = 0
+        for target in list(self.targets.values()):
+            counts[target.state] += 1
+            flapping += target.flapping
+        return dict(counts, targets=sum(counts.values()), flapping=flapping,
+                    in_flight=self._in_flight, skipped=self.skipped, lag_ms=self.lag_ms)
+
+    def stop(self):
+        """Ask run() to return (call on the loop thread)"""
+        self._stopping = True
+        if self._wake:
+            self._wake.set()
+
+    async def run(self, duration: Optional[float] = None) -> dict:
+        """
+        Probe targets until stop() is called or duration seconds pass.
+        Returns the final summary() with 'status' 'complete' or 'stopped'.
+        """
+        self._stopping = False
+        self._wake = asyncio.Event()
+        _raise_fd_limit(self.concurrency + 64)
+        slots = asyncio.Semaphore(self.concurrency)
+        end = None if duration is None else time.monotonic() + duration
+        checks = set()
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                if end is not None and now >= end:
+                    break
+                self._dispatch_due(now, slots, checks)
+
+                wait = self._heap[0][0] - now if self._heap else None
+                if end is not None:
+                    wait = end - now if wait is None else min(wait, end - now)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wake = None
+            for check in list(checks):
+                check.cancel()
+            await asyncio.gather(*checks, return_exceptions=True)
+        return dict(self.summary(), status='stopped' if self._stopping else 'complete')
+
+    def _dispatch_due(self, now: float, slots: asyncio.Semaphore, checks: set):
+        while self._heap and self._heap[0][0] <= now:
+            due, _, target = heapq.heappop(self._heap)
+            if target.removed:
+                continue
+            next_due = due + target.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            # After a stall (e.g. a suspended laptop) resume the cadence instead of catching up
+            self._schedule(target, next_due if next_due > now else now + target.interval)
+            if target.in_flight:
+                self.skipped += 1
+                continue
+            self.lag_ms += ((now - due) * 1000.0 - self.lag_ms) * 0.1
+            target.in_flight = True
+            check = asyncio.create_task(self._check(target, slots))
+            checks.add(check)
+            check.add_done_callback(checks.discard)
+
+    def _schedule(self, target: MonitorTarget, due: float):
+        heapq.heappush(self._heap, (due, next(self._seq), target))
+
+    async def _check(self, target: MonitorTarget, slots: asyncio.Semaphore):
+        try:
+            async with slots:
+                self._in_flight += 1
+                try:
+                    rtt_ms, error = await self._probe(target)
+                finally:
+                    self._in_flight -= 1
+            if not target.removed:
+                self._record(target, rtt_ms, error, time.time())
+        finally:
+            target.in_flight = False
+
+    async def _probe(self, target: MonitorTarget):
+        """One connect (and echo) probe; returns (rtt_ms, None) or (None, error)"""
+        sockets = []
+        try:
+            # One budget for resolving, connecting and the echo
+            return await asyncio.wait_for(self._attempt(target, sockets), self.timeout)
+        except asyncio.TimeoutError:
+            return None, 'Timeout'
+        except ConnectionRefusedError:
+            return None, 'Connection refused'
+        except OSError as e:
+            return None, str(e) or type(e).__name__
+        finally:
+            for sock in sockets:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RESET)
+                except OSError:
+                    pass
+                sock.close()
+
+    async def _attempt(self, target: MonitorTarget, sockets: list):
+        """Resolve, connect (and echo); returns (rtt_ms, None) or (None, error)"""
+        try:
+            addresses = await asyncio.wrap_future(
+                get_resolver().resolve_async(target.host, target.port))
+        except OSError as e:
+            return None, f'Resolve failed: {str(e)}'
+
+        loop = asyncio.get_running_loop()
+        sock, connect_ms = await self._connect(loop, addresses, sockets)
+        if target.mode != 'echo':
+            return connect_ms, None
+        started = time.perf_counter()
+        await loop.sock_sendall(sock, target.payload)
+        if not await loop.sock_recv(sock, 4096):
+            raise ConnectionError('Connection closed without a reply')
+        return (time.perf_counter() - started) * 1000.0, None
+
+    @staticmethod
+    async def _connect(loop, addresses: list, sockets: list):
+        """
+        Race connects to the resolved addresses (RFC 8305): the next one
+        starts every HAPPY_EYEBALLS_DELAY while earlier ones are pending,
+        or as soon as one fails. Every socket created is added to sockets.
+        Returns (first connected socket, its handshake time in ms); raises
+        the last error if none connects.
+        """
+        async def connect(sock, sockaddr):
+            started = time.perf_counter()
+            await loop.sock_connect(sock, sockaddr)
+            return sock, (time.perf_counter() - started) * 1000.0
+
+        remaining = list(addresses)
+        pending = set()
+        last_error = OSError('No addresses to connect to')
+        try:
+            while remaining or pending:
+                if remaining:
+                    family, sockaddr = remaining.pop(0)
+                    try:
+                        # Inside the try: running out of descriptors (EMFILE) is a failed probe
+                        sock = socket.socket(family, socket.SOCK_STREAM)
+                    except OSError as e:
+                        last_error = e
+                        continue
+                    sockets.append(sock)
+                    sock.setblocking(False)
+                    pending.add(asyncio.ensure_future(connect(sock, sockaddr)))
+                done, pending = await asyncio.wait(
+                    pending, timeout=HAPPY_EYEBALLS_DELAY if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    try:
+                        return attempt.result()
+                    except OSError as e:
+                        last_error = e
+            raise last_error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+    def _record(self, target: MonitorTarget, rtt_ms: Optional[float], error: Optional[str],
+                now: float):
+        target.checks += 1
+        target.last_check = now
+        target.history.append(now, rtt_ms)
+        ok = error is None
+        if ok:
+            target.rtt_ms = rtt_ms
+            if target.rtt_avg_ms is None:
+                target.rtt_avg_ms = rtt_ms
+                target.rtt_dev_ms = rtt_ms / 2
+            else:
+                target.rtt_dev_ms += (abs(target.rtt_avg_ms - rtt_ms) - target.rtt_dev_ms) * \
+                    min(1.0, 2 * self.alpha)
+                target.rtt_avg_ms += (rtt_ms - target.rtt_avg_ms) * self.alpha
+            target.last_error = None
+            self.metrics.observe('monitor.rtt', rtt_ms / 1000.0)
+        else:
+            target.failures += 1
+            target.last_error = error
+        self.metrics.inc('monitor_checks', result='up' if ok else 'down')
+
+        state = 'up' if ok else 'down'
+        if target.state == state:
+            target.streak = 0
+        else:
+            target.streak += 1
+            if target.state == 'unknown' or target.streak >= (self.rise if ok else self.fall):
+                self._transition(target, state, now)
+        self._update_flapping(target, now)
+
+    def _transition(self, target: MonitorTarget, state: str, now: float):
+        if target.state != 'unknown':
+            target.transitions.append(now)
+        target.state = state
+        target.changed_at = now
+        target.streak = 0
+        self._emit(state, target)
+
+    def _update_flapping(self, target: MonitorTarget, now: float):
+        cutoff = now - self.flap_window
+        while target.transitions and target.transitions[0] < cutoff:
+            target.transitions.popleft()
+        flapping = len(target.transitions) >= self.flap_threshold
+        if flapping != target.flapping:
+            target.flapping = flapping
+            self._emit('flapping' if flapping else 'stable', target)
+
+    def _emit(self, event: str, target: MonitorTarget):
+        if self.on_event:
+            try:
+                self.on_event(event, target.info())
+            except Exception:
+                pass
+
+
+def _raise_fd_limit(wanted: int):
+    """Lift the soft open-file limit towards wanted (up to the hard limit)"""
+    try:
+        import resource
+    except ImportError:
+        return
+    try:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+    except (ValueError, OSError):
+        pass
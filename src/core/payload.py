@@ -0,0 +1,71 @@
+"""Binary payload parsing and hex-dump formatting"""
+import base64
+import binascii
+import re
+from typing import Optional
+
+# Input formats accepted by parse_payload (files are sent with AppLogic.send_file)
+PAYLOAD_FORMATS = ('text', 'hex', 'base64')
+
+_ESCAPES = {'n': b'\n', 'r': b'\r', 't': b'\t', '0': b'\0', '\\': b'\\'}
+_ESCAPE_RE = re.compile(r'\\(x[0-9a-fA-F]{2}|.)', re.DOTALL)
+
+
+def decode_escapes(text: str) -> bytes:
+    """
+    Bytes for a payload typed by the user: backslash escapes (\\n, \\r,
+    \\t, \\0, \\\\, \\xNN) become those raw bytes and everything else,
+    including non-ASCII text, is UTF-8. Unknown escapes are kept as written.
+    """
+    out = bytearray()
+    pos = 0
+    for match in _ESCAPE_RE.finditer(text):
+        out += text[pos:match.start()].encode('utf-8')
+        escape = match.group(1)
+        if escape[0] == 'x' and len(escape) == 3:
+            out.append(int(escape[1:], 16))
+        else:
+            out += _ESCAPES.get(escape, match.group(0).encode('utf-8'))
+        pos = match.end()
+    out += text[pos:].encode('utf-8')
+    return bytes(out)
+
+
+def parse_payload(text: str, fmt: str = 'text') -> bytes:
+    """
+    Convert user input to bytes.
+    'text' is UTF-8; 'hex' accepts whitespace, ':' separators and 0x
+    prefixes ("de ad:be 0xef"); 'base64' is strict. Raises ValueError.
+    """
+    if fmt == 'text':
+        return text.encode('utf-8')
+    if fmt == 'hex':
+        digits = text.replace('0x', ' ').replace('0X', ' ').replace(':', ' ')
+        try:
+            return bytes.fromhex(digits)
+        except ValueError:
+            raise ValueError('Invalid hex payload')
+    if fmt == 'base64':
+        try:
+            return base64.b64decode(''.join(text.split()), validate=True)
+        except (binascii.Error, ValueError):
+            raise ValueError('Invalid base64 payload')
+    raise ValueError(f'Unknown payload format: {fmt}')
+
+
+def hexdump(data, width: int = 16, max_lines: Optional[int] = None) -> list:
+    """
+    Classic offset / hex / ASCII dump of data, one string per line.
+    With max_lines, longer dumps end with a '... N more bytes' line.
+    """
+    view = memoryview(data).cast('B')
+    lines = []
+    for offset in range(0, len(view), width):
+        if max_lines is not None and len(lines) == max_lines:
+            lines.append(f'... {len(view) - offset} more bytes')
+            break
+        row = view[offset:offset + width]
+        hex_part = ' '.join(f'{b:02x}' for b in row)
+        text_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in row)
+        lines.append(f'{offset:08x}  {hex_part:<{width * 3 - 1}}  |{text_part}|')
+    return lines
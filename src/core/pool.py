@@ -0,0 +1,151 @@
+"""Keep-alive pool of idle connections for repeated targets"""
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Optional
+
+# linux/tcp.h: first byte of struct tcp_info
+TCP_ESTABLISHED = 1
+
+
+def configure_keepalive(sock, idle: int = 30, interval: int = 10, count: int = 3):
+    """Enable TCP keep-alive probes on sock (tuning options are Linux-specific)"""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (('TCP_KEEPIDLE', idle), ('TCP_KEEPINTVL', interval),
+                          ('TCP_KEEPCNT', count)):
+        if hasattr(socket, option):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+            except OSError:
+                pass
+
+
+def is_healthy(sock) -> bool:
+    """
+    Check that an idle connection can be reused.
+    It must still be established and have no unread data (a FIN, RST or
+    stray bytes from the peer all make it unusable).
+    """
+    try:
+        if hasattr(socket, 'TCP_INFO'):
+            state = struct.unpack('B', sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 1))[0]
+            if state != TCP_ESTABLISHED:
+                return False
+        readable, _, _ = select.select([sock], [], [], 0)
+        return not readable
+    except (OSError, ValueError):
+        return False
+
+
+class ConnectionPool:
+    """
+    Idle TCP connections keyed by (ip, port, tag), kept alive for reuse.
+
+    Released sockets get SO_KEEPALIVE with tuned idle/interval/count so
+    dead peers are detected, and are health-checked again on acquire.
+    The metadata stored alongside each socket (remote OS, gateway flag)
+    lets a reused connection skip TTL/OS probing entirely.
+    """
+
+    def __init__(self, max_idle_per_target: int = 2, max_idle: int = 32,
+                 idle_timeout: float = 300.0, keepalive_idle: int = 30,
+                 keepalive_interval: int = 10, keepalive_count: int = 3):
+        self.max_idle_per_target = max_idle_per_target
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.keepalive = (keepalive_idle, keepalive_interval, keepalive_count)
+        self.hits = 0
+        self.misses = 0
+        self._idle = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, ip: str, port: int, tag: str = '') -> Optional[tuple]:
+        """
+        Take a warm connection for (ip, port) released with the same tag
+        (e.g. the connection profile its socket was set up with).
+        Returns (socket, metadata) or None if no healthy one is available.
+        """
+        with self._lock:
+            entries = self._idle.get((ip, port, tag), [])
+            while entries:
+                sock, metadata, released_at = entries.pop()
+                self._count -= 1
+                if time.monotonic() - released_at < self.idle_timeout and is_healthy(sock):
+                    self.hits += 1
+                    return sock, metadata
+                _close(sock)
+            self._idle.pop((ip, port, tag), None)
+            self.misses += 1
+            return None
+
+    def release(self, ip: str, port: int, sock, metadata: Optional[dict] = None,
+                tag: str = '') -> bool:
+        """
+        Return a connection to the pool.
+        Returns True if it was kept, False if it was closed instead.
+        """
+        if not is_healthy(sock):
+            _close(sock)
+            return False
+        try:
+            configure_keepalive(sock, *self.keepalive)
+        except OSError:
+            _close(sock)
+            return False
+
+        with self._lock:
+            self._prune()
+            entries = self._idle.get((ip, port, tag))
+            if entries and len(entries) >= self.max_idle_per_target:
+                _close(entries.pop(0)[0])
+                self._count -= 1
+            elif self._count >= self.max_idle:
+                self._evict_oldest()
+            self._idle.setdefault((ip, port, tag), []).append(
+                (sock, dict(metadata or {}), time.monotonic()))
+            self._count += 1
+        return True
+
+    def idle_count(self) -> int:
+        return self._count
+
+    def clear(self):
+        """Close every idle connection"""
+        with self._lock:
+            for entries in self._idle.values():
+                for sock, _, _ in entries:
+                    _close(sock)
+            self._idle.clear()
+            self._count = 0
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for key in list(self._idle):
+            kept = []
+            for entry in self._idle[key]:
+                if entry[2] >= cutoff:
+                    kept.append(entry)
+                else:
+                    _close(entry[0])
+                    self._count -= 1
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+
+    def _evict_oldest(self):
+        oldest_key = min(self._idle, key=lambda k: self._idle[k][0][2])
+        _close(self._idle[oldest_key].pop(0)[0])
+        self._count -= 1
+        if not self._idle[oldest_key]:
+            del self._idle[oldest_key]
+
+
+def _close(sock):
+    try:
+        sock.close()
+    except OSError:
+        pass
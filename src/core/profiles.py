@@ -0,0 +1,217 @@
+"""
+Connection profiles: per-connection socket tuning.
+
+A profile bundles where a connection is made from (source address or
+interface), how its socket is tuned (Nagle, buffer sizes, delayed ACKs,
+user timeout, TCP Fast Open for payload-first connects) and how long to
+wait for the handshake and for reads. Built-in presets cover
+small-message control ports and bulk transfers; more can be added in
+profiles.json under the config directory.
+"""
+import json
+import os
+import socket
+from typing import Optional
+
+# Linux option numbers (linux/tcp.h, asm-generic/socket.h) that not every
+# Python build exports; setting them elsewhere fails and is skipped
+SO_BINDTODEVICE = getattr(socket, 'SO_BINDTODEVICE', 25)
+TCP_QUICKACK = getattr(socket, 'TCP_QUICKACK', 12)
+TCP_USER_TIMEOUT = getattr(socket, 'TCP_USER_TIMEOUT', 18)
+
+# How long send_message waits for a response before reporting "no response"
+RESPONSE_WAIT = 1.0
+
+
+def default_profiles_path() -> str:
+    """Return the path of the user's connection profile file"""
+    base = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(base, 'linxtap', 'profiles.json')
+
+
+class ConnectionProfile:
+    """
+    Socket options for one kind of connection.
+
+    bind_address pins the source IP (and with it the address family);
+    bind_device pins the interface (SO_BINDTODEVICE, needs CAP_NET_RAW).
+    sndbuf/rcvbuf are set before connecting so the window scale is
+    negotiated for them (the kernel caps them at net.core.[wr]mem_max).
+    quickack turns off delayed ACKs; Linux clears it again as the
+    connection runs, so rearm() is called after every read.
+    user_timeout_ms bounds how long unacknowledged data may stay in
+    flight before the connection is dropped (TCP_USER_TIMEOUT).
+    fastopen sends the first message in the SYN (MSG_FASTOPEN) once the
+    server has handed out a Fast Open cookie. It only applies where a
+    connection starts with a payload: AppLogic.connect with first_payload
+    (cli connect -m) and the load generator. Elsewhere it does nothing, as
+    TCP_FASTOPEN_CONNECT would make connect() succeed before any handshake
+    and a connection would be reported (and fingerprinted) before the
+    server was known to be there.
+    """
+
+    FIELDS = ('bind_address', 'bind_device', 'nodelay', 'sndbuf', 'rcvbuf', 'quickack',
+              'user_timeout_ms', 'connect_timeout', 'read_timeout', 'fastopen')
+
+    def __init__(self, name: str, description: str = '', bind_address: Optional[str] = None,
+                 bind_device: Optional[str] = None, nodelay: bool = False,
+                 sndbuf: Optional[int] = None, rcvbuf: Optional[int] = None,
+                 quickack: bool = False, user_timeout_ms: Optional[int] = None,
+                 connect_timeout: float = 5.0, read_timeout: float = 5.0,
+                 fastopen: bool = False):
+        if connect_timeout <= 0 or read_timeout <= 0:
+            raise ValueError('Timeouts must be positive')
+        self.name = name
+        self.description = description
+        self.bind_address = bind_address or None
+        self.bind_device = bind_device or None
+        self.nodelay = bool(nodelay)
+        self.sndbuf = sndbuf
+        self.rcvbuf = rcvbuf
+        self.quickack = bool(quickack)
+        self.user_timeout_ms = user_timeout_ms
+        self.connect_timeout = float(connect_timeout)
+        self.read_timeout = float(read_timeout)
+        self.fastopen = bool(fastopen)
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> 'ConnectionProfile':
+        """Build a profile from a profiles.json entry; raises ValueError"""
+        unknown = set(data) - set(cls.FIELDS) - {'description'}
+        if unknown:
+            raise ValueError(f"Unknown profile option(s) for {name}: {', '.join(sorted(unknown))}")
+        try:
+            return cls(name, **data)
+        except TypeError as e:
+            raise ValueError(f'Invalid profile {name}: {e}')
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def filter_addresses(self, addresses: list) -> list:
+        """Drop resolve_addresses() entries the bind address cannot reach"""
+        if not self.bind_address:
+            return addresses
+        family = socket.AF_INET6 if ':' in self.bind_address else socket.AF_INET
+        return [entry for entry in addresses if entry[0] == family]
+
+    def prepare(self, sock: socket.socket):
+        """
+        Apply the options that must be set before connect().
+        Raises OSError if the socket cannot be bound as asked; tuning
+        the platform does not support is skipped.
+        """
+        if self.bind_device:
+            sock.setsockopt(socket.SOL_SOCKET, SO_BINDTODEVICE, self.bind_device.encode())
+        if self.bind_address:
+            sock.bind((self.bind_address, 0))
+        if self.sndbuf:
+            _try_setsockopt(sock, socket.SOL_SOCKET, socket.SO_SNDBUF, self.sndbuf)
+        if self.rcvbuf:
+            _try_setsockopt(sock, socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        if self.nodelay:
+            _try_setsockopt(sock, socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.user_timeout_ms:
+            _try_setsockopt(sock, socket.IPPROTO_TCP, TCP_USER_TIMEOUT, self.user_timeout_ms)
+
+    def tune(self, sock: socket.socket):
+        """Apply the options for an established connection (new or reused)"""
+        sock.settimeout(self.read_timeout)
+        if self.nodelay:
+            _try_setsockopt(sock, socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rearm(sock)
+
+    def rearm(self, sock: socket.socket):
+        """Re-enable quick ACKs (Linux drops back to delayed ACKs on its own)"""
+        if self.quickack:
+            _try_setsockopt(sock, socket.IPPROTO_TCP, TCP_QUICKACK, 1)
+
+    @property
+    def response_wait(self) -> float:
+        """Seconds send_message waits for a response"""
+        return min(RESPONSE_WAIT, self.read_timeout)
+
+    def __repr__(self):
+        return f'ConnectionProfile({self.name!r})'
+
+
+def _try_setsockopt(sock: socket.socket, level: int, option: int, value: int) -> bool:
+    try:
+        sock.setsockopt(level, option, value)
+        return True
+    except OSError:
+        return False
+
+
+# Built-in presets, in the order they are offered
+PROFILES = {
+    'default': ConnectionProfile(
+        'default', 'Kernel defaults, 5 s connect and read timeouts'),
+    'low-latency': ConnectionProfile(
+        'low-latency', 'Small request/response messages on control ports',
+        nodelay=True, quickack=True, user_timeout_ms=3000,
+        connect_timeout=2.0, read_timeout=2.0, fastopen=True),
+    'bulk': ConnectionProfile(
+        'bulk', 'Large buffers for high bandwidth-delay links',
+        sndbuf=4 << 20, rcvbuf=4 << 20, user_timeout_ms=60000,
+        connect_timeout=10.0, read_timeout=30.0),
+}
+
+
+# path -> ((mtime_ns, size) of the file when parsed, profiles)
+_loaded = {}
+
+
+def load_profiles(path: Optional[str] = None) -> dict:
+    """
+    Built-in presets plus those in profiles.json ({"name": {option: value}}),
+    which may override a preset. A missing file is not an error; an
+    unreadable or invalid one raises ValueError.
+    The parsed file is cached until its modification time or size changes,
+    so connecting by profile name costs one stat().
+    """
+    path = path or default_profiles_path()
+    try:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        version = None
+    cached = _loaded.get(path)
+    if cached and cached[0] == version:
+        return dict(cached[1])
+    profiles = _read_profiles(path)
+    _loaded[path] = (version, profiles)
+    return dict(profiles)
+
+
+def _read_profiles(path: str) -> dict:
+    profiles = dict(PROFILES)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return profiles
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f'Cannot read profiles from {path}: {e}')
+    if not isinstance(data, dict):
+        raise ValueError(f'{path} must contain an object of profiles')
+    for name, options in data.items():
+        if not isinstance(options, dict):
+            raise ValueError(f'Invalid profile {name}: expected an object')
+        profiles[name] = ConnectionProfile.from_dict(name, options)
+    return profiles
+
+
+def get_profile(profile=None, path: Optional[str] = None) -> ConnectionProfile:
+    """
+    Resolve a profile name (or None for 'default') to a ConnectionProfile;
+    ConnectionProfile instances are returned as is. Raises ValueError.
+    """
+    if isinstance(profile, ConnectionProfile):
+        return profile
+    if profile is None:
+        profile = 'default'
+    profiles = load_profiles(path)
+    if profile not in profiles:
+        raise ValueError(f'Unknown connection profile: {profile}')
+    return profiles[profile]
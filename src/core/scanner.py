@@ -0,0 +1,221 @@
+"""Parallel multi-host / multi-port TCP scanning"""
+import asyncio
+import errno
+import heapq
+import ipaddress
+import itertools
+import socket
+import time
+from typing import Iterable, Optional
+
+from src.core.fingerprint import identify
+from src.utils.network import SynAckSniffer, is_gateway
+
+
+def expand_targets(targets) -> Iterable[str]:
+    """
+    Expand IP addresses and CIDR ranges into individual host addresses.
+    Accepts a comma-separated string or an iterable of strings.
+    All entries are validated up front (ValueError if malformed); the hosts
+    themselves are generated lazily.
+    """
+    if isinstance(targets, str):
+        targets = targets.split(',')
+
+    networks = [ipaddress.ip_network(t.strip(), strict=False)
+                for t in targets if t.strip()]
+    if not networks:
+        raise ValueError('No targets given')
+    return _iter_hosts(networks)
+
+
+def _iter_hosts(networks):
+    for network in networks:
+        if network.num_addresses == 1:
+            yield str(network.network_address)
+        else:
+            # hosts() skips network/broadcast addresses (except /31, /127)
+            for host in network.hosts():
+                yield str(host)
+
+
+def parse_ports(spec) -> list:
+    """
+    Parse a port list such as '22,80,8000-8010' into sorted port numbers.
+    Raises ValueError for malformed or out-of-range entries.
+    """
+    if isinstance(spec, int):
+        spec = str(spec)
+
+    ports = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = (int(p) for p in part.split('-', 1))
+        else:
+            start = end = int(part)
+        if start < 1 or end > 65535 or start > end:
+            raise ValueError(f'Invalid port range: {part}')
+        ports.update(range(start, end + 1))
+
+    if not ports:
+        raise ValueError('No ports given')
+    return sorted(ports)
+
+
+class HostRateLimiter:
+    """
+    Spaces out connection attempts to each host.
+    Each host gets its own schedule, so rate limits do not slow other hosts.
+    """
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+
+    def reserve(self, host: str) -> float:
+        """Book the host's next free slot and return its (monotonic) time"""
+        now = time.monotonic()
+        if not self.interval:
+            return now
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        return slot
+
+    async def wait(self, host: str):
+        delay = self.reserve(host) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PortScanner:
+    """
+    Non-blocking TCP connect scanner.
+
+    Runs at most `concurrency` connects at once and yields one result dict
+    per (host, port) as soon as it completes:
+    'ip', 'port', 'status' ('open', 'closed', 'filtered' or 'error'),
+    'rtt_ms', 'ttl', 'remote_os', 'is_gateway' and 'message'.
+    """
+
+    def __init__(self, concurrency: int = 256, timeout: float = 1.0,
+                 per_host_rate: Optional[float] = None):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.per_host_rate = per_host_rate
+
+    async def scan(self, targets, ports):
+        """Async generator yielding results in completion order"""
+        ports = parse_ports(ports) if isinstance(ports, (str, int)) else list(ports)
+        hosts = expand_targets(targets)
+        jobs = ((ip, port) for ip in hosts for port in ports)
+        results = asyncio.Queue(maxsize=self.concurrency * 2)
+        limiter = HostRateLimiter(self.per_host_rate)
+        sniffer = SynAckSniffer.open()
+        done = object()
+        # Jobs whose host is rate limited wait here, (slot, n, ip, port), so
+        # workers move on to other hosts instead of sleeping on them
+        deferred = []
+        order = itertools.count()
+
+        async def worker():
+            # Workers pull lazily so huge ranges never materialise in memory
+            while True:
+                now = time.monotonic()
+                if deferred and deferred[0][0] <= now:
+                    _, _, ip, port = heapq.heappop(deferred)
+                else:
+                    job = next(jobs, None) if len(deferred) < self.concurrency else None
+                    if job is None:
+                        if not deferred:
+                            return
+                        await asyncio.sleep(deferred[0][0] - now)
+                        continue
+                    ip, port = job
+                    slot = limiter.reserve(ip)
+                    if slot > now:
+                        heapq.heappush(deferred, (slot, next(order), ip, port))
+                        continue
+                await results.put(await self.probe(ip, port, sniffer))
+
+        async def finish():
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(done)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        finisher = asyncio.create_task(finish())
+        try:
+            while True:
+                result = await results.get()
+                if result is done:
+                    break
+                yield result
+        finally:
+            for task in workers + [finisher]:
+                task.cancel()
+            await asyncio.gather(*workers, finisher, return_exceptions=True)
+            if sniffer:
+                sniffer.close()
+
+    async def probe(self, ip: str, port: int, sniffer: Optional[SynAckSniffer] = None) -> dict:
+        """Attempt one non-blocking connect and classify the outcome"""
+        result = {
+            'ip': ip,
+            'port': port,
+            'status': 'error',
+            'rtt_ms': None,
+            'ttl': None,
+            'remote_os': None,
+            'is_gateway': is_gateway(ip),
+            'message': '',
+        }
+
+        loop = asyncio.get_running_loop()
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError as e:
+            # e.g. EMFILE: report it rather than lose the worker
+            result['message'] = str(e)
+            return result
+        sock.setblocking(False)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), self.timeout)
+            result['rtt_ms'] = (time.perf_counter() - start) * 1000
+            result['status'] = 'open'
+            fingerprint = identify(sock, sniffer)
+            result['ttl'] = fingerprint['ttl']
+            result['remote_os'] = fingerprint['remote_os']
+        except asyncio.TimeoutError:
+            result['status'] = 'filtered'
+            result['message'] = 'No response'
+        except ConnectionRefusedError:
+            result['rtt_ms'] = (time.perf_counter() - start) * 1000
+            result['status'] = 'closed'
+            result['message'] = 'Connection refused'
+        except OSError as e:
+            if e.errno in (errno.EHOSTUNREACH, errno.ENETUNREACH):
+                result['status'] = 'filtered'
+            result['message'] = str(e)
+        finally:
+            sock.close()
+
+        return result
+
+    def run(self, targets, ports, callback=None) -> list:
+        """
+        Blocking helper: scan and return all results.
+        callback(result) is invoked for each result as it arrives.
+        """
+        async def collect():
+            collected = []
+            async for result in self.scan(targets, ports):
+                if callback:
+                    callback(result)
+                collected.append(result)
+            return collected
+
+        return asyncio.run(collect())
@@ -0,0 +1,430 @@
+"""Many concurrent connections serviced by one selector loop"""
+import errno
+import itertools
+import logging
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+
+from src.core.app_logic import validate_target
+from src.core.fingerprint import identify
+from src.core.framing import make_framer
+from src.utils.network import HAPPY_EYEBALLS_DELAY, SynAckSniffer, is_gateway
+from src.utils.resolver import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+class Session:
+    """State of one connection owned by a SessionManager"""
+
+    def __init__(self, session_id: str, ip: str, port: int, framer):
+        self.id = session_id
+        self.ip = ip
+        self.port = port
+        self.framer = framer
+        self.state = 'connecting'
+        self.sock = None
+        self.remote_os = None
+        self.is_gateway_device = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.messages_in = 0
+        self.messages_out = 0
+        self.errors = 0
+        self.last_error = None
+        self.connected_at = None
+        self.deadline = None
+        self.addresses = None
+        # Happy Eyeballs: connects in flight, and when the next address starts
+        self.attempts = []
+        self.next_attempt = None
+        self.outbox = deque()
+
+    def info(self) -> dict:
+        """Snapshot of this session's state and counters"""
+        return {
+            'session_id': self.id,
+            'ip': self.ip,
+            'port': self.port,
+            'state': self.state,
+            'remote_os': self.remote_os,
+            'is_gateway': self.is_gateway_device,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'messages_in': self.messages_in,
+            'messages_out': self.messages_out,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'connected_at': self.connected_at,
+        }
+
+
+class SessionManager:
+    """
+    Holds many concurrent sessions keyed by id.
+
+    All sockets are non-blocking and serviced by a single selector thread;
+    other threads talk to it through a command queue and a wake-up socket.
+    on_event(event, session_id, payload) is called on the loop thread with
+    event one of 'connected', 'message' (payload: bytes), 'sent'
+    (payload: byte count), 'error' (payload: message) and 'closed'
+    (payload: reason).
+    """
+
+    def __init__(self, on_event=None, connect_timeout: float = 5.0,
+                 chunk_size: int = 65536):
+        self.on_event = on_event
+        self.connect_timeout = connect_timeout
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self._commands = deque()
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._chunk = bytearray(chunk_size)
+        self._sniffer = SynAckSniffer.open()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='linxtap-sessions', daemon=True)
+        self._thread.start()
+
+    # --- API (any thread) -------------------------------------------------
+
+    def open_session(self, ip: str, port: str, framer=None) -> dict:
+        """
+        Start connecting a new session.
+        Returns a dict with 'status' ('connecting' or 'error'), 'message'
+        and, on success, 'session_id'.
+        """
+        port_num, error = validate_target(ip, port)
+        if error:
+            return error
+
+        session_id = f"s{next(self._ids)}"
+        session = Session(session_id, ip, port_num, framer or make_framer('raw'))
+        self.sessions[session_id] = session
+        self._call(self._start_connect, session)
+        return {
+            'status': 'connecting',
+            'message': f'Connecting to {ip}:{port_num}',
+            'session_id': session_id
+        }
+
+    def send(self, session_id: str, data) -> dict:
+        """
+        Queue data (str or bytes) for sending; never blocks.
+        Returns a dict with 'status' and 'message' keys.
+        """
+        session = self.sessions.get(session_id)
+        if session is None or session.state not in ('connecting', 'connected'):
+            return {
+                'status': 'error',
+                'message': 'Not connected to any device'
+            }
+        if not data:
+            return {
+                'status': 'error',
+                'message': 'Message cannot be empty'
+            }
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._call(self._queue_send, session, bytes(data))
+        return {
+            'status': 'queued',
+            'message': f'Queued {len(data)} bytes',
+            'bytes_queued': len(data)
+        }
+
+    def close_session(self, session_id: str):
+        """Close a session and forget it"""
+        session = self.sessions.get(session_id)
+        if session:
+            self._call(self._close, session, 'Closed by user', True)
+
+    def get(self, session_id: str):
+        """Return the info dict for a session, or None"""
+        session = self.sessions.get(session_id)
+        return session.info() if session else None
+
+    def list_sessions(self) -> list:
+        """Return info dicts for all sessions"""
+        return [session.info() for session in list(self.sessions.values())]
+
+    def shutdown(self, timeout: float = 2.0):
+        """Close every session and stop the loop thread"""
+        self._call(self._stop)
+        self._thread.join(timeout)
+
+    # --- loop thread ------------------------------------------------------
+
+    def _call(self, func, *args):
+        self._commands.append((func, args))
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Wake-up already pending, or shutting down
+
+    def _run(self):
+        while self._running:
+            events = self._selector.select(self._next_timeout())
+            for key, mask in events:
+                if key.data is None:
+                    self._drain_commands()
+                    continue
+                session = key.data
+                if key.fileobj is not session.sock and key.fileobj not in session.attempts:
+                    continue  # Closed earlier in this batch
+                try:
+                    self._handle_events(session, mask, key.fileobj)
+                except Exception as e:
+                    # A bug in one session closes that session, not the loop
+                    logger.exception('Session %s failed', session.id)
+                    self._close(session, f'Internal error: {str(e)}')
+            self._expire_connects()
+
+        for session in list(self.sessions.values()):
+            self._close(session, 'Manager shut down', True)
+        self._selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+        if self._sniffer:
+            self._sniffer.close()
+
+    def _handle_events(self, session: Session, mask: int, sock):
+        if session.state == 'connecting':
+            self._finish_connect(session, sock)
+            return
+        if mask & selectors.EVENT_READ:
+            self._handle_read(session)
+        if mask & selectors.EVENT_WRITE and session.state == 'connected':
+            self._handle_write(session)
+
+    def _drain_commands(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        while self._commands:
+            func, args = self._commands.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                # One bad command must not take the loop (and every session) down
+                logger.exception('Session command %s failed', getattr(func, '__name__', func))
+                session = args[0] if args and isinstance(args[0], Session) else None
+                if session is not None:
+                    self._emit('error', session, f'Internal error: {str(e)}')
+
+    def _next_timeout(self):
+        deadlines = [deadline for s in list(self.sessions.values())
+                     for deadline in (s.deadline, s.next_attempt) if deadline]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _emit(self, event: str, session: Session, payload=None):
+        if self.on_event:
+            try:
+                self.on_event(event, session.id, payload)
+            except Exception:
+                pass
+
+    def _start_connect(self, session: Session):
+        if session.addresses is None:
+            # One deadline for resolving and for all of the host's addresses
+            session.deadline = time.monotonic() + self.connect_timeout
+            lookup = get_resolver().resolve_async(session.ip, session.port)
+            if lookup.done():
+                self._on_resolved(session, lookup)
+            else:
+                # Resolve on the resolver's threads; the loop keeps servicing others
+                lookup.add_done_callback(lambda f: self._call(self._on_resolved, session, f))
+            return
+
+        family, address = session.addresses.pop(0)
+        sock = None
+        try:
+            # No IPv6 stack, out of descriptors: this address fails, the others are tried
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            err = sock.connect_ex(address)
+        except OSError as e:
+            if sock:
+                sock.close()
+            self._next_address_or_fail(session, e.errno)
+            return
+        if err not in (0, errno.EINPROGRESS):
+            sock.close()
+            self._next_address_or_fail(session, err)
+            return
+        session.attempts.append(sock)
+        self._selector.register(sock, selectors.EVENT_WRITE, session)
+        # Still pending by then: race the next address (RFC 8305), keep whichever connects
+        session.next_attempt = (time.monotonic() + HAPPY_EYEBALLS_DELAY
+                                if session.addresses else None)
+
+    def _on_resolved(self, session: Session, lookup):
+        if session.state != 'connecting' or session.addresses is not None:
+            return  # Closed or timed out while resolving
+        try:
+            addresses = lookup.result()
+        except socket.gaierror:
+            self._fail(session, f'Error: Invalid IP address {session.ip}')
+            return
+        if not addresses:
+            self._fail(session, f'Error: Invalid IP address {session.ip}')
+            return
+        session.addresses = list(addresses)
+        self._start_connect(session)
+
+    def _next_address_or_fail(self, session: Session, err: int):
+        """
+        Dual-stack hosts: a failed attempt starts the next address (alternating
+        family) at once; the session fails when no address is left to try
+        """
+        if session.addresses:
+            self._start_connect(session)
+        elif not session.attempts:
+            self._fail(session, self._connect_error(session, err))
+
+    def _finish_connect(self, session: Session, sock):
+        session.attempts.remove(sock)
+        err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            self._selector.unregister(sock)
+            sock.close()
+            self._next_address_or_fail(session, err)
+            return
+
+        # First to connect wins; the other attempts are abandoned
+        self._close_attempts(session)
+        session.addresses = []
+        session.sock = sock
+        session.deadline = None
+        session.state = 'connected'
+        session.connected_at = time.time()
+        # The connected address: session.ip may be a host name
+        session.is_gateway_device = is_gateway(session.sock.getpeername()[0])
+        session.remote_os = identify(session.sock, self._sniffer)['remote_os']
+        self._update_interest(session)
+        self._emit('connected', session, session.info())
+
+    def _expire_connects(self):
+        now = time.monotonic()
+        for session in list(self.sessions.values()):
+            if session.deadline and session.deadline <= now:
+                self._fail(session, f'Error: Connection timeout to {session.ip}:{session.port}')
+            elif session.next_attempt and session.next_attempt <= now:
+                session.next_attempt = None
+                self._start_connect(session)
+
+    def _handle_read(self, session: Session):
+        view = memoryview(self._chunk)
+        try:
+            n = session.sock.recv_into(view)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._close(session, f'Connection error: {str(e)}')
+            return
+        if n == 0:
+            self._close(session, 'Connection closed by remote device')
+            return
+        session.bytes_in += n
+        try:
+            messages = session.framer.feed(view[:n])
+        except ValueError as e:
+            # Framing error (e.g. an oversized length prefix): the stream is lost
+            self._close(session, str(e))
+            return
+        for message in messages:
+            session.messages_in += 1
+            self._emit('message', session, message)
+
+    def _queue_send(self, session: Session, data: bytes):
+        if session.state in ('connecting', 'connected'):
+            session.outbox.append(memoryview(data))
+            if session.state == 'connected':
+                self._update_interest(session)
+
+    def _handle_write(self, session: Session):
+        while session.outbox:
+            chunk = session.outbox[0]
+            try:
+                sent = session.sock.send(chunk)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                self._close(session, f'Connection error: {str(e)}')
+                return
+            session.bytes_out += sent
+            if sent < len(chunk):
+                session.outbox[0] = chunk[sent:]
+                break
+            session.outbox.popleft()
+            session.messages_out += 1
+            self._emit('sent', session, len(chunk))
+        self._update_interest(session)
+
+    def _update_interest(self, session: Session):
+        events = selectors.EVENT_READ
+        if session.outbox:
+            events |= selectors.EVENT_WRITE
+        self._selector.modify(session.sock, events, session)
+
+    def _connect_error(self, session: Session, err: int) -> str:
+        if err == errno.ECONNREFUSED:
+            return f'Error: Connection refused by {session.ip}:{session.port}'
+        return f'Error: {errno.errorcode.get(err, err)} ({session.ip}:{session.port})'
+
+    def _fail(self, session: Session, message: str):
+        session.errors += 1
+        session.last_error = message
+        self._release(session)
+        session.state = 'error'
+        self._emit('error', session, message)
+
+    def _close(self, session: Session, reason: str, forget: bool = False):
+        was_open = session.state in ('connecting', 'connected')
+        self._release(session)
+        if was_open:
+            session.state = 'closed'
+            self._emit('closed', session, reason)
+        if forget:
+            self.sessions.pop(session.id, None)
+
+    def _release(self, session: Session):
+        session.deadline = None
+        session.outbox.clear()
+        self._close_attempts(session)
+        self._close_socket(session)
+
+    def _close_attempts(self, session: Session):
+        session.next_attempt = None
+        for sock in session.attempts:
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+        session.attempts = []
+
+    def _close_socket(self, session: Session):
+        if session.sock:
+            try:
+                self._selector.unregister(session.sock)
+            except (KeyError, ValueError):
+                pass
+            try:
+                session.sock.close()
+            except OSError:
+                pass
+            session.sock = None
+
+    def _stop(self):
+        self._running = False
@@ -0,0 +1,149 @@
+"""Run AppLogic jobs on a worker thread and report back through Qt signals"""
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class JobSignals(QObject):
+    """Signals carried by a LogicJob (QRunnable itself cannot emit)"""
+    finished = Signal(str, object, dict)
+
+
+class ReceiverSignals(QObject):
+    """
+    Relays StreamReceiver callbacks (reader thread) to the GUI thread.
+    Pass message_received.emit / closed.emit as the receiver callbacks.
+    """
+    message_received = Signal(bytes)
+    closed = Signal(str)
+
+
+class LocalInfoSignals(QObject):
+    """
+    Delivers the local hostname/address probe, and the host cache and
+    session journal it opens, from a plain thread to the GUI thread
+    """
+    ready = Signal(dict)
+    stores_ready = Signal(object, object)
+
+
+class LogicJob(QRunnable):
+    """
+    A single blocking call (connect, send, disconnect) executed on the pool.
+    The result dict is emitted together with the job name and its arguments.
+    """
+
+    def __init__(self, name: str, func, *args):
+        super().__init__()
+        self.name = name
+        self.func = func
+        self.args = args
+        self.signals = JobSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            result = {
+                'status': 'error',
+                'message': f'Error: Unexpected error - {str(e)}'
+            }
+        self.signals.finished.emit(self.name, self.args, result)
+
+
+class LogicExecutor(QObject):
+    """
+    Execution layer between the UI and AppLogic.
+
+    Jobs are queued on a private single-thread QThreadPool so they run one
+    at a time and in submission order (AppLogic owns a single socket and is
+    not thread-safe). Results are delivered on the GUI thread through the
+    job_finished signal as (name, args, result).
+    """
+    job_started = Signal(str)
+    job_finished = Signal(str, object, dict)
+
+    def __init__(self, logic, parent=None):
+        super().__init__(parent)
+        self.logic = logic
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._pending = 0
+
+    def submit_connect(self, ip: str, port: str, profile=None):
+        """Queue AppLogic.connect (toggles to disconnect when connected)"""
+        if profile is None:
+            self._submit('connect', self.logic.connect, ip, port)
+        else:
+            self._submit('connect', self.logic.connect, ip, port, profile)
+
+    def submit_send(self, message):
+        """Queue AppLogic.send_message (str or bytes)"""
+        self._submit('send', self.logic.send_message, message)
+
+    def submit_send_file(self, path: str):
+        """Queue AppLogic.send_file"""
+        self._submit('send_file', self.logic.send_file, path)
+
+    def submit_disconnect(self):
+        """Queue AppLogic.disconnect"""
+        self._submit('disconnect', self.logic.disconnect)
+
+    def submit_start_receiving(self, on_message, framer, on_closed=None):
+        """Queue AppLogic.start_receiving, e.g. to restart it with another framer"""
+        self._submit('receive', self._start_receiving, on_message, framer, on_closed)
+
+    def _start_receiving(self, on_message, framer, on_closed) -> dict:
+        # Runs on the worker thread
+        if not self.logic.start_receiving(on_message, framer, on_closed=on_closed):
+            return {'status': 'error', 'message': 'Not connected to any device'}
+        return {'status': 'receiving', 'message': f'Receiving ({framer.name} framing)'}
+
+    def is_busy(self) -> bool:
+        """Return True while any job is queued or running"""
+        return self._pending > 0
+
+    def shutdown(self, timeout_ms: int = 6000) -> bool:
+        """Wait for queued jobs to finish. Returns False on timeout."""
+        self._pool.clear()
+        return self._pool.waitForDone(timeout_ms)
+
+    def _submit(self, name: str, func, *args):
+        job = LogicJob(name, func, *args)
+        # The executor lives on the GUI thread, so this is a queued connection
+        job.signals.finished.connect(self._on_job_finished)
+        self._pending += 1
+        self.job_started.emit(name)
+        self._pool.start(job)
+
+    @Slot(str, object, dict)
+    def _on_job_finished(self, name: str, args, result: dict):
+        self._pending -= 1
+        self.job_finished.emit(name, args, result)
+
+
+class AsyncBridge(QObject):
+    """
+    Bridges coroutine-based engines (AsyncAppLogic) to the Qt event loop.
+
+    Coroutines run on an EventLoopThread; their results are emitted from
+    that thread and Qt queues them onto the GUI thread, in the spirit of
+    qasync but without replacing the Qt event loop.
+    """
+    job_finished = Signal(str, object, dict)
+
+    def __init__(self, loop_thread=None, parent=None):
+        super().__init__(parent)
+        # Imported here so plain LogicExecutor users don't pay for asyncio
+        from src.core.async_engine import EventLoopThread
+        self._owns_loop = loop_thread is None
+        self.loop_thread = loop_thread or EventLoopThread()
+
+    def submit(self, name: str, coro_func, *args):
+        """Run coro_func(*args) on the asyncio loop and emit job_finished"""
+        self.loop_thread.submit(
+            coro_func(*args),
+            lambda result: self.job_finished.emit(name, args, result))
+
+    def shutdown(self):
+        """Stop the asyncio loop if this bridge created it"""
+        if self._owns_loop:
+            self.loop_thread.stop()
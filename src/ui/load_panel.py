@@ -0,0 +1,142 @@
+"""Load generator tab: sustained send rate with live throughput and latency"""
+from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtWidgets import (QComboBox, QFormLayout, QHBoxLayout, QLabel, QLineEdit,
+                               QPushButton, QSpinBox, QDoubleSpinBox, QVBoxLayout, QWidget)
+
+from src.core.async_engine import EventLoopThread
+from src.core.loadgen import LoadGenerator
+from src.core.payload import decode_escapes
+
+
+class LoadSignals(QObject):
+    """Relays LoadGenerator progress from the asyncio thread to the GUI"""
+    progress = Signal(dict)
+    finished = Signal(dict)
+
+
+class LoadPanel(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.signals = LoadSignals(self)
+        self.signals.progress.connect(self._show_stats)
+        self.signals.finished.connect(self._on_finished)
+        self._loop_thread = None
+        self._generator = None
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 8, 0, 0)
+
+        title = QLabel("▸ LOAD TEST")
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        form = QFormLayout()
+        self.ip_input = QLineEdit("127.0.0.1")
+        self.port_input = QLineEdit("8080")
+        self.payload_input = QLineEdit("ping {seq}\\n")
+        self.payload_input.setToolTip("{seq} is replaced by a sequence number; \\n, \\t and \\xNN escapes work")
+
+        rate_layout = QHBoxLayout()
+        self.rate_input = QDoubleSpinBox()
+        self.rate_input.setRange(1, 10_000_000)
+        self.rate_input.setValue(1000)
+        self.rate_unit = QComboBox()
+        self.rate_unit.addItems(["msgs/s", "bytes/s"])
+        rate_layout.addWidget(self.rate_input)
+        rate_layout.addWidget(self.rate_unit)
+
+        self.connections_input = QSpinBox()
+        self.connections_input.setRange(1, 1000)
+        self.connections_input.setValue(4)
+        self.duration_input = QDoubleSpinBox()
+        self.duration_input.setRange(0.5, 86400)
+        self.duration_input.setValue(10)
+        self.duration_input.setSuffix(" s")
+        self.framing_combo = QComboBox()
+        for label, name in (("Lines", "newline"), ("Raw", "raw"), ("No replies", None)):
+            self.framing_combo.addItem(label, name)
+
+        form.addRow("IP", self.ip_input)
+        form.addRow("PORT", self.port_input)
+        form.addRow("Payload", self.payload_input)
+        form.addRow("Rate", rate_layout)
+        form.addRow("Connections", self.connections_input)
+        form.addRow("Duration", self.duration_input)
+        form.addRow("Replies", self.framing_combo)
+        layout.addLayout(form)
+
+        self.start_button = QPushButton("▶ START")
+        self.start_button.setMinimumHeight(32)
+        self.start_button.clicked.connect(self._on_start_stop)
+        layout.addWidget(self.start_button)
+
+        self.stats_label = QLabel("Idle")
+        self.stats_label.setObjectName("stats")
+        layout.addWidget(self.stats_label)
+        layout.addStretch()
+
+    @Slot()
+    def _on_start_stop(self):
+        if self._generator is not None:
+            self._loop_thread.loop.call_soon_threadsafe(self._generator.stop)
+            self.start_button.setEnabled(False)
+            return
+
+        rate = self.rate_input.value()
+        try:
+            self._generator = LoadGenerator(
+                self.ip_input.text(), self.port_input.text(),
+                payload_template=decode_escapes(self.payload_input.text()),
+                rate=rate if self.rate_unit.currentIndex() == 0 else 1.0,
+                byte_rate=rate if self.rate_unit.currentIndex() == 1 else None,
+                connections=self.connections_input.value(),
+                duration=self.duration_input.value(),
+                framer=self.framing_combo.currentData(),
+                on_progress=self.signals.progress.emit)
+        except ValueError as e:
+            self.stats_label.setText(f"✗ {str(e)}")
+            return
+
+        if self._loop_thread is None:
+            self._loop_thread = EventLoopThread()
+        self._loop_thread.submit(self._generator.run(), self.signals.finished.emit)
+        self.start_button.setText("■ STOP")
+        self.stats_label.setText("Starting…")
+
+    @Slot(dict)
+    def _show_stats(self, stats: dict):
+        latency = stats.get('latency', {})
+
+        def fmt(value):
+            return "-" if value is None else f"{value:.2f}"
+
+        lines = [
+            f"elapsed   {stats.get('elapsed_s', 0):8.1f} s",
+            f"sent      {stats.get('sent', 0):8d}   {stats.get('msgs_per_s', 0):10.0f} msg/s"
+            f"   {stats.get('bytes_per_s', 0) / 1e6:8.2f} MB/s",
+            f"received  {stats.get('received', 0):8d}   {stats.get('responses_per_s', 0):10.0f} msg/s",
+            f"errors    {stats.get('errors', 0):8d}   {stats.get('last_error') or ''}",
+            f"latency   p50 {fmt(latency.get('p50_ms'))}  p90 {fmt(latency.get('p90_ms'))}"
+            f"  p99 {fmt(latency.get('p99_ms'))}  max {fmt(latency.get('max_ms'))} ms",
+        ]
+        self.stats_label.setText("\n".join(lines))
+
+    @Slot(dict)
+    def _on_finished(self, result: dict):
+        self._generator = None
+        self.start_button.setEnabled(True)
+        self.start_button.setText("▶ START")
+        if result.get('status') == 'error':
+            self.stats_label.setText(f"✗ {result['message']}")
+            return
+        self._show_stats(result)
+        self.stats_label.setText(f"{self.stats_label.text()}\n— run {result['status']} —")
+
+    def shutdown(self):
+        if self._loop_thread:
+            if self._generator is not None:
+                self._loop_thread.loop.call_soon_threadsafe(self._generator.stop)
+            self._loop_thread.stop()
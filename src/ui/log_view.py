@@ -0,0 +1,136 @@
+"""Bounded, virtualised message log"""
+import time
+from collections import deque
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer, Slot
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import QAbstractItemView, QListView
+
+
+# Modern terminal color scheme, keyed by message type
+LOG_COLORS = {
+    'sent': '#569cd6',
+    'response': '#4ec9b0',
+    'confirm': '#6a9955',
+    'error': '#f48771',
+    'system': '#9cdcfe',
+    'info': '#d4d4d4',
+}
+
+
+class LogModel(QAbstractListModel):
+    """
+    List model over a capped ring of (timestamp, type, text) records.
+
+    Appends are queued and flushed at most once per frame, so bursts of
+    thousands of messages cost one row insertion (and one repaint) per
+    frame. Oldest records are dropped once max_records is reached.
+    Display strings are only formatted for rows the view actually paints.
+    Multi-line messages become one record per line, so every row is a
+    single line.
+    """
+
+    def __init__(self, max_records: int = 10000, flush_interval_ms: int = 16, parent=None):
+        super().__init__(parent)
+        self.max_records = max_records
+        self._records = deque(maxlen=max_records)
+        self._pending = []
+        self._colors = {kind: QColor(color) for kind, color in LOG_COLORS.items()}
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
+
+    def append(self, msg_type: str, text: str):
+        """Queue a record (one per line); it becomes visible on the next flush"""
+        timestamp = time.time()
+        self._pending.extend((timestamp, msg_type, line) for line in text.splitlines() or [''])
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    @Slot()
+    def flush(self):
+        """Move queued records into the model in one batch"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        if len(pending) > self.max_records:
+            pending = pending[-self.max_records:]
+
+        overflow = len(self._records) + len(pending) - self.max_records
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._records.popleft()
+            self.endRemoveRows()
+
+        first = len(self._records)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._records.extend(pending)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._records.clear()
+        self._pending = []
+        self.endResetModel()
+
+    def records(self):
+        """Iterate over (timestamp, type, text) records, oldest first"""
+        return iter(self._records)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        timestamp, msg_type, text = self._records[index.row()]
+        if role == Qt.DisplayRole:
+            return f"[{format_timestamp(timestamp)}] {text}"
+        if role == Qt.ForegroundRole:
+            return self._colors.get(msg_type, self._colors['info'])
+        if role == Qt.FontRole and msg_type == 'system':
+            return self._bold
+        return None
+
+
+def format_timestamp(timestamp: float) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(timestamp))
+
+
+class LogView(QListView):
+    """List view for LogModel that follows new rows while scrolled to the bottom"""
+
+    def __init__(self, model: LogModel, parent=None):
+        super().__init__(parent)
+        self._follow = True
+        self.setModel(model)
+        # LogModel splits messages into lines: lets the view skip per-row size hints
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    def setModel(self, model):
+        """Switch models (e.g. between sessions), following the new one's tail"""
+        old = self.model()
+        if old is not None:
+            old.rowsInserted.disconnect(self._on_rows_inserted)
+        super().setModel(model)
+        model.rowsInserted.connect(self._on_rows_inserted)
+        self._follow = True
+        self.scrollToBottom()
+
+    @Slot(int)
+    def _on_scrolled(self, value: int):
+        self._follow = value >= self.verticalScrollBar().maximum()
+
+    @Slot()
+    def _on_rows_inserted(self):
+        if self._follow:
+            self.scrollToBottom()
@@ -1,77 +1,78 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                               QLabel, QPushButton, QLineEdit, QFrame, QTextEdit, QFileDialog)
-from PySide6.QtCore import Qt, Slot
+                               QLabel, QPushButton, QLineEdit, QFrame, QFileDialog,
+                               QComboBox, QTabWidget, QCheckBox)
+from PySide6.QtCore import Qt, QTimer, Slot
 from PySide6.QtGui import QFont
+import importlib
+import socket
+import sqlite3
+import threading
+from typing import Optional
 from src.core.app_logic import AppLogic
+from src.core.framing import make_framer
+from src.core.host_cache import HostCache
+from src.core.journal import SessionJournal, journal_enabled
+from src.core.payload import hexdump, parse_payload
+from src.core.pool import ConnectionPool
+from src.core.profiles import PROFILES, load_profiles
+from src.core.worker import LocalInfoSignals, LogicExecutor, ReceiverSignals
+from src.ui.log_view import LogModel, LogView, format_timestamp
+from src.ui.theme import STYLESHEET, set_state
+from src.utils.interfaces import get_inventory
 from src.utils.network import get_local_ip, get_hostname
 from datetime import datetime
 
+# Tabs built on first use: (title, module, panel class)
+LAZY_TABS = (
+    ("Sessions", "src.ui.sessions_panel", "SessionsPanel"),
+    ("Load", "src.ui.load_panel", "LoadPanel"),
+    ("Monitor", "src.ui.monitor_panel", "MonitorPanel"),
+    ("Trace", "src.ui.trace_panel", "TracePanel"),
+    ("Metrics", "src.ui.metrics_panel", "MetricsPanel"),
+)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.logic = AppLogic()
+        # Reconnects to recently used targets reuse warm connections
+        self.pool = ConnectionPool()
+        # Host cache and session journal are opened off the startup path
+        # (SQLite open, journal pruning); see _open_stores
+        self.host_cache = None
+        self.journal = None
+        self._closed = False
+        self.logic = AppLogic(pool=self.pool)
+        self._sent_text = None
+        self.executor = LogicExecutor(self.logic, self)
+        self.executor.job_finished.connect(self._on_job_finished)
+        self.receiver_signals = ReceiverSignals(self)
+        self.receiver_signals.message_received.connect(self._on_message_received)
+        self.receiver_signals.closed.connect(self._on_receiver_closed)
         self._setup_ui()
 
+        # Local device info is probed (and the stores opened) off the GUI thread
+        # so the window shows at once
+        self.local_info_signals = LocalInfoSignals(self)
+        self.local_info_signals.ready.connect(self._apply_local_info)
+        self.local_info_signals.stores_ready.connect(self._attach_stores)
+        threading.Thread(target=self._probe_local_info, name='linxtap-local-info',
+                         daemon=True).start()
+
     def _setup_ui(self):
         self.setWindowTitle("LinxTap")
         self.setMinimumSize(550, 600)
 
-        # Modern dark theme with terminal aesthetics
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #1e1e1e;
-            }
-            QWidget {
-                background-color: #1e1e1e;
-                color: #d4d4d4;
-                font-family: 'Monospace', 'Consolas', 'Courier New';
-            }
-            QLabel {
-                color: #d4d4d4;
-                font-size: 11px;
-            }
-            QLineEdit {
-                background-color: #2d2d2d;
-                border: 1px solid #3e3e3e;
-                border-radius: 3px;
-                padding: 6px 8px;
-                color: #d4d4d4;
-                font-size: 11px;
-            }
-            QLineEdit:focus {
-                border: 1px solid #007acc;
-            }
-            QPushButton {
-                background-color: #0e639c;
-                border: none;
-                border-radius: 3px;
-                padding: 8px 16px;
-                color: #ffffff;
-                font-weight: 500;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #1177bb;
-            }
-            QPushButton:pressed {
-                background-color: #0d5a8f;
-            }
-            QTextEdit {
-                background-color: #1e1e1e;
-                border: 1px solid #3e3e3e;
-                border-radius: 3px;
-                color: #d4d4d4;
-                padding: 4px;
-            }
-            QFrame#divider {
-                background-color: #3e3e3e;
-            }
-        """)
+        # Modern dark theme with terminal aesthetics, parsed once for every widget
+        self.setStyleSheet(STYLESHEET)
+
+        # Tabs: single connection view plus multi-session view
+        self.tabs = QTabWidget()
+        self.setCentralWidget(self.tabs)
 
         # Central widget
         central = QWidget()
-        self.setCentralWidget(central)
+        self.tabs.addTab(central, "Connection")
 
         # Main layout
         layout = QVBoxLayout(central)
@@ -80,27 +81,22 @@ class MainWindow(QMainWindow):
 
         # Title with modern styling
         title = QLabel("● LinxTap")
+        title.setObjectName("appTitle")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet("font-size: 20px; font-weight: bold; color: #4ec9b0; padding: 8px;")
         layout.addWidget(title)
 
         # Connection inputs in a card-like container
         connection_container = QFrame()
-        connection_container.setStyleSheet("""
-            QFrame {
-                background-color: #252526;
-                border-radius: 4px;
-                padding: 12px;
-            }
-        """)
+        connection_container.setObjectName("card")
+        connection_container.setProperty("roomy", True)
         connection_layout = QVBoxLayout(connection_container)
         connection_layout.setSpacing(8)
 
         # IP address input
         ip_layout = QHBoxLayout()
         ip_label = QLabel("IP")
+        ip_label.setObjectName("fieldLabel")
         ip_label.setMinimumWidth(60)
-        ip_label.setStyleSheet("color: #9cdcfe; font-weight: 500;")
         self.ip_input = QLineEdit()
         self.ip_input.setPlaceholderText("127.0.0.1")
         self.ip_input.setText("127.0.0.1")
@@ -111,8 +107,8 @@ class MainWindow(QMainWindow):
         # Port input
         port_layout = QHBoxLayout()
         port_label = QLabel("PORT")
+        port_label.setObjectName("fieldLabel")
         port_label.setMinimumWidth(60)
-        port_label.setStyleSheet("color: #9cdcfe; font-weight: 500;")
         self.port_input = QLineEdit()
         self.port_input.setPlaceholderText("8080")
         self.port_input.setText("8080")
@@ -120,49 +116,144 @@ class MainWindow(QMainWindow):
         port_layout.addWidget(self.port_input)
         connection_layout.addLayout(port_layout)
 
+        # Connection profile: socket tuning and timeouts for the next connect
+        profile_layout = QHBoxLayout()
+        profile_label = QLabel("PROFILE")
+        profile_label.setObjectName("fieldLabel")
+        profile_label.setMinimumWidth(60)
+        self.profile_combo = QComboBox()
+        try:
+            profiles = load_profiles()
+            profile_error = None
+        except ValueError as e:
+            profiles = PROFILES
+            profile_error = str(e)
+        for name, profile in profiles.items():
+            self.profile_combo.addItem(name, name)
+            self.profile_combo.setItemData(self.profile_combo.count() - 1,
+                                           profile.description, Qt.ToolTipRole)
+        profile_layout.addWidget(profile_label)
+        profile_layout.addWidget(self.profile_combo)
+        connection_layout.addLayout(profile_layout)
+
         layout.addWidget(connection_container)
 
         # Status display with icon
         self.status_label = QLabel("○ Not connected")
+        self.status_label.setObjectName("statusLabel")
         self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet("""
-            padding: 8px;
-            background-color: #3c3c3c;
-            border-radius: 3px;
-            color: #858585;
-            font-size: 11px;
-        """)
         layout.addWidget(self.status_label)
 
         # Connect button
         self.connect_button = QPushButton("⚡ CONNECT")
+        self.connect_button.setObjectName("connectButton")
         self.connect_button.setMinimumHeight(36)
         self.connect_button.clicked.connect(self._on_connect_click)
         layout.addWidget(self.connect_button)
 
-        # Remote device info panel (hidden by default)
+        # Remote device info and message panels are built on the first connect
+        self.connection_layout = layout
+        self._connection_panels_index = layout.count()
+        self.remote_info_panel = None
+        self.message_panel = None
+        self.send_button = None
+        # The log model exists up front so early system messages are kept
+        self.log_model = LogModel(parent=self)
+        if profile_error:
+            self._log_message(f"✗ {profile_error}", "error")
+
+        # Add stretch to push local info to bottom
+        layout.addStretch()
+
+        # Divider
+        divider = QFrame()
+        divider.setObjectName("divider")
+        divider.setFrameShape(QFrame.HLine)
+        divider.setFixedHeight(1)
+        layout.addWidget(divider)
+
+        # Local device info panel (values arrive from a background probe)
+        local_info_panel = QFrame()
+        local_info_panel.setObjectName("card")
+        local_info_layout = QVBoxLayout(local_info_panel)
+        local_info_layout.setSpacing(6)
+
+        local_title = QLabel("▸ LOCAL DEVICE")
+        local_title.setObjectName("sectionTitle")
+        local_info_layout.addWidget(local_title)
+
+        # Hostname
+        hostname_layout = QHBoxLayout()
+        hostname_label = QLabel("Host:")
+        hostname_label.setObjectName("infoLabel")
+        hostname_label.setMinimumWidth(80)
+        self.hostname_value = QLabel("…")
+        self.hostname_value.setObjectName("infoValue")
+        hostname_layout.addWidget(hostname_label)
+        hostname_layout.addWidget(self.hostname_value)
+        hostname_layout.addStretch()
+        local_info_layout.addLayout(hostname_layout)
+
+        # Local IP
+        ip_info_layout = QHBoxLayout()
+        ip_info_label = QLabel("IP:")
+        ip_info_label.setObjectName("infoLabel")
+        ip_info_label.setMinimumWidth(80)
+        self.local_ip_value = QLabel("…")
+        self.local_ip_value.setObjectName("infoValue")
+        self.local_ip_value.setProperty("state", "address")
+        ip_info_layout.addWidget(ip_info_label)
+        ip_info_layout.addWidget(self.local_ip_value)
+        ip_info_layout.addStretch()
+        local_info_layout.addLayout(ip_info_layout)
+
+        # Local IPv6 (only shown on dual-stack hosts)
+        ipv6_info_layout = QHBoxLayout()
+        self.local_ipv6_label = QLabel("IPv6:")
+        self.local_ipv6_label.setObjectName("infoLabel")
+        self.local_ipv6_label.setMinimumWidth(80)
+        self.local_ipv6_value = QLabel("")
+        self.local_ipv6_value.setObjectName("infoValue")
+        self.local_ipv6_value.setProperty("state", "address")
+        self.local_ipv6_value.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.local_ipv6_label.hide()
+        self.local_ipv6_value.hide()
+        ipv6_info_layout.addWidget(self.local_ipv6_label)
+        ipv6_info_layout.addWidget(self.local_ipv6_value)
+        ipv6_info_layout.addStretch()
+        local_info_layout.addLayout(ipv6_info_layout)
+
+        layout.addWidget(local_info_panel)
+
+        # Other tabs (and their modules) are loaded the first time they are opened
+        self._panels = []
+        self._lazy_tabs = {}
+        for title, module, class_name in LAZY_TABS:
+            placeholder = QWidget()
+            QVBoxLayout(placeholder).setContentsMargins(0, 0, 0, 0)
+            self._lazy_tabs[placeholder] = (module, class_name)
+            self.tabs.addTab(placeholder, title)
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
+    def _build_connection_panels(self):
+        """Create the remote device and message panels (first connect only)"""
+        # Remote device info panel
         self.remote_info_panel = QFrame()
-        self.remote_info_panel.setStyleSheet("""
-            QFrame {
-                background-color: #252526;
-                border-radius: 4px;
-                padding: 10px;
-            }
-        """)
+        self.remote_info_panel.setObjectName("card")
         remote_info_layout = QVBoxLayout(self.remote_info_panel)
         remote_info_layout.setSpacing(6)
 
         remote_title = QLabel("▸ REMOTE DEVICE")
-        remote_title.setStyleSheet("color: #4ec9b0; font-weight: bold; font-size: 10px;")
+        remote_title.setObjectName("sectionTitle")
         remote_info_layout.addWidget(remote_title)
 
         # Remote OS
         remote_os_layout = QHBoxLayout()
         remote_os_label = QLabel("OS:")
-        remote_os_label.setStyleSheet("color: #858585;")
+        remote_os_label.setObjectName("infoLabel")
         remote_os_label.setMinimumWidth(80)
         self.remote_os_value = QLabel("N/A")
-        self.remote_os_value.setStyleSheet("color: #d4d4d4; font-weight: 500;")
+        self.remote_os_value.setObjectName("infoValue")
         remote_os_layout.addWidget(remote_os_label)
         remote_os_layout.addWidget(self.remote_os_value)
         remote_os_layout.addStretch()
@@ -171,320 +262,392 @@ class MainWindow(QMainWindow):
         # Gateway status
         gateway_layout = QHBoxLayout()
         gateway_label = QLabel("Type:")
-        gateway_label.setStyleSheet("color: #858585;")
+        gateway_label.setObjectName("infoLabel")
         gateway_label.setMinimumWidth(80)
         self.gateway_value = QLabel("N/A")
-        self.gateway_value.setStyleSheet("color: #d4d4d4; font-weight: 500;")
+        self.gateway_value.setObjectName("infoValue")
         gateway_layout.addWidget(gateway_label)
         gateway_layout.addWidget(self.gateway_value)
         gateway_layout.addStretch()
         remote_info_layout.addLayout(gateway_layout)
 
-        layout.addWidget(self.remote_info_panel)
-        self.remote_info_panel.hide()
-
-        # Message panel (hidden by default)
+        # Message panel
         self.message_panel = QFrame()
-        self.message_panel.setStyleSheet("""
-            QFrame {
-                background-color: #252526;
-                border-radius: 4px;
-                padding: 10px;
-            }
-        """)
+        self.message_panel.setObjectName("card")
         message_main_layout = QVBoxLayout(self.message_panel)
         message_main_layout.setSpacing(6)
 
         # Message log header with export button
         log_header = QHBoxLayout()
         log_title = QLabel("▸ MESSAGE LOG")
-        log_title.setStyleSheet("color: #4ec9b0; font-weight: bold; font-size: 10px;")
+        log_title.setObjectName("sectionTitle")
         log_header.addWidget(log_title)
         log_header.addStretch()
 
+        # Framing used to split incoming data into messages
+        self.framing_combo = QComboBox()
+        for label, name in (("Raw", "raw"), ("Lines", "newline"), ("Length (u32)", "length")):
+            self.framing_combo.addItem(label, name)
+        self.framing_combo.setToolTip("How incoming data is split into messages")
+        self.framing_combo.currentIndexChanged.connect(self._start_receiving)
+        log_header.addWidget(self.framing_combo)
+
+        self.hex_view_checkbox = QCheckBox("Hex")
+        self.hex_view_checkbox.setToolTip("Log payloads as a hex dump")
+        log_header.addWidget(self.hex_view_checkbox)
+
         self.export_button = QPushButton("💾 Export")
-        self.export_button.setStyleSheet("""
-            QPushButton {
-                background-color: #3c3c3c;
-                padding: 4px 10px;
-                font-size: 9px;
-            }
-            QPushButton:hover {
-                background-color: #505050;
-            }
-        """)
+        self.export_button.setObjectName("smallButton")
         self.export_button.clicked.connect(self._export_log)
         log_header.addWidget(self.export_button)
         message_main_layout.addLayout(log_header)
 
-        # Message log
-        self.message_log = QTextEdit()
-        self.message_log.setReadOnly(True)
+        # Message log (capped ring buffer, batched repaints)
+        self.message_log = LogView(self.log_model)
         self.message_log.setMaximumHeight(100)
         font = QFont("Monospace", 9)
         self.message_log.setFont(font)
-        self.message_log.setPlaceholderText("Connection log appears here...")
         message_main_layout.addWidget(self.message_log)
 
         # Message input
         message_input_layout = QHBoxLayout()
+        self.payload_combo = QComboBox()
+        for label, name in (("Text", "text"), ("Hex", "hex"), ("Base64", "base64"), ("File", "file")):
+            self.payload_combo.addItem(label, name)
+        self.payload_combo.setToolTip("How the input is turned into bytes")
+        self.payload_combo.currentIndexChanged.connect(self._on_payload_format_changed)
+        message_input_layout.addWidget(self.payload_combo)
+
         self.message_input = QLineEdit()
         self.message_input.setPlaceholderText("Type message and press Enter...")
         self.message_input.returnPressed.connect(self._on_send_message)
         message_input_layout.addWidget(self.message_input)
 
+        self.browse_button = QPushButton("📂")
+        self.browse_button.setToolTip("Choose a file to send")
+        self.browse_button.clicked.connect(self._browse_payload_file)
+        self.browse_button.hide()
+        message_input_layout.addWidget(self.browse_button)
+
         self.send_button = QPushButton("→ Send")
         self.send_button.setMinimumWidth(70)
-        self.send_button.setStyleSheet("""
-            QPushButton {
-                background-color: #0e639c;
-                font-size: 11px;
-            }
-        """)
         self.send_button.clicked.connect(self._on_send_message)
         message_input_layout.addWidget(self.send_button)
         message_main_layout.addLayout(message_input_layout)
 
-        layout.addWidget(self.message_panel)
-        self.message_panel.hide()
-
-        # Add stretch to push local info to bottom
-        layout.addStretch()
-
-        # Divider
-        divider = QFrame()
-        divider.setObjectName("divider")
-        divider.setFrameShape(QFrame.HLine)
-        divider.setFixedHeight(1)
-        layout.addWidget(divider)
-
-        # Local device info panel
-        local_info_panel = QFrame()
-        local_info_panel.setStyleSheet("""
-            QFrame {
-                background-color: #252526;
-                border-radius: 4px;
-                padding: 10px;
-            }
-        """)
-        local_info_layout = QVBoxLayout(local_info_panel)
-        local_info_layout.setSpacing(6)
-
-        local_title = QLabel("▸ LOCAL DEVICE")
-        local_title.setStyleSheet("color: #4ec9b0; font-weight: bold; font-size: 10px;")
-        local_info_layout.addWidget(local_title)
-
-        # Get local IP and hostname
-        local_ip = get_local_ip()
-        hostname = get_hostname()
-
-        # Hostname
-        hostname_layout = QHBoxLayout()
-        hostname_label = QLabel("Host:")
-        hostname_label.setStyleSheet("color: #858585;")
-        hostname_label.setMinimumWidth(80)
-        hostname_value = QLabel(hostname)
-        hostname_value.setStyleSheet("color: #d4d4d4; font-weight: 500;")
-        hostname_layout.addWidget(hostname_label)
-        hostname_layout.addWidget(hostname_value)
-        hostname_layout.addStretch()
-        local_info_layout.addLayout(hostname_layout)
-
-        # Local IP
-        ip_info_layout = QHBoxLayout()
-        ip_info_label = QLabel("IP:")
-        ip_info_label.setStyleSheet("color: #858585;")
-        ip_info_label.setMinimumWidth(80)
-        self.local_ip_value = QLabel(local_ip)
-        self.local_ip_value.setStyleSheet("color: #569cd6; font-weight: 500;")
-        ip_info_layout.addWidget(ip_info_label)
-        ip_info_layout.addWidget(self.local_ip_value)
-        ip_info_layout.addStretch()
-        local_info_layout.addLayout(ip_info_layout)
-
-        layout.addWidget(local_info_panel)
+        index = self._connection_panels_index
+        self.connection_layout.insertWidget(index, self.remote_info_panel)
+        self.connection_layout.insertWidget(index + 1, self.message_panel)
+
+    def _set_connection_panels_visible(self, visible: bool):
+        if self.message_panel is None:
+            if not visible:
+                return
+            self._build_connection_panels()
+        self.remote_info_panel.setVisible(visible)
+        self.message_panel.setVisible(visible)
+
+    @Slot(int)
+    def _on_tab_changed(self, index: int):
+        """Build a lazy tab's panel the first time it is shown"""
+        placeholder = self.tabs.widget(index)
+        target = self._lazy_tabs.pop(placeholder, None)
+        if target is None:
+            return
+        module, class_name = target
+        panel = getattr(importlib.import_module(module), class_name)()
+        placeholder.layout().addWidget(panel)
+        self._panels.append(panel)
+
+    def _open_stores(self):
+        """Runs on the local-info thread: both touch the disk before first use"""
+        # Known hosts show their OS instantly; stale entries re-probe in the background
+        try:
+            host_cache = HostCache()
+        except (OSError, sqlite3.Error):
+            host_cache = None
+        journal = None
+        if journal_enabled():
+            try:
+                journal = SessionJournal()
+            except OSError:
+                # Read-only home: fall back to exporting what the log still holds
+                pass
+        try:
+            self.local_info_signals.stores_ready.emit(host_cache, journal)
+        except RuntimeError:
+            # Window closed before the stores opened
+            for store in (host_cache, journal):
+                if store:
+                    store.close()
+
+    @Slot(object, object)
+    def _attach_stores(self, host_cache, journal):
+        if self._closed:
+            for store in (host_cache, journal):
+                if store:
+                    store.close()
+            return
+        self.host_cache = host_cache
+        self.logic.host_cache = host_cache
+        self.journal = journal
+        if journal:
+            # Quiet sessions too: the journal never lags by more than ~2 intervals
+            self._journal_timer = QTimer(self)
+            self._journal_timer.setInterval(int(journal.flush_interval * 1000))
+            self._journal_timer.timeout.connect(journal.flush_pending)
+            self._journal_timer.start()
+
+    def _probe_local_info(self):
+        """Runs on a background thread: the lookups may block on the network"""
+        self._open_stores()
+        info = {
+            'hostname': get_hostname(),
+            'ip': get_local_ip(),
+            'ipv6': get_local_ip(socket.AF_INET6),
+            'addresses': get_inventory().addresses(),
+        }
+        try:
+            self.local_info_signals.ready.emit(info)
+        except RuntimeError:
+            pass  # Window closed before the probe finished
+
+    @Slot(dict)
+    def _apply_local_info(self, info: dict):
+        self.hostname_value.setText(info['hostname'])
+        self.local_ip_value.setText(info['ip'])
+        # Multi-homed hosts: every address, by interface
+        self.local_ip_value.setToolTip("\n".join(
+            f"{a['name']}: {a['address']}/{a['prefix']}" for a in info['addresses']))
+        # Local IPv6 only on dual-stack hosts
+        if info['ipv6'] != 'Unknown':
+            self.local_ipv6_value.setText(info['ipv6'])
+            self.local_ipv6_label.show()
+            self.local_ipv6_value.show()
 
     @Slot()
     def _on_connect_click(self):
+        if self.executor.is_busy():
+            return
+
         ip = self.ip_input.text()
         port = self.port_input.text()
 
-        result = self.logic.connect(ip, port)
-
+        if not self.logic.connected:
+            self.status_label.setText(f"… Connecting to {ip}:{port}")
+        self.connect_button.setEnabled(False)
+        if self.send_button:
+            self.send_button.setEnabled(False)
+
+        # Runs on the worker thread; result arrives in _on_job_finished
+        self.executor.submit_connect(ip, port, self.profile_combo.currentData())
+
+    @Slot(str, object, dict)
+    def _on_job_finished(self, name: str, args, result: dict):
+        """Apply the result of a background AppLogic job to the UI"""
+        self.connect_button.setEnabled(True)
+        if self.send_button:
+            self.send_button.setEnabled(True)
+
+        if name == 'connect':
+            self._apply_connect_result(args[0], args[1], result)
+        elif name == 'disconnect':
+            self._apply_connect_result(self.logic.current_ip, self.logic.current_port, result)
+        elif name == 'send':
+            self._apply_send_result(args[0], result)
+        elif name == 'send_file':
+            self._apply_send_result(args[0], result, is_file=True)
+
+    def _apply_connect_result(self, ip: str, port: str, result: dict):
         # Update status label with modern styling
         if result['status'] == 'connected':
             self.status_label.setText(f"● Connected to {ip}:{port}")
-            self.status_label.setStyleSheet("""
-                padding: 8px;
-                background-color: #2d5016;
-                border-radius: 3px;
-                color: #8fd460;
-                font-size: 11px;
-            """)
+            set_state(self.status_label, "connected")
             self.connect_button.setText("⚠ DISCONNECT")
-            self.connect_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #8b0000;
-                    border: none;
-                    border-radius: 3px;
-                    padding: 8px 16px;
-                    color: #ffffff;
-                    font-weight: 500;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #a00000;
-                }
-            """)
+            set_state(self.connect_button, "connected")
+            self.profile_combo.setEnabled(False)
 
             # Update remote device information
+            self._set_connection_panels_visible(True)
             remote_os = result.get('remote_os', 'Unknown')
             is_gateway = result.get('is_gateway', False)
 
             self.remote_os_value.setText(remote_os)
+            guesses = result.get('os_guesses') or []
+            self.remote_os_value.setToolTip("\n".join(
+                f"{guess['os']}: {guess['confidence']:.0%}" for guess in guesses))
 
             if is_gateway:
                 self.gateway_value.setText("Gateway (Router)")
-                self.gateway_value.setStyleSheet("color: #ff9800; font-weight: 500;")
+                set_state(self.gateway_value, "gateway")
             else:
                 self.gateway_value.setText("Network Device")
-                self.gateway_value.setStyleSheet("color: #d4d4d4; font-weight: 500;")
+                set_state(self.gateway_value, "")
 
-            self.remote_info_panel.show()
-            self.message_panel.show()
-            self._log_message(f"Connected to {ip}:{port}", "system")
+            self._log_message(f"Connected to {ip}:{port} ({result.get('profile', 'default')} profile)",
+                              "system")
+            self._start_receiving()
 
         elif result['status'] == 'disconnected':
-            self.status_label.setText("○ Not connected")
-            self.status_label.setStyleSheet("""
-                padding: 8px;
-                background-color: #3c3c3c;
-                border-radius: 3px;
-                color: #858585;
-                font-size: 11px;
-            """)
-            self.connect_button.setText("⚡ CONNECT")
-            self.connect_button.setStyleSheet("""
-                QPushButton {
-                    background-color: #0e639c;
-                    border: none;
-                    border-radius: 3px;
-                    padding: 8px 16px;
-                    color: #ffffff;
-                    font-weight: 500;
-                    font-size: 11px;
-                }
-                QPushButton:hover {
-                    background-color: #1177bb;
-                }
-            """)
-
-            self.remote_info_panel.hide()
-            self.message_panel.hide()
+            self._show_disconnected("○ Not connected", "")
             self._log_message("Disconnected", "system")
 
         elif result['status'] == 'error':
             self.status_label.setText(f"✗ {result['message']}")
-            self.status_label.setStyleSheet("""
-                padding: 8px;
-                background-color: #5a1d1d;
-                border-radius: 3px;
-                color: #f48771;
-                font-size: 11px;
-            """)
+            set_state(self.status_label, "error")
 
-            self.remote_info_panel.hide()
-            self.message_panel.hide()
+            self._set_connection_panels_visible(False)
 
     @Slot()
     def _on_send_message(self):
         """Handle sending a message to the connected device"""
-        message = self.message_input.text()
+        text = self.message_input.text()
 
-        if not message:
+        if not text or self.executor.is_busy():
             return
 
-        # Send the message
-        result = self.logic.send_message(message)
+        fmt = self.payload_combo.currentData()
+        message = text
+        if fmt in ('hex', 'base64'):
+            try:
+                message = parse_payload(text, fmt)
+            except ValueError as e:
+                self._log_message(f"✗ {e}", "error")
+                return
+
+        self._sent_text = text
+        self.send_button.setEnabled(False)
+        if fmt == 'file':
+            self.executor.submit_send_file(message)
+        else:
+            self.executor.submit_send(message)
+
+    @Slot()
+    def _on_payload_format_changed(self):
+        fmt = self.payload_combo.currentData()
+        self.browse_button.setVisible(fmt == 'file')
+        self.message_input.setPlaceholderText({
+            'text': "Type message and press Enter...",
+            'hex': "Hex bytes, e.g. de ad be ef",
+            'base64': "Base64, e.g. 3q2+7w==",
+            'file': "Path of a file to send",
+        }[fmt])
 
+    @Slot()
+    def _browse_payload_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Send File")
+        if path:
+            self.message_input.setText(path)
+
+    def _apply_send_result(self, message, result: dict, is_file: bool = False):
         if result['status'] == 'success':
-            self._log_message(f"SENT: {message}", "sent")
+            if is_file:
+                self._log_message(f"SENT FILE: {message}", "sent", result.get('bytes_sent'))
+            elif isinstance(message, bytes):
+                self._log_payload("SENT", message, "sent")
+            else:
+                self._log_payload("SENT", message.encode('utf-8'), "sent")
             self._log_message(f"✓ {result['message']}", "confirm")
 
             if 'response' in result:
-                self._log_message(f"RESPONSE: {result['response']}", "response")
+                response = result['response']
+                if isinstance(response, str):
+                    response = response.encode('utf-8')
+                self._log_payload("RESPONSE", response, "response")
 
-            self.message_input.clear()
+            # Only clear if the user hasn't started typing the next message
+            if self.message_input.text() == self._sent_text:
+                self.message_input.clear()
 
         elif result['status'] == 'error':
             self._log_message(f"✗ {result['message']}", "error")
 
             # If connection was broken, update UI
             if not self.logic.connected:
-                self.status_label.setText("✗ Connection lost")
-                self.status_label.setStyleSheet("""
-                    padding: 8px;
-                    background-color: #5a1d1d;
-                    border-radius: 3px;
-                    color: #f48771;
-                    font-size: 11px;
-                """)
-                self.connect_button.setText("⚡ CONNECT")
-                self.connect_button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #0e639c;
-                        border: none;
-                        border-radius: 3px;
-                        padding: 8px 16px;
-                        color: #ffffff;
-                        font-weight: 500;
-                        font-size: 11px;
-                    }
-                    QPushButton:hover {
-                        background-color: #1177bb;
-                    }
-                """)
-                self.remote_info_panel.hide()
-                self.message_panel.hide()
-
-    def _log_message(self, message: str, msg_type: str = "info"):
-        """Add a message to the log with timestamp and modern terminal formatting"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-
-        # Modern terminal color scheme
-        if msg_type == "sent":
-            formatted = f"<span style='color: #569cd6;'>[{timestamp}] {message}</span>"
-        elif msg_type == "response":
-            formatted = f"<span style='color: #4ec9b0;'>[{timestamp}] {message}</span>"
-        elif msg_type == "confirm":
-            formatted = f"<span style='color: #6a9955;'>[{timestamp}] {message}</span>"
-        elif msg_type == "error":
-            formatted = f"<span style='color: #f48771;'>[{timestamp}] {message}</span>"
-        elif msg_type == "system":
-            formatted = f"<span style='color: #9cdcfe; font-weight: bold;'>[{timestamp}] {message}</span>"
-        else:
-            formatted = f"<span style='color: #d4d4d4;'>[{timestamp}] {message}</span>"
+                self._show_disconnected("✗ Connection lost", "error")
 
-        self.message_log.append(formatted)
+    def _show_disconnected(self, status: str, state: str):
+        """Put the connection controls back in their not-connected state"""
+        self.status_label.setText(status)
+        set_state(self.status_label, state)
+        self.connect_button.setText("⚡ CONNECT")
+        set_state(self.connect_button, "")
+        self.profile_combo.setEnabled(True)
+        self._set_connection_panels_visible(False)
+
+    @Slot()
+    def _start_receiving(self):
+        """(Re)start the background reader with the selected framing"""
+        if not self.logic.connected:
+            return
+        # Through the executor: AppLogic's socket state belongs to its thread
+        framer = make_framer(self.framing_combo.currentData())
+        self.executor.submit_start_receiving(self.receiver_signals.message_received.emit, framer,
+                                             on_closed=self.receiver_signals.closed.emit)
+
+    @Slot(bytes)
+    def _on_message_received(self, data: bytes):
+        self._log_payload("RESPONSE", data, "response")
+
+    @Slot(str)
+    def _on_receiver_closed(self, reason: str):
+        self._log_message(f"✗ {reason}", "error")
+        # Tear down through the executor so socket state stays on one thread
+        self.executor.submit_disconnect()
+
+    def _log_payload(self, label: str, data: bytes, msg_type: str):
+        """Log a payload as text, or as a hex dump when the Hex view is on"""
+        if not self.hex_view_checkbox.isChecked():
+            self._log_message(f"{label}: {data.decode('utf-8', errors='replace')}", msg_type, len(data))
+            return
+        self._log_message(f"{label}: {len(data)} bytes", msg_type, len(data))
+        for line in hexdump(data, max_lines=64):
+            self._log_message(line, msg_type)
+
+    def _log_message(self, message: str, msg_type: str = "info", nbytes: Optional[int] = None):
+        """Add a message to the log and the session journal"""
+        self.log_model.append(msg_type, message)
+        if self.journal:
+            self.journal.record(msg_type, message, nbytes)
 
     @Slot()
     def _export_log(self):
-        """Export the message log to a text file"""
-        if not self.message_log.toPlainText():
+        """Export the session journal (or the visible log) to a file"""
+        self.log_model.flush()
+        if not self.log_model.rowCount():
             return
 
         # Open save dialog
-        file_path, _ = QFileDialog.getSaveFileName(
+        file_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Export Message Log",
             f"linxtap_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-            "Text Files (*.txt);;All Files (*)"
+            "Text Files (*.txt);;JSON Lines (*.jsonl);;All Files (*)"
         )
 
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.message_log.toPlainText())
+                if self.journal:
+                    # Streams from disk: covers the whole session, flat memory
+                    fmt = 'jsonl' if 'jsonl' in selected_filter else 'text'
+                    self.journal.export(file_path, fmt)
+                else:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        for timestamp, _, text in self.log_model.records():
+                            f.write(f"[{format_timestamp(timestamp)}] {text}\n")
                 self._log_message(f"Log exported to {file_path}", "system")
             except Exception as e:
                 self._log_message(f"Export failed: {str(e)}", "error")
+
+    def closeEvent(self, event):
+        """Let in-flight jobs finish before the window goes away"""
+        self._closed = True
+        self.executor.shutdown()
+        self.pool.clear()
+        for panel in self._panels:
+            panel.shutdown()
+        if self.host_cache:
+            self.host_cache.close()
+        if self.journal:
+            self.journal.close()
+        super().closeEvent(event)
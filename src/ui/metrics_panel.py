@@ -0,0 +1,126 @@
+"""Live view of phase timings and traffic counters"""
+from PySide6.QtCore import QTimer, Slot
+from PySide6.QtWidgets import (QAbstractItemView, QCheckBox, QHBoxLayout, QHeaderView, QLabel,
+                               QPushButton, QSpinBox, QTableWidget, QTableWidgetItem,
+                               QVBoxLayout, QWidget)
+
+from src.core.metrics import get_metrics
+
+
+class MetricsPanel(QWidget):
+    """
+    Table of span timings plus counters from the shared Metrics registry.
+    Collection and the Prometheus /metrics endpoint can be toggled here.
+    """
+
+    COLUMNS = ("Phase", "Count", "Mean ms", "Max ms", "Last ms")
+
+    def __init__(self, metrics=None, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self._setup_ui()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(1000)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self._refresh_timer.start()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 8, 0, 0)
+
+        title = QLabel("▸ METRICS")
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.enable_checkbox = QCheckBox("Collect")
+        self.enable_checkbox.setChecked(self.metrics.enabled)
+        self.enable_checkbox.toggled.connect(self._on_enable_toggled)
+        self.port_input = QSpinBox()
+        self.port_input.setRange(1024, 65535)
+        self.port_input.setValue(9464)
+        self.serve_button = QPushButton("Serve /metrics")
+        self.serve_button.setCheckable(True)
+        self.serve_button.toggled.connect(self._on_serve_toggled)
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self._on_reset)
+        controls.addWidget(self.enable_checkbox)
+        controls.addStretch()
+        controls.addWidget(QLabel("Port"))
+        controls.addWidget(self.port_input)
+        controls.addWidget(self.serve_button)
+        controls.addWidget(self.reset_button)
+        layout.addLayout(controls)
+
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("hint")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel("")
+        self.counters_label.setObjectName("stats")
+        layout.addWidget(self.counters_label)
+
+    @Slot(bool)
+    def _on_enable_toggled(self, checked: bool):
+        self.metrics.enabled = checked
+        self.refresh()
+
+    @Slot(bool)
+    def _on_serve_toggled(self, checked: bool):
+        if not checked:
+            self.metrics.stop_serving()
+            self.status_label.setText("")
+            return
+        try:
+            host, port = self.metrics.serve(self.port_input.value())
+        except OSError as e:
+            self.status_label.setText(f"✗ Cannot serve metrics: {str(e)}")
+            self.serve_button.setChecked(False)
+            return
+        self.status_label.setText(f"Prometheus endpoint: http://{host}:{port}/metrics")
+
+    @Slot()
+    def _on_reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    @Slot()
+    def refresh(self):
+        if not self.isVisible():
+            return
+        snapshot = self.metrics.snapshot()
+        spans = sorted(snapshot['spans'].items())
+        self.table.setRowCount(len(spans))
+        for row, ((name, labels), stats) in enumerate(spans):
+            label_text = ",".join(str(v) for _, v in labels)
+            phase = f"{name} [{label_text}]" if label_text else name
+            values = (phase, str(stats['count']), f"{stats['mean_ms']:.3f}",
+                      f"{stats['max_ms']:.3f}", f"{stats['last_ms']:.3f}")
+            for column, value in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    self.table.setItem(row, column, QTableWidgetItem(value))
+                elif item.text() != value:
+                    item.setText(value)
+
+        lines = []
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            label_text = ",".join(f"{k}={v}" for k, v in labels)
+            lines.append(f"{name}{{{label_text}}}  {value}" if label_text else f"{name}  {value}")
+        if not self.metrics.enabled:
+            lines.append("(collection disabled)")
+        self.counters_label.setText("\n".join(lines))
+
+    def shutdown(self):
+        self._refresh_timer.stop()
+        self.metrics.stop_serving()
@@ -0,0 +1,261 @@
+"""Health monitor tab: live up/down grid for many scheduled targets"""
+import time
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, Qt, QTimer, Signal, Slot
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import (QAbstractItemView, QComboBox, QDoubleSpinBox, QFormLayout,
+                               QHBoxLayout, QHeaderView, QLabel, QLineEdit, QPushButton,
+                               QTableView, QVBoxLayout, QWidget)
+
+from src.core.async_engine import EventLoopThread
+from src.core.monitor import PROBE_MODES, HealthMonitor
+from src.core.payload import decode_escapes
+from src.ui.log_view import LogModel, LogView
+from src.ui.theme import PALETTE
+
+_SPARK = '▁▂▃▄▅▆▇█'
+
+
+def sparkline(samples: list) -> str:
+    """One character per (timestamp, rtt_ms) sample, scaled to the window's max; × is a failure"""
+    rtts = [rtt for _, rtt in samples if rtt is not None]
+    top = max(rtts) if rtts else 0.0
+    chars = []
+    for _, rtt in samples:
+        if rtt is None:
+            chars.append('×')
+        elif not top:
+            chars.append(_SPARK[0])
+        else:
+            chars.append(_SPARK[min(len(_SPARK) - 1, int(rtt / top * len(_SPARK)))])
+    return ''.join(chars)
+
+
+class MonitorSignals(QObject):
+    """Relays HealthMonitor events from the asyncio thread to the GUI"""
+    event = Signal(str, dict)
+    finished = Signal(dict)
+
+
+class MonitorModel(QAbstractTableModel):
+    """
+    Table over HealthMonitor.snapshot(), replaced wholesale on each refresh.
+    Only painted cells are formatted, so thousands of rows stay cheap.
+    """
+
+    COLUMNS = ("Target", "State", "RTT ms", "Avg ms", "± ms", "Up %", "History", "Checks",
+               "Last error")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.monitor = None
+        self._rows = []
+        self._colors = {
+            'up': QColor(PALETTE['ok_text']),
+            'down': QColor(PALETTE['error_text']),
+            'unknown': QColor(PALETTE['muted']),
+            'flapping': QColor(PALETTE['warning']),
+        }
+
+    def update(self, monitor, rows: list):
+        """Show a new snapshot; rows are only reset when the target set changed"""
+        self.monitor = monitor
+        if len(rows) != len(self._rows):
+            self.beginResetModel()
+            self._rows = rows
+            self.endResetModel()
+            return
+        self._rows = rows
+        if rows:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(rows) - 1, len(self.COLUMNS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        info = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ForegroundRole and column == 1:
+            return self._colors['flapping' if info['flapping'] else info['state']]
+        if role == Qt.ToolTipRole and column == 1 and info['since']:
+            return f"Since {time.strftime('%H:%M:%S', time.localtime(info['since']))}"
+        if role != Qt.DisplayRole:
+            return None
+
+        def ms(value):
+            return "-" if value is None else f"{value:.2f}"
+
+        if column == 0:
+            return info['target']
+        if column == 1:
+            return f"{info['state']} ⚑" if info['flapping'] else info['state']
+        if column == 2:
+            return ms(info['rtt_ms'])
+        if column == 3:
+            return ms(info['rtt_avg_ms'])
+        if column == 4:
+            return ms(info['rtt_dev_ms'])
+        if column == 5:
+            return "-" if info['availability'] is None else f"{info['availability']:.0%}"
+        if column == 6:
+            target = self.monitor.targets.get(info['target']) if self.monitor else None
+            return sparkline(target.history.samples(last=30)) if target else ""
+        if column == 7:
+            return str(info['checks'])
+        return info['last_error'] or ""
+
+
+class MonitorPanel(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.signals = MonitorSignals(self)
+        self.signals.event.connect(self._on_event)
+        self.signals.finished.connect(self._on_finished)
+        self._loop_thread = None
+        self.monitor = None
+        self._setup_ui()
+
+        # State lives on the loop thread; the grid polls it once a second
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(1000)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 8, 0, 0)
+
+        title = QLabel("▸ HEALTH MONITOR")
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        form = QFormLayout()
+        self.targets_input = QLineEdit("127.0.0.1")
+        self.targets_input.setToolTip("IPs, CIDR ranges or host names, comma-separated")
+        self.ports_input = QLineEdit("8080")
+        self.ports_input.setToolTip("e.g. 22,80,8000-8010")
+
+        timing_layout = QHBoxLayout()
+        self.interval_input = QDoubleSpinBox()
+        self.interval_input.setRange(0.1, 3600)
+        self.interval_input.setValue(5)
+        self.interval_input.setSuffix(" s")
+        self.timeout_input = QDoubleSpinBox()
+        self.timeout_input.setRange(0.05, 60)
+        self.timeout_input.setValue(1)
+        self.timeout_input.setSuffix(" s timeout")
+        timing_layout.addWidget(self.interval_input)
+        timing_layout.addWidget(self.timeout_input)
+
+        probe_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        for mode in PROBE_MODES:
+            self.mode_combo.addItem(mode.capitalize(), mode)
+        self.payload_input = QLineEdit("\\n")
+        self.payload_input.setToolTip("Echo payload; \\n, \\t and \\xNN escapes work")
+        probe_layout.addWidget(self.mode_combo)
+        probe_layout.addWidget(self.payload_input)
+
+        form.addRow("Targets", self.targets_input)
+        form.addRow("Ports", self.ports_input)
+        form.addRow("Interval", timing_layout)
+        form.addRow("Probe", probe_layout)
+        layout.addLayout(form)
+
+        self.start_button = QPushButton("▶ START")
+        self.start_button.setMinimumHeight(32)
+        self.start_button.clicked.connect(self._on_start_stop)
+        layout.addWidget(self.start_button)
+
+        self.summary_label = QLabel("Idle")
+        self.summary_label.setObjectName("stats")
+        layout.addWidget(self.summary_label)
+
+        self.model = MonitorModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(20)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.table)
+
+        self.log_view = LogView(LogModel(max_records=2000, parent=self))
+        self.log_view.setMaximumHeight(100)
+        self.log_view.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.log_view)
+
+    @Slot()
+    def _on_start_stop(self):
+        if self.monitor is not None:
+            self._loop_thread.loop.call_soon_threadsafe(self.monitor.stop)
+            self.start_button.setEnabled(False)
+            return
+
+        try:
+            monitor = HealthMonitor(
+                interval=self.interval_input.value(), timeout=self.timeout_input.value(),
+                mode=self.mode_combo.currentData(),
+                payload=decode_escapes(self.payload_input.text()),
+                on_event=self.signals.event.emit)
+            monitor.add_targets(self.targets_input.text(), self.ports_input.text())
+        except ValueError as e:
+            self.summary_label.setText(f"✗ {str(e)}")
+            return
+
+        self.monitor = monitor
+        if self._loop_thread is None:
+            self._loop_thread = EventLoopThread()
+        self._loop_thread.submit(monitor.run(), self.signals.finished.emit)
+        self.start_button.setText("■ STOP")
+        self.log_view.model().clear()
+        self.refresh()
+        self._refresh_timer.start()
+
+    @Slot()
+    def refresh(self):
+        if self.monitor is None or not self.isVisible():
+            return
+        self.model.update(self.monitor, self.monitor.snapshot())
+        summary = self.monitor.summary()
+        self.summary_label.setText(
+            f"targets {summary['targets']}   up {summary['up']}   down {summary['down']}"
+            f"   unknown {summary['unknown']}   flapping {summary['flapping']}"
+            f"   in flight {summary['in_flight']}   lag {summary['lag_ms']:.1f} ms")
+
+    @Slot(str, dict)
+    def _on_event(self, event: str, info: dict):
+        kind = {'up': 'confirm', 'down': 'error', 'flapping': 'error'}.get(event, 'system')
+        detail = f" ({info['last_error']})" if event == 'down' and info['last_error'] else ""
+        self.log_view.model().append(kind, f"{info['target']} {event}{detail}")
+
+    @Slot(dict)
+    def _on_finished(self, result):
+        self.refresh()
+        self._refresh_timer.stop()
+        self.monitor = None
+        self.start_button.setEnabled(True)
+        self.start_button.setText("▶ START")
+        if isinstance(result, dict) and result.get('status') == 'error':
+            self.summary_label.setText(f"✗ {result['message']}")
+
+    def shutdown(self):
+        self._refresh_timer.stop()
+        if self._loop_thread:
+            if self.monitor is not None:
+                self._loop_thread.loop.call_soon_threadsafe(self.monitor.stop)
+            self._loop_thread.stop()
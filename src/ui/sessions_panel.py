@@ -0,0 +1,214 @@
+"""Multi-session view: many devices watched from one window"""
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import (QAbstractItemView, QHBoxLayout, QHeaderView, QLabel,
+                               QLineEdit, QPushButton, QTableWidget, QTableWidgetItem,
+                               QVBoxLayout, QWidget)
+
+from src.core.framing import NewlineFramer
+from src.core.session_manager import SessionManager
+from src.ui.log_view import LogModel, LogView
+
+
+class SessionSignals(QObject):
+    """Relays SessionManager events from its loop thread to the GUI thread"""
+    event = Signal(str, str, object)
+
+
+class SessionsPanel(QWidget):
+    """
+    Table of sessions owned by one SessionManager, with a per-session log.
+    Selecting a row switches the log and the send box to that session.
+    """
+
+    COLUMNS = ("ID", "Target", "State", "OS", "Type", "In", "Out", "Msgs")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.signals = SessionSignals(self)
+        self.signals.event.connect(self._on_event)
+        self.manager = SessionManager(on_event=self.signals.event.emit)
+        self._logs = {}
+        self._rows = {}
+        self._setup_ui()
+
+        # Counters change on the loop thread; poll them cheaply for display
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(500)
+        self._refresh_timer.timeout.connect(self._refresh_counters)
+        self._refresh_timer.start()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 8, 0, 0)
+
+        title = QLabel("▸ SESSIONS")
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        # New session inputs
+        open_layout = QHBoxLayout()
+        self.ip_input = QLineEdit()
+        self.ip_input.setPlaceholderText("IP")
+        self.port_input = QLineEdit()
+        self.port_input.setPlaceholderText("PORT")
+        self.port_input.setMaximumWidth(80)
+        self.open_button = QPushButton("+ Open")
+        self.open_button.clicked.connect(self._on_open)
+        self.port_input.returnPressed.connect(self._on_open)
+        open_layout.addWidget(self.ip_input)
+        open_layout.addWidget(self.port_input)
+        open_layout.addWidget(self.open_button)
+        layout.addLayout(open_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("hint")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.itemSelectionChanged.connect(self._on_selection_changed)
+        layout.addWidget(self.table)
+
+        # Shown while no session is selected
+        self._empty_log = LogModel(parent=self)
+        self.log_view = LogView(self._empty_log)
+        self.log_view.setMaximumHeight(120)
+        self.log_view.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.log_view)
+
+        send_layout = QHBoxLayout()
+        self.message_input = QLineEdit()
+        self.message_input.setPlaceholderText("Message for selected session...")
+        self.message_input.returnPressed.connect(self._on_send)
+        self.send_button = QPushButton("→ Send")
+        self.send_button.clicked.connect(self._on_send)
+        self.close_button = QPushButton("✕ Close")
+        self.close_button.clicked.connect(self._on_close)
+        send_layout.addWidget(self.message_input)
+        send_layout.addWidget(self.send_button)
+        send_layout.addWidget(self.close_button)
+        layout.addLayout(send_layout)
+
+    def selected_session(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return self.table.item(rows[0].row(), 0).text()
+
+    @Slot()
+    def _on_open(self):
+        result = self.manager.open_session(self.ip_input.text(), self.port_input.text(),
+                                           NewlineFramer())
+        if result['status'] == 'error':
+            self.status_label.setText(f"✗ {result['message']}")
+            return
+        self.status_label.setText(result['message'])
+        session_id = result['session_id']
+        self._logs[session_id] = LogModel(parent=self)
+        self._logs[session_id].append('system', result['message'])
+        self._add_row(session_id)
+        self.table.selectRow(self._rows[session_id])
+
+    @Slot()
+    def _on_send(self):
+        session_id = self.selected_session()
+        message = self.message_input.text()
+        if not session_id or not message:
+            return
+        result = self.manager.send(session_id, message + '\n')
+        if result['status'] == 'error':
+            self._logs[session_id].append('error', f"✗ {result['message']}")
+        else:
+            self._logs[session_id].append('sent', f"SENT: {message}")
+            self.message_input.clear()
+
+    @Slot()
+    def _on_close(self):
+        session_id = self.selected_session()
+        if session_id:
+            self.manager.close_session(session_id)
+            self._remove_row(session_id)
+
+    @Slot()
+    def _on_selection_changed(self):
+        session_id = self.selected_session()
+        if session_id in self._logs:
+            self.log_view.setModel(self._logs[session_id])
+
+    @Slot(str, str, object)
+    def _on_event(self, event: str, session_id: str, payload):
+        log = self._logs.get(session_id)
+        if log is None:
+            return
+        if event == 'connected':
+            log.append('system', f"Connected to {payload['ip']}:{payload['port']}")
+        elif event == 'message':
+            log.append('response', f"RESPONSE: {payload.decode('utf-8', errors='replace')}")
+        elif event == 'error':
+            log.append('error', f"✗ {payload}")
+        elif event == 'closed':
+            log.append('system', payload)
+        self._refresh_row(session_id)
+
+    def _add_row(self, session_id: str):
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        for column in range(len(self.COLUMNS)):
+            self.table.setItem(row, column, QTableWidgetItem(""))
+        self.table.item(row, 0).setText(session_id)
+        self._rows[session_id] = row
+        self._refresh_row(session_id)
+
+    def _remove_row(self, session_id: str):
+        row = self._rows.pop(session_id, None)
+        if row is None:
+            return
+        self.table.removeRow(row)
+        log = self._logs.pop(session_id, None)
+        self._rows = {sid: (r - 1 if r > row else r) for sid, r in self._rows.items()}
+        if log is not None and self.log_view.model() is log:
+            # The removed session was on display: show the new selection's log, or none
+            self.log_view.setModel(self._logs.get(self.selected_session(), self._empty_log))
+        if log is not None:
+            log.deleteLater()
+
+    def _refresh_row(self, session_id: str):
+        info = self.manager.get(session_id)
+        row = self._rows.get(session_id)
+        if info is None or row is None:
+            return
+        values = (
+            session_id,
+            f"{info['ip']}:{info['port']}",
+            info['state'],
+            info['remote_os'] or "…",
+            "Gateway" if info['is_gateway'] else "Device",
+            str(info['bytes_in']),
+            str(info['bytes_out']),
+            f"{info['messages_in']}/{info['messages_out']}",
+        )
+        for column, value in enumerate(values):
+            item = self.table.item(row, column)
+            if item.text() != value:
+                item.setText(value)
+        color = {"connected": "#8fd460", "error": "#f48771"}.get(info['state'], "#858585")
+        self.table.item(row, 2).setForeground(QColor(color))
+
+    @Slot()
+    def _refresh_counters(self):
+        if not self.isVisible():
+            return
+        for session_id in list(self._rows):
+            self._refresh_row(session_id)
+
+    def shutdown(self):
+        self._refresh_timer.stop()
+        self.manager.shutdown()
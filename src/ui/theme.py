@@ -0,0 +1,193 @@
+"""
+Application theme: one stylesheet for every widget.
+
+Widgets opt in by object name (setObjectName("card")) and switch looks
+through dynamic properties (set_state(label, "connected")) instead of
+carrying their own stylesheets, so Qt parses the theme once at startup
+rather than once per widget and per state change.
+"""
+
+# Modern terminal palette
+PALETTE = {
+    'background': '#1e1e1e',
+    'surface': '#252526',
+    'input': '#2d2d2d',
+    'border': '#3e3e3e',
+    'muted_surface': '#3c3c3c',
+    'text': '#d4d4d4',
+    'muted': '#858585',
+    'accent': '#4ec9b0',
+    'label': '#9cdcfe',
+    'link': '#569cd6',
+    'focus': '#007acc',
+    'button': '#0e639c',
+    'button_hover': '#1177bb',
+    'button_pressed': '#0d5a8f',
+    'danger': '#8b0000',
+    'danger_hover': '#a00000',
+    'ok_surface': '#2d5016',
+    'ok_text': '#8fd460',
+    'error_surface': '#5a1d1d',
+    'error_text': '#f48771',
+    'warning': '#ff9800',
+}
+
+_TEMPLATE = """
+QMainWindow {{
+    background-color: {background};
+}}
+QWidget {{
+    background-color: {background};
+    color: {text};
+    font-family: 'Monospace', 'Consolas', 'Courier New';
+}}
+QLabel {{
+    color: {text};
+    font-size: 11px;
+}}
+QLineEdit {{
+    background-color: {input};
+    border: 1px solid {border};
+    border-radius: 3px;
+    padding: 6px 8px;
+    color: {text};
+    font-size: 11px;
+}}
+QLineEdit:focus {{
+    border: 1px solid {focus};
+}}
+QPushButton {{
+    background-color: {button};
+    border: none;
+    border-radius: 3px;
+    padding: 8px 16px;
+    color: #ffffff;
+    font-weight: 500;
+    font-size: 11px;
+}}
+QPushButton:hover {{
+    background-color: {button_hover};
+}}
+QPushButton:pressed {{
+    background-color: {button_pressed};
+}}
+QPushButton#connectButton[state="connected"] {{
+    background-color: {danger};
+}}
+QPushButton#connectButton[state="connected"]:hover {{
+    background-color: {danger_hover};
+}}
+QPushButton#smallButton {{
+    background-color: {muted_surface};
+    padding: 4px 10px;
+    font-size: 9px;
+}}
+QPushButton#smallButton:hover {{
+    background-color: #505050;
+}}
+QListView {{
+    background-color: {background};
+    border: 1px solid {border};
+    border-radius: 3px;
+    color: {text};
+    padding: 4px;
+}}
+QTabWidget::pane {{
+    border: none;
+}}
+QTabBar::tab {{
+    background-color: {surface};
+    color: {muted};
+    padding: 6px 14px;
+    border: none;
+}}
+QTabBar::tab:selected {{
+    background-color: {background};
+    color: {accent};
+}}
+QTableWidget {{
+    background-color: {background};
+    border: 1px solid {border};
+    gridline-color: {input};
+}}
+QHeaderView::section {{
+    background-color: {surface};
+    color: {label};
+    border: none;
+    padding: 4px;
+}}
+QFrame#divider {{
+    background-color: {border};
+}}
+QFrame#card {{
+    background-color: {surface};
+    border-radius: 4px;
+    padding: 10px;
+}}
+QFrame#card[roomy="true"] {{
+    padding: 12px;
+}}
+QFrame#card QLabel {{
+    background-color: {surface};
+}}
+QLabel#appTitle {{
+    font-size: 20px;
+    font-weight: bold;
+    color: {accent};
+    padding: 8px;
+}}
+QLabel#sectionTitle {{
+    color: {accent};
+    font-weight: bold;
+    font-size: 10px;
+}}
+QLabel#fieldLabel {{
+    color: {label};
+    font-weight: 500;
+}}
+QLabel#infoLabel, QLabel#hint {{
+    color: {muted};
+}}
+QLabel#infoValue {{
+    color: {text};
+    font-weight: 500;
+}}
+QLabel#infoValue[state="address"] {{
+    color: {link};
+}}
+QLabel#infoValue[state="gateway"] {{
+    color: {warning};
+}}
+QLabel#stats {{
+    color: {text};
+    font-family: 'Monospace';
+}}
+QLabel#statusLabel {{
+    padding: 8px;
+    background-color: {muted_surface};
+    border-radius: 3px;
+    color: {muted};
+    font-size: 11px;
+}}
+QLabel#statusLabel[state="connected"] {{
+    background-color: {ok_surface};
+    color: {ok_text};
+}}
+QLabel#statusLabel[state="error"] {{
+    background-color: {error_surface};
+    color: {error_text};
+}}
+"""
+
+# Built once at import; applied once to the top-level window
+STYLESHEET = _TEMPLATE.format(**PALETTE)
+
+
+def set_state(widget, state: str):
+    """Switch a themed widget's look (its "state" property) and re-polish it"""
+    if widget.property('state') == state:
+        return
+    widget.setProperty('state', state)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
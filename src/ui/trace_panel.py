@@ -0,0 +1,127 @@
+"""Path discovery tab: per-hop addresses, RTT and loss"""
+import threading
+
+from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (QAbstractItemView, QComboBox, QHBoxLayout, QHeaderView, QLabel,
+                               QLineEdit, QPushButton, QSpinBox, QTableWidget, QTableWidgetItem,
+                               QVBoxLayout, QWidget)
+
+from src.utils.traceroute import TRACE_PROTOCOLS, traceroute
+
+
+class TraceSignals(QObject):
+    """Relays a finished trace from its worker thread to the GUI"""
+    finished = Signal(dict)
+
+
+def format_hop(hop: dict) -> tuple:
+    """Table cells for one hop: TTL, addresses, loss, RTTs"""
+    rtts = "  ".join("*" if rtt is None else f"{rtt:.2f}" for rtt in hop['rtt_ms'])
+    addresses = ", ".join(hop['addresses']) or "*"
+    if hop['gateway']:
+        addresses += "  (gateway)"
+    if hop['kind'] == 'unreachable':
+        addresses += "  !unreachable"
+    return str(hop['ttl']), addresses, f"{hop['loss']:.0%}", rtts
+
+
+class TracePanel(QWidget):
+    COLUMNS = ("Hop", "Address", "Loss", "RTT ms")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.signals = TraceSignals(self)
+        self.signals.finished.connect(self._on_finished)
+        self._thread = None
+        self._setup_ui()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setSpacing(8)
+        layout.setContentsMargins(0, 8, 0, 0)
+
+        title = QLabel("▸ TRACE ROUTE")
+        title.setObjectName("sectionTitle")
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.host_input = QLineEdit()
+        self.host_input.setPlaceholderText("Host or IP")
+        self.host_input.returnPressed.connect(self._on_start)
+        self.protocol_combo = QComboBox()
+        for protocol in TRACE_PROTOCOLS:
+            self.protocol_combo.addItem(protocol.upper(), protocol)
+        self.protocol_combo.setToolTip("TCP needs raw sockets (CAP_NET_RAW)")
+        self.port_input = QSpinBox()
+        self.port_input.setRange(0, 65535)
+        self.port_input.setSpecialValueText("default port")
+        self.max_hops_input = QSpinBox()
+        self.max_hops_input.setRange(1, 255)
+        self.max_hops_input.setValue(30)
+        self.max_hops_input.setSuffix(" hops")
+        controls.addWidget(self.host_input, 1)
+        controls.addWidget(self.protocol_combo)
+        controls.addWidget(self.port_input)
+        controls.addWidget(self.max_hops_input)
+        layout.addLayout(controls)
+
+        self.start_button = QPushButton("▶ TRACE")
+        self.start_button.setMinimumHeight(32)
+        self.start_button.clicked.connect(self._on_start)
+        layout.addWidget(self.start_button)
+
+        self.summary_label = QLabel("Idle")
+        self.summary_label.setObjectName("stats")
+        layout.addWidget(self.summary_label)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.table)
+
+    @Slot()
+    def _on_start(self):
+        host = self.host_input.text().strip()
+        if not host or self._thread is not None:
+            return
+        protocol = self.protocol_combo.currentData()
+        port = self.port_input.value() or None
+        max_hops = self.max_hops_input.value()
+
+        def run():
+            try:
+                result = traceroute(host, protocol=protocol, port=port, max_hops=max_hops)
+            except ValueError as e:
+                result = {'status': 'error', 'message': f'Error: {str(e)}'}
+            self.signals.finished.emit(result)
+
+        self.start_button.setEnabled(False)
+        self.summary_label.setText(f"Tracing {host}...")
+        self._thread = threading.Thread(target=run, name='linxtap-trace', daemon=True)
+        self._thread.start()
+
+    @Slot(dict)
+    def _on_finished(self, result: dict):
+        self._thread = None
+        self.start_button.setEnabled(True)
+        if result['status'] == 'error':
+            self.summary_label.setText(f"✗ {result['message']}")
+            return
+        self.summary_label.setText(
+            f"{result['address']}  {result['protocol']}   {result['message']}"
+            f"   {result['elapsed_ms']:.0f} ms")
+        self.table.setRowCount(len(result['hops']))
+        for row, hop in enumerate(result['hops']):
+            for column, value in enumerate(format_hop(hop)):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def shutdown(self):
+        # A trace ends on its own within its timeout; nothing to cancel
+        if self._thread is not None:
+            self._thread.join(timeout=0.1)
@@ -0,0 +1,225 @@
+"""In-process ICMP echo (ping) for many hosts over one socket"""
+import errno
+import itertools
+import os
+import select
+import socket
+import struct
+import time
+from collections import deque
+from typing import Iterable, Optional
+
+from src.utils.resolver import get_resolver
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+
+# Not exported by the socket module on every Python build (linux/in.h)
+IP_RECVTTL = getattr(socket, 'IP_RECVTTL', 12)
+
+_PAYLOAD = b'linxtap-echo\x00\x00\x00\x00'
+
+
+def icmp_checksum(data: bytes) -> int:
+    """RFC 1071 internet checksum"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int, payload: bytes = _PAYLOAD) -> bytes:
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    checksum = icmp_checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + payload
+
+
+class IcmpPinger:
+    """
+    Sends ICMP echo requests and matches replies by sequence number.
+
+    Prefers an unprivileged datagram ICMP socket (allowed for groups in
+    net.ipv4.ping_group_range; the kernel then owns the echo identifier
+    and only delivers our own replies), falling back to a raw socket with
+    CAP_NET_RAW. Use open(), which returns None if neither is permitted.
+    """
+
+    def __init__(self, sock: socket.socket, raw: bool):
+        self.sock = sock
+        self.raw = raw
+        self.ident = os.getpid() & 0xFFFF
+        self._seqs = itertools.cycle(range(1, 0x10000))
+
+    @classmethod
+    def open(cls) -> Optional['IcmpPinger']:
+        """Return a pinger, or None if ICMP sockets are not permitted"""
+        for sock_type, raw in ((socket.SOCK_DGRAM, False), (socket.SOCK_RAW, True)):
+            try:
+                sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+            except OSError:
+                continue
+            try:
+                sock.setblocking(False)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+                if not raw:
+                    # Raw sockets see the IP header; datagram ones need the TTL as ancillary data
+                    sock.setsockopt(socket.IPPROTO_IP, IP_RECVTTL, 1)
+            except OSError:
+                pass
+            return cls(sock, raw)
+        return None
+
+    def ping(self, ip: str, timeout: float = 1.0) -> dict:
+        """Echo one host; returns a ping_many() result"""
+        return next(iter(self.ping_many([ip], timeout=timeout)))
+
+    def ping_many(self, targets: Iterable[str], timeout: float = 1.0,
+                  max_outstanding: int = 4096, rate: Optional[float] = None):
+        """
+        Echo every target once, keeping up to max_outstanding requests in
+        flight (optionally paced to rate requests per second).
+        Yields a dict per target as soon as it is known, with 'ip',
+        'status' ('alive', 'timeout' or 'error'), 'rtt_ms', 'ttl' and
+        'message'.
+        """
+        max_outstanding = max(1, min(max_outstanding, 0xFFFF))
+        outstanding = {}
+        expiry = deque()
+        targets = iter(targets)
+        exhausted = False
+        interval = 1.0 / rate if rate else 0.0
+        next_send = time.monotonic()
+
+        while not exhausted or outstanding:
+            now = time.monotonic()
+            while not exhausted and len(outstanding) < max_outstanding and next_send <= now:
+                ip = next(targets, None)
+                if ip is None:
+                    exhausted = True
+                    break
+                result = self._send(ip, outstanding, expiry, timeout)
+                if result:
+                    yield result
+                next_send = max(next_send + interval, now) if interval else now
+                # Keep the receive queue short while sending a large batch
+                yield from self._receive(outstanding, 0)
+                now = time.monotonic()
+
+            while expiry and expiry[0][0] <= now:
+                _, seq, sent_at = expiry.popleft()
+                entry = outstanding.get(seq)
+                # The sequence number may have been answered and reused since
+                if entry and entry[2] == sent_at:
+                    del outstanding[seq]
+                    yield _result(entry[0], 'timeout', message='No reply')
+
+            if not outstanding:
+                if not exhausted:
+                    # Paced and idle: wait for the next send slot
+                    time.sleep(max(0.0, next_send - now))
+                continue
+            wait = timeout
+            if expiry:
+                wait = min(wait, expiry[0][0] - now)
+            if not exhausted and len(outstanding) < max_outstanding:
+                wait = min(wait, max(0.0, next_send - now))
+            yield from self._receive(outstanding, max(0.0, wait))
+
+    def _send(self, ip: str, outstanding: dict, expiry: deque, timeout: float) -> Optional[dict]:
+        """Send one echo request; returns an error result if it cannot be sent"""
+        try:
+            address = get_resolver().resolve(ip, 0, socket.AF_INET)[0][1][0]
+        except OSError as e:
+            return _result(ip, 'error', message=f'Error: {str(e)}')
+        seq = next(self._seqs)
+        while seq in outstanding:
+            seq = next(self._seqs)
+        packet = build_echo_request(self.ident, seq)
+        for _ in range(100):
+            try:
+                self.sock.sendto(packet, (address, 0))
+                break
+            except (BlockingIOError, InterruptedError):
+                select.select([], [self.sock], [], 0.01)
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:  # the device queue is full: retry
+                    return _result(ip, 'error', message=f'Error: {str(e)}')
+                time.sleep(0.001)
+        else:
+            return _result(ip, 'error', message='Error: send buffer full')
+        sent_at = time.monotonic()
+        outstanding[seq] = (ip, address, sent_at)
+        expiry.append((sent_at + timeout, seq, sent_at))
+        return None
+
+    def _receive(self, outstanding: dict, wait: float):
+        """Yield results for replies that arrive within wait seconds"""
+        readable, _, _ = select.select([self.sock], [], [], wait)
+        if not readable:
+            return
+        while True:
+            try:
+                if self.raw:
+                    packet, (source, _) = self.sock.recvfrom(65535)
+                    received = time.monotonic()
+                    ihl = (packet[0] & 0x0F) * 4
+                    ttl = packet[8]
+                    icmp = packet[ihl:]
+                else:
+                    icmp, ancdata, _, (source, _) = self.sock.recvmsg(65535, 64)
+                    received = time.monotonic()
+                    ttl = _ancillary_ttl(ancdata)
+            except OSError:
+                # Includes BlockingIOError: the queue is drained
+                return
+
+            if len(icmp) < 8 or icmp[0] != ICMP_ECHO_REPLY:
+                continue
+            ident, seq = struct.unpack('!HH', icmp[4:8])
+            # Raw sockets see every host's ICMP; datagram ones get the id rewritten
+            if self.raw and ident != self.ident:
+                continue
+            entry = outstanding.get(seq)
+            if entry is None or entry[1] != source:
+                continue
+            del outstanding[seq]
+            yield _result(entry[0], 'alive', rtt_ms=(received - entry[2]) * 1000.0, ttl=ttl,
+                          message='Echo reply')
+
+    def close(self):
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _ancillary_ttl(ancdata) -> Optional[int]:
+    for level, kind, data in ancdata:
+        if level == socket.IPPROTO_IP and kind == socket.IP_TTL and len(data) >= 4:
+            return struct.unpack('i', data[:4])[0]
+    return None
+
+
+def _result(ip: str, status: str, rtt_ms: Optional[float] = None, ttl: Optional[int] = None,
+            message: str = '') -> dict:
+    return {'ip': ip, 'status': status, 'rtt_ms': rtt_ms, 'ttl': ttl, 'message': message}
+
+
+def icmp_ttl(ip: str, timeout: float = 1.0) -> Optional[int]:
+    """
+    TTL of an ICMP echo reply from ip, or None if ICMP is not permitted
+    or the host did not answer in time.
+    """
+    pinger = IcmpPinger.open()
+    if pinger is None:
+        return None
+    with pinger:
+        return pinger.ping(ip, timeout)['ttl']
@@ -0,0 +1,505 @@
+"""
+Local interface and address inventory.
+
+Links and addresses are dumped once over rtnetlink (RTM_GETLINK /
+RTM_GETADDR, falling back to /sys/class/net and /proc/net/if_inet6) and
+then kept current from netlink link, address and route events, so
+lookups never re-probe the system.
+"""
+import errno
+import fcntl
+import ipaddress
+import os
+import socket
+import struct
+import threading
+from typing import Optional
+
+# linux/netlink.h, linux/rtnetlink.h
+NETLINK_ROUTE = 0
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+# linux/if_link.h, linux/if_addr.h
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_MTU = 4
+IFLA_OPERSTATE = 16
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_FLAGS = 8
+IFA_F_SECONDARY = 0x01
+IFA_F_DEPRECATED = 0x20
+IFA_F_TENTATIVE = 0x40
+
+# linux/if.h
+IFF_UP = 0x1
+IFF_LOOPBACK = 0x8
+IFF_RUNNING = 0x40
+
+# RFC 2863 operational states, as reported in IFLA_OPERSTATE
+OPERSTATES = ('unknown', 'notpresent', 'down', 'lowerlayerdown', 'testing', 'dormant', 'up')
+
+# ifaddrmsg scopes (linux/rtnetlink.h)
+SCOPE_UNIVERSE = 0
+SCOPE_LINK = 253
+SCOPE_HOST = 254
+
+_NLMSGHDR = struct.Struct('=IHHII')
+_IFINFOMSG = struct.Struct('=BxHiII')
+_IFADDRMSG = struct.Struct('=BBBBI')
+_RTATTR = struct.Struct('=HH')
+
+# Stand-ins for "anywhere on the Internet" when choosing a primary address
+_PUBLIC_DESTINATIONS = {socket.AF_INET: '8.8.8.8', socket.AF_INET6: '2001:4860:4860::8888'}
+
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891B
+
+# RFC 6724 default policy table labels, most specific prefix first
+_POLICY_LABELS = tuple((ipaddress.ip_network(prefix), label) for prefix, label in (
+    ('::1/128', 0), ('::ffff:0:0/96', 4), ('2001::/32', 5), ('::/96', 3),
+    ('2002::/16', 2), ('fec0::/10', 11), ('3ffe::/16', 12), ('fc00::/7', 13), ('::/0', 1)))
+
+
+def policy_label(ip) -> int:
+    """RFC 6724 label of an address; IPv4 is labelled as IPv4-mapped IPv6"""
+    if ip.version == 4:
+        return 4
+    return next(label for network, label in _POLICY_LABELS if ip in network)
+
+
+def _common_prefix_length(a, b) -> int:
+    return a.max_prefixlen - (int(a) ^ int(b)).bit_length()
+
+
+def parse_messages(data: bytes):
+    """Yield (type, payload) for each nlmsghdr-framed message in data"""
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            return
+        yield msg_type, data[offset + _NLMSGHDR.size:offset + length]
+        offset += (length + 3) & ~3
+
+
+def parse_attributes(data: bytes, offset: int) -> dict:
+    """rtattr type -> payload for the attributes starting at offset"""
+    attributes = {}
+    while offset + _RTATTR.size <= len(data):
+        length, kind = _RTATTR.unpack_from(data, offset)
+        if length < _RTATTR.size:
+            break
+        attributes[kind] = data[offset + _RTATTR.size:offset + length]
+        offset += (length + 3) & ~3
+    return attributes
+
+
+def parse_link(payload: bytes) -> dict:
+    """Interface dict from an RTM_NEWLINK payload"""
+    _, _, index, flags, _ = _IFINFOMSG.unpack_from(payload)
+    attrs = parse_attributes(payload, _IFINFOMSG.size)
+    operstate = attrs.get(IFLA_OPERSTATE, b'\x00')[0]
+    mac = attrs.get(IFLA_ADDRESS, b'')
+    return {
+        'index': index,
+        'name': attrs.get(IFLA_IFNAME, b'').split(b'\x00', 1)[0].decode(errors='replace'),
+        'mtu': struct.unpack('=I', attrs[IFLA_MTU])[0] if IFLA_MTU in attrs else None,
+        'mac': ':'.join(f'{b:02x}' for b in mac) or None,
+        'up': bool(flags & IFF_UP),
+        'running': bool(flags & IFF_RUNNING),
+        'loopback': bool(flags & IFF_LOOPBACK),
+        'operstate': OPERSTATES[operstate] if operstate < len(OPERSTATES) else 'unknown',
+        'addresses': [],
+    }
+
+
+def parse_address(payload: bytes) -> tuple:
+    """(interface index, address dict) from an RTM_NEWADDR payload"""
+    family, prefix, flags, scope, index = _IFADDRMSG.unpack_from(payload)
+    attrs = parse_attributes(payload, _IFADDRMSG.size)
+    # IFA_LOCAL is our end on point-to-point links; IFA_ADDRESS is the peer there
+    raw = attrs.get(IFA_LOCAL) or attrs.get(IFA_ADDRESS, b'')
+    if IFA_FLAGS in attrs:
+        flags = struct.unpack('=I', attrs[IFA_FLAGS])[0]
+    return index, {
+        'family': family,
+        'address': socket.inet_ntop(family, raw) if raw else None,
+        'prefix': prefix,
+        'scope': scope,
+        'flags': flags,
+    }
+
+
+class InterfaceInventory:
+    """
+    Cached inventory of network interfaces and their addresses.
+
+    The first lookup dumps links and addresses; with watch=True a
+    netlink subscription then applies link and address changes
+    incrementally (route changes only drop the source-address cache).
+    source_address() picks the address the kernel would use for a
+    destination from the inventory and the RouteCache, asking the
+    kernel (a UDP connect) only when neither can tell.
+    """
+
+    def __init__(self, watch: bool = True, route_cache=None):
+        self._route_cache = route_cache
+        self._lock = threading.Lock()
+        self._interfaces = None
+        self._sources = {}
+        self._watch_enabled = watch
+        self._watch_sock = None
+        self.generation = 0
+
+    def interfaces(self) -> list:
+        """
+        All interfaces, by index, as dicts with 'index', 'name', 'mtu',
+        'mac', 'up', 'running', 'loopback', 'operstate' and 'addresses'
+        (dicts with 'family', 'address', 'prefix', 'scope', 'flags').
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return [dict(iface, addresses=[dict(a) for a in iface['addresses']])
+                    for _, iface in sorted(self._interfaces.items())]
+
+    def interface(self, name: str) -> Optional[dict]:
+        """The interface called name, or None"""
+        for iface in self.interfaces():
+            if iface['name'] == name:
+                return iface
+        return None
+
+    def addresses(self, family: int = socket.AF_UNSPEC, include_loopback: bool = False) -> list:
+        """Addresses of up interfaces as dicts with the interface 'name' added"""
+        found = []
+        for iface in self.interfaces():
+            if not iface['up'] or (iface['loopback'] and not include_loopback):
+                continue
+            for address in iface['addresses']:
+                if family in (socket.AF_UNSPEC, address['family']):
+                    found.append(dict(address, name=iface['name']))
+        return found
+
+    def source_address(self, destination: str) -> Optional[str]:
+        """Local address used to reach destination, or None if unreachable"""
+        try:
+            ip = ipaddress.ip_address(destination)
+        except ValueError:
+            return None
+        with self._lock:
+            self._ensure_loaded()
+            if ip in self._sources:
+                return self._sources[ip]
+            generation = self.generation
+            source = self._select_source(ip)
+        if source is None:
+            source = _kernel_source_address(ip)
+        with self._lock:
+            # Don't cache an answer computed before a change arrived
+            if generation == self.generation:
+                self._sources[ip] = source
+        return source
+
+    def primary_address(self, family: int = socket.AF_INET) -> Optional[str]:
+        """Source address for Internet destinations (the default route's)"""
+        return self.source_address(_PUBLIC_DESTINATIONS[family])
+
+    def refresh(self):
+        """Reload everything from the kernel"""
+        with self._lock:
+            self._load()
+
+    def close(self):
+        sock, self._watch_sock = self._watch_sock, None
+        if sock:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def apply(self, data: bytes):
+        """Apply netlink link/address/route event messages"""
+        with self._lock:
+            if self._interfaces is None:
+                return
+            for msg_type, payload in parse_messages(data):
+                self._apply_message(msg_type, payload)
+
+    def _ensure_loaded(self):
+        if self._interfaces is None:
+            self._load()
+            if self._watch_enabled and self._watch_sock is None:
+                self._start_watcher()
+
+    def _load(self):
+        try:
+            interfaces = _netlink_inventory()
+        except OSError:
+            interfaces = _sysfs_inventory()
+        self._interfaces = interfaces
+        self._changed()
+
+    def _changed(self):
+        self.generation += 1
+        self._sources.clear()
+
+    def _apply_message(self, msg_type: int, payload: bytes):
+        try:
+            if msg_type == RTM_NEWLINK:
+                link = parse_link(payload)
+                existing = self._interfaces.get(link['index'])
+                if existing:
+                    link['addresses'] = existing['addresses']
+                self._interfaces[link['index']] = link
+            elif msg_type == RTM_DELLINK:
+                self._interfaces.pop(parse_link(payload)['index'], None)
+            elif msg_type in (RTM_NEWADDR, RTM_DELADDR):
+                index, address = parse_address(payload)
+                iface = self._interfaces.get(index)
+                if iface is None:
+                    return
+                addresses = [a for a in iface['addresses']
+                             if (a['family'], a['address']) != (address['family'], address['address'])]
+                if msg_type == RTM_NEWADDR:
+                    addresses.append(address)
+                iface['addresses'] = addresses
+            elif msg_type not in (RTM_NEWROUTE, RTM_DELROUTE):
+                return
+        except (struct.error, ValueError, IndexError, KeyError):
+            return
+        self._changed()
+
+    def _select_source(self, ip) -> Optional[str]:
+        """
+        Source address choice from the inventory (RFC 6724 section 5);
+        None to ask the kernel. On the outgoing interface this prefers,
+        in order: non-deprecated addresses, a label matching the
+        destination's (a global source for a global destination, a ULA
+        for a ULA), primary over secondary, then the longest prefix
+        shared with the destination.
+        """
+        family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+        candidates = [(iface, address) for iface in self._interfaces.values() if iface['up']
+                      for address in iface['addresses']
+                      if address['family'] == family and address['address']
+                      and not address['flags'] & IFA_F_TENTATIVE]
+
+        # On-link destination: the address on the longest matching subnet
+        best = None
+        for iface, address in candidates:
+            network = ipaddress.ip_network(f"{address['address']}/{address['prefix']}", strict=False)
+            if ip in network and (best is None or network.prefixlen > best[0]):
+                best = (network.prefixlen, address['address'])
+        if best:
+            return best[1]
+
+        # Otherwise the outgoing interface of the most specific route
+        device = self._route_interface(ip, family)
+        if device is None:
+            return None
+        usable = [address for iface, address in candidates if iface['name'] == device
+                  and address['scope'] not in (SCOPE_LINK, SCOPE_HOST)]
+        label = policy_label(ip)
+
+        def preference(address):
+            source = ipaddress.ip_address(address['address'])
+            return (bool(address['flags'] & IFA_F_DEPRECATED),
+                    policy_label(source) != label,
+                    bool(address['flags'] & IFA_F_SECONDARY),
+                    -_common_prefix_length(source, ip))
+
+        usable.sort(key=preference)
+        return usable[0]['address'] if usable else None
+
+    def _route_interface(self, ip, family: int) -> Optional[str]:
+        if self._route_cache is None:
+            # Imported here: network.py imports this module
+            from src.utils.network import get_route_cache
+            self._route_cache = get_route_cache()
+        best = None
+        for route in self._route_cache.routes():
+            if route['family'] != family or not route['interface']:
+                continue
+            try:
+                network = ipaddress.ip_network(f"{route['destination']}/{route['prefix']}", strict=False)
+            except ValueError:
+                continue
+            if ip not in network:
+                continue
+            key = (network.prefixlen, -route['metric'])
+            if best is None or key > best[0]:
+                best = (key, route['interface'])
+        return best[1] if best else None
+
+    def _start_watcher(self):
+        """Subscribe to link/address/route events; without them the first dump stays"""
+        groups = (RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR
+                  | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE)
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, groups))
+        except (OSError, AttributeError):
+            return
+        self._watch_sock = sock
+        threading.Thread(target=self._watch, args=(sock,),
+                         name='linxtap-iface-watch', daemon=True).start()
+
+    def _watch(self, sock):
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError as e:
+                if e.errno == errno.ENOBUFS and self._watch_sock is sock:
+                    # Events were dropped: start over from a fresh dump
+                    self.refresh()
+                    continue
+                return
+            self.apply(data)
+
+
+def _netlink_dump(sock, msg_type: int, body: bytes) -> list:
+    sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type,
+                             NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + body)
+    messages = []
+    while True:
+        for reply_type, payload in parse_messages(sock.recv(65536)):
+            if reply_type == NLMSG_DONE:
+                return messages
+            if reply_type == NLMSG_ERROR:
+                error = -struct.unpack_from('=i', payload)[0]
+                raise OSError(error, os.strerror(error))
+            messages.append((reply_type, payload))
+
+
+def _netlink_inventory() -> dict:
+    """index -> interface, from an RTM_GETLINK and an RTM_GETADDR dump"""
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+    except AttributeError:
+        raise OSError('netlink is not available')
+    with sock:
+        sock.settimeout(2.0)
+        sock.bind((0, 0))
+        interfaces = {}
+        for msg_type, payload in _netlink_dump(sock, RTM_GETLINK, _IFINFOMSG.pack(0, 0, 0, 0, 0)):
+            if msg_type == RTM_NEWLINK:
+                link = parse_link(payload)
+                interfaces[link['index']] = link
+        for msg_type, payload in _netlink_dump(sock, RTM_GETADDR, _IFADDRMSG.pack(0, 0, 0, 0, 0)):
+            if msg_type == RTM_NEWADDR:
+                index, address = parse_address(payload)
+                if index in interfaces:
+                    interfaces[index]['addresses'].append(address)
+    return interfaces
+
+
+def _sysfs_inventory(sys_path: str = '/sys/class/net', if_inet6_path: str = '/proc/net/if_inet6') -> dict:
+    """Fallback without netlink: links from sysfs, IPv6 from procfs, IPv4 by ioctl"""
+    def read(name, attribute):
+        try:
+            with open(os.path.join(sys_path, name, attribute)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    interfaces = {}
+    try:
+        names = os.listdir(sys_path)
+    except OSError:
+        names = [name for _, name in socket.if_nameindex()]
+    for name in names:
+        try:
+            index = int(read(name, 'ifindex') or socket.if_nametoindex(name))
+            flags = int(read(name, 'flags') or '0', 16)
+        except (OSError, ValueError):
+            continue
+        mtu = read(name, 'mtu')
+        operstate = read(name, 'operstate') or 'unknown'
+        interfaces[index] = {
+            'index': index,
+            'name': name,
+            'mtu': int(mtu) if mtu else None,
+            'mac': read(name, 'address') or None,
+            'up': bool(flags & IFF_UP),
+            # sysfs flags omit IFF_RUNNING; carrier is the same signal
+            'running': read(name, 'carrier') == '1',
+            'loopback': bool(flags & IFF_LOOPBACK),
+            'operstate': operstate if operstate in OPERSTATES else 'unknown',
+            'addresses': _ioctl_ipv4_address(name),
+        }
+
+    try:
+        with open(if_inet6_path) as f:
+            lines = f.readlines()
+    except OSError:
+        lines = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 6:
+            continue
+        try:
+            index = int(parts[1], 16)
+            address = ipaddress.IPv6Address(bytes.fromhex(parts[0])).compressed
+            scope = {0x00: SCOPE_UNIVERSE, 0x20: SCOPE_LINK, 0x10: SCOPE_HOST}.get(int(parts[3], 16), SCOPE_UNIVERSE)
+            entry = {'family': socket.AF_INET6, 'address': address, 'prefix': int(parts[2], 16),
+                     'scope': scope, 'flags': int(parts[4], 16)}
+        except ValueError:
+            continue
+        if index in interfaces:
+            interfaces[index]['addresses'].append(entry)
+    return interfaces
+
+
+def _ioctl_ipv4_address(name: str) -> list:
+    """Primary IPv4 address of an interface (SIOCGIFADDR), as an address list"""
+    request = struct.pack('256s', name.encode()[:15])
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            address = socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFADDR, request)[20:24])
+            netmask = fcntl.ioctl(s.fileno(), SIOCGIFNETMASK, request)[20:24]
+    except OSError:
+        return []
+    scope = SCOPE_HOST if address.startswith('127.') else SCOPE_UNIVERSE
+    return [{'family': socket.AF_INET, 'address': address,
+             'prefix': bin(struct.unpack('!I', netmask)[0]).count('1'), 'scope': scope, 'flags': 0}]
+
+
+def _kernel_source_address(ip) -> Optional[str]:
+    """Ask the kernel's route lookup (a UDP connect sends nothing)"""
+    family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+    try:
+        with socket.socket(family, socket.SOCK_DGRAM) as s:
+            s.connect((str(ip), 9))
+            return s.getsockname()[0]
+    except OSError:
+        return None
+
+
+_inventory = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory() -> InterfaceInventory:
+    """Return the shared process-wide InterfaceInventory"""
+    global _inventory
+    with _inventory_lock:
+        if _inventory is None:
+            _inventory = InterfaceInventory()
+        return _inventory
@@ -1,29 +1,53 @@
 """Network utility functions"""
+import errno
+import ipaddress
+import os
+import selectors
 import socket
 import subprocess
-import re
+import struct
+import threading
+import time
 from typing import Optional
 
+from src.utils.icmp import icmp_ttl
+from src.utils.interfaces import get_inventory
+from src.utils.resolver import get_resolver
 
-def get_local_ip() -> str:
+
+def get_local_ip(family: int = socket.AF_INET) -> str:
     """
-    Get the local network IP address of this device.
+    Get the local network IP address of this device (IPv4 by default,
+    AF_INET6 for the preferred global IPv6 source address): the source
+    address for Internet destinations, from the cached interface inventory.
     Returns the local IP address or 'Unknown' if it cannot be determined.
     """
+    try:
+        local_ip = get_inventory().primary_address(family)
+        if local_ip:
+            return local_ip
+    except Exception:
+        pass
+
     try:
         # Create a socket connection to determine local IP
         # This doesn't actually send data, just determines routing
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s = socket.socket(family, socket.SOCK_DGRAM)
         # Connect to a public DNS server (doesn't need to be reachable)
-        s.connect(("8.8.8.8", 80))
+        if family == socket.AF_INET6:
+            s.connect(("2001:4860:4860::8888", 80))
+        else:
+            s.connect(("8.8.8.8", 80))
         local_ip = s.getsockname()[0]
         s.close()
         return local_ip
     except Exception:
-        # Fallback method: get hostname IP
+        if family == socket.AF_INET6:
+            return 'Unknown'
+        # Fallback method: get hostname IP (cached, bounded wait)
         try:
             hostname = socket.gethostname()
-            local_ip = socket.gethostbyname(hostname)
+            local_ip = get_resolver().resolve(hostname, 0, socket.AF_INET, timeout=1.0)[0][1][0]
             # Filter out localhost
             if local_ip.startswith('127.'):
                 return 'Unknown'
@@ -43,47 +67,236 @@ def get_hostname() -> str:
         return 'Unknown'
 
 
-def get_default_gateway() -> Optional[str]:
+# Netlink constants (linux/rtnetlink.h)
+NETLINK_ROUTE = 0
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_ROUTE = 0x400
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+RTF_GATEWAY = 0x0002
+
+
+class RouteCache:
     """
-    Get the default gateway IP address.
-    Returns the gateway IP or None if it cannot be determined.
+    Cached view of the kernel routing table.
+
+    /proc/net/route and /proc/net/ipv6_route are parsed once and kept
+    until they are older than ttl seconds or a netlink RTM_NEWROUTE /
+    RTM_DELROUTE event marks them stale, so gateway checks are a set
+    lookup with no subprocess on the connect path.
     """
-    try:
-        # Try using ip route command
-        result = subprocess.run(['ip', 'route'],
-                              capture_output=True,
-                              text=True,
-                              timeout=2)
-        if result.returncode == 0:
-            # Look for default route
-            for line in result.stdout.split('\n'):
-                if line.startswith('default'):
-                    # Extract gateway IP
-                    parts = line.split()
-                    if len(parts) >= 3 and parts[1] == 'via':
-                        return parts[2]
-    except Exception:
-        pass
 
-    # Fallback: try reading /proc/net/route
-    try:
-        with open('/proc/net/route', 'r') as f:
-            lines = f.readlines()
-            for line in lines[1:]:  # Skip header
-                parts = line.split()
-                if parts[1] == '00000000':  # Default route
-                    # Gateway is in hex, reversed byte order
-                    gateway_hex = parts[2]
-                    # Convert hex to IP
-                    gateway_ip = '.'.join([
-                        str(int(gateway_hex[i:i+2], 16))
-                        for i in range(6, -1, -2)
-                    ])
-                    return gateway_ip
-    except Exception:
-        pass
+    def __init__(self, ttl: float = 60.0, watch: bool = True,
+                 route_path: str = '/proc/net/route',
+                 ipv6_route_path: str = '/proc/net/ipv6_route'):
+        self.ttl = ttl
+        self.route_path = route_path
+        self.ipv6_route_path = ipv6_route_path
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._routes = []
+        self._default_gateways = {socket.AF_INET: None, socket.AF_INET6: None}
+        self._gateway_set = frozenset()
+        self._watcher = None
+        if watch:
+            self._start_watcher()
+
+    def invalidate(self):
+        """Force the next lookup to re-read the routing table"""
+        self._loaded_at = None
+
+    def default_gateway(self, family: int = socket.AF_INET) -> Optional[str]:
+        """Return the default gateway for the address family, or None"""
+        self._ensure_fresh()
+        return self._default_gateways.get(family)
+
+    def is_gateway(self, ip: str) -> bool:
+        """Return True if ip is a default gateway (IPv4 or IPv6)"""
+        self._ensure_fresh()
+        try:
+            # Link-local peer addresses carry a scope ('fe80::1%eth0'); routes don't
+            ip = ipaddress.ip_address(ip.split('%', 1)[0]).compressed
+        except ValueError:
+            return False
+        return ip in self._gateway_set
+
+    def routes(self) -> list:
+        """
+        Return all cached routes as dicts with 'family', 'destination',
+        'prefix', 'gateway', 'interface' and 'metric' keys.
+        """
+        self._ensure_fresh()
+        return list(self._routes)
+
+    def _ensure_fresh(self):
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.ttl:
+            return
+        with self._lock:
+            if self._loaded_at is loaded_at:
+                self._refresh()
+
+    def _refresh(self):
+        # Stamp before reading so an event arriving mid-read re-invalidates
+        self._loaded_at = time.monotonic()
+        routes = self._read_ipv4_routes() + self._read_ipv6_routes()
+
+        defaults = {socket.AF_INET: None, socket.AF_INET6: None}
+        best_metric = {}
+        gateways = set()
+        for route in routes:
+            if route['prefix'] != 0 or route['gateway'] is None:
+                continue
+            # Every default route's next hop is a gateway (e.g. wlan0 next
+            # to eth0), even if only the lowest metric one is in use
+            gateways.add(route['gateway'])
+            family = route['family']
+            if family not in best_metric or route['metric'] < best_metric[family]:
+                best_metric[family] = route['metric']
+                defaults[family] = route['gateway']
+
+        self._routes = routes
+        self._default_gateways = defaults
+        self._gateway_set = frozenset(gateways)
+
+    def _read_ipv4_routes(self) -> list:
+        routes = []
+        try:
+            with open(self.route_path, 'r') as f:
+                lines = f.readlines()
+        except OSError:
+            return self._read_ip_route_command()
+
+        for line in lines[1:]:  # Skip header
+            parts = line.split()
+            if len(parts) < 8:
+                continue
+            try:
+                # Addresses are hex in host (little-endian) byte order
+                destination = socket.inet_ntoa(struct.pack('<I', int(parts[1], 16)))
+                gateway = socket.inet_ntoa(struct.pack('<I', int(parts[2], 16)))
+                flags = int(parts[3], 16)
+                mask = int(parts[7], 16)
+                metric = int(parts[6])
+            except ValueError:
+                continue
+            routes.append({
+                'family': socket.AF_INET,
+                'destination': destination,
+                'prefix': bin(mask).count('1'),
+                'gateway': gateway if flags & RTF_GATEWAY else None,
+                'interface': parts[0],
+                'metric': metric,
+            })
+        return routes
+
+    def _read_ip_route_command(self) -> list:
+        """Fallback for systems without /proc/net/route (refresh only)"""
+        routes = []
+        try:
+            result = subprocess.run(['ip', 'route'],
+                                  capture_output=True,
+                                  text=True,
+                                  timeout=2)
+        except Exception:
+            return routes
+        if result.returncode != 0:
+            return routes
+        for line in result.stdout.split('\n'):
+            parts = line.split()
+            if len(parts) >= 3 and parts[0] == 'default' and parts[1] == 'via':
+                routes.append({
+                    'family': socket.AF_INET,
+                    'destination': '0.0.0.0',
+                    'prefix': 0,
+                    'gateway': parts[2],
+                    'interface': parts[parts.index('dev') + 1] if 'dev' in parts else None,
+                    'metric': int(parts[parts.index('metric') + 1]) if 'metric' in parts else 0,
+                })
+        return routes
+
+    def _read_ipv6_routes(self) -> list:
+        routes = []
+        try:
+            with open(self.ipv6_route_path, 'r') as f:
+                lines = f.readlines()
+        except OSError:
+            return routes
+
+        for line in lines:
+            parts = line.split()
+            if len(parts) < 10:
+                continue
+            try:
+                destination = ipaddress.IPv6Address(bytes.fromhex(parts[0])).compressed
+                next_hop = ipaddress.IPv6Address(bytes.fromhex(parts[4]))
+                prefix = int(parts[1], 16)
+                metric = int(parts[5], 16)
+                flags = int(parts[8], 16)
+            except ValueError:
+                continue
+            routes.append({
+                'family': socket.AF_INET6,
+                'destination': destination,
+                'prefix': prefix,
+                'gateway': (next_hop.compressed
+                            if flags & RTF_GATEWAY and not next_hop.is_unspecified
+                            else None),
+                'interface': parts[9],
+                'metric': metric,
+            })
+        return routes
+
+    def _start_watcher(self):
+        """Subscribe to netlink route events; TTL expiry still applies without them"""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE))
+        except (OSError, AttributeError):
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(sock,),
+                                         name='linxtap-route-watch', daemon=True)
+        self._watcher.start()
+
+    def _watch(self, sock):
+        while True:
+            try:
+                data = sock.recv(65536)
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    # Events were dropped: whatever they were, re-read the table
+                    self.invalidate()
+                    continue
+                return
+            offset = 0
+            # A datagram may hold several nlmsghdr-framed messages
+            while offset + 16 <= len(data):
+                length, msg_type = struct.unpack_from('=IH', data, offset)
+                if msg_type in (RTM_NEWROUTE, RTM_DELROUTE):
+                    self.invalidate()
+                    break
+                if length < 16:
+                    break
+                offset += (length + 3) & ~3
+
+
+_route_cache = None
+
+
+def get_route_cache() -> RouteCache:
+    """Return the shared process-wide RouteCache"""
+    global _route_cache
+    if _route_cache is None:
+        _route_cache = RouteCache()
+    return _route_cache
 
-    return None
+
+def get_default_gateway(family: int = socket.AF_INET) -> Optional[str]:
+    """
+    Get the default gateway IP address (AF_INET6 for the IPv6 default route).
+    Returns the gateway IP or None if it cannot be determined.
+    """
+    return get_route_cache().default_gateway(family)
 
 
 def detect_os_from_ttl(ttl: int) -> str:
@@ -109,38 +322,145 @@ def detect_os_from_ttl(ttl: int) -> str:
 
 def get_remote_ttl(ip: str, port: int, timeout: float = 2.0) -> Optional[int]:
     """
-    Get the TTL value from a remote host by analyzing socket options.
+    Get the TTL of packets from a remote host, without spawning ping.
+    Uses an in-process ICMP echo, then the SYN-ACK of a TCP connect to
+    port (both need ICMP/raw socket permission).
     Returns TTL value or None if it cannot be determined.
     """
+    ttl = icmp_ttl(ip, timeout)
+    if ttl:
+        return ttl
+
+    sniffer = SynAckSniffer.open()
+    if sniffer is None:
+        return None
     try:
-        # Create a socket and connect
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        sock.connect((ip, port))
+        with socket.create_connection((ip, port), timeout=timeout) as sock:
+            return sniffer.ttl_for(sock.getsockname(), sock.getpeername())
+    except OSError:
+        return None
+    finally:
+        sniffer.close()
 
-        # Try to get TTL from socket options
-        # This may not work on all systems
-        try:
-            ttl = sock.getsockopt(socket.IPPROTO_IP, socket.IP_TTL)
-            sock.close()
-            return ttl
-        except:
-            sock.close()
 
-        # Alternative: use ping to get TTL
-        result = subprocess.run(['ping', '-c', '1', '-W', '1', ip],
-                              capture_output=True,
-                              text=True,
-                              timeout=3)
-        if result.returncode == 0:
-            # Parse TTL from ping output
-            match = re.search(r'ttl=(\d+)', result.stdout.lower())
-            if match:
-                return int(match.group(1))
-    except Exception:
-        pass
+class SynAckSniffer:
+    """
+    Passively captures the SYN-ACK of an outgoing TCP connect.
+
+    A raw IPPROTO_TCP socket receives a copy of every inbound TCP segment,
+    so opening one just before connect() lets us read the remote host's
+    TTL (and its TCP window and options, see synack_for) from the SYN-ACK
+    without a second handshake. IPv6 segments arrive on a second raw socket
+    without their IP header; the hop limit comes as ancillary data.
+    Requires CAP_NET_RAW; use open() which returns None without it.
+    """
+
+    # Bound on SYN-ACKs held for connects nobody has asked about yet
+    MAX_PENDING = 4096
+
+    def __init__(self, sock: Optional[socket.socket], sock6: Optional[socket.socket] = None):
+        self.sock = sock
+        self.sock6 = sock6
+        self._synacks = {}
+
+    @classmethod
+    def open(cls) -> Optional['SynAckSniffer']:
+        """Return a sniffer, or None if raw sockets are not permitted"""
+        sockets = []
+        for family in (socket.AF_INET, socket.AF_INET6):
+            try:
+                sock = socket.socket(family, socket.SOCK_RAW, socket.IPPROTO_TCP)
+                sock.setblocking(False)
+                if family == socket.AF_INET6:
+                    sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_RECVHOPLIMIT, 1)
+                sockets.append(sock)
+            except OSError:
+                sockets.append(None)
+        if sockets == [None, None]:
+            return None
+        return cls(*sockets)
+
+    def ttl_for(self, local_addr, remote_addr) -> Optional[int]:
+        """
+        Return the TTL (IPv6: hop limit) of the SYN-ACK sent from
+        remote_addr to local_addr, or None if it was not captured.
+        Never blocks: by the time connect() returns the SYN-ACK is queued.
+        Safe to share between many concurrent connects on one thread.
+        """
+        synack = self.synack_for(local_addr, remote_addr)
+        return synack['ttl'] if synack else None
+
+    def synack_for(self, local_addr, remote_addr) -> Optional[dict]:
+        """
+        Return the captured SYN-ACK sent from remote_addr to local_addr as
+        a dict with 'ttl', 'df' (IP don't-fragment bit, always False for
+        IPv6), 'window' and 'options' (raw TCP option bytes), or None if it
+        was not captured.
+        """
+        self._drain()
+        key = (_packed_address(remote_addr[0]), remote_addr[1], local_addr[1])
+        captured = self._synacks.pop(key, None)
+        if captured is None:
+            return None
+        ttl, df, header = captured
+        offset = (header[12] >> 4) * 4
+        return {
+            'ttl': ttl,
+            'df': df,
+            'window': struct.unpack('!H', header[14:16])[0],
+            'options': bytes(header[20:offset]),
+        }
+
+    def _drain(self):
+        """Record every queued SYN-ACK"""
+        if self.sock is not None:
+            while True:
+                try:
+                    packet = self.sock.recv(65535)
+                except OSError:
+                    break
+                ihl = (packet[0] & 0x0F) * 4
+                self._record(packet[12:16], packet[ihl:], packet[8], bool(packet[6] & 0x40))
+
+        if self.sock6 is not None:
+            while True:
+                try:
+                    segment, ancdata, _, address = self.sock6.recvmsg(65535, 64)
+                except OSError:
+                    break
+                hop_limit = None
+                for level, kind, data in ancdata:
+                    if level == socket.IPPROTO_IPV6 and kind == socket.IPV6_HOPLIMIT:
+                        hop_limit = struct.unpack('i', data[:4])[0]
+                if hop_limit is not None:
+                    self._record(_packed_address(address[0]), segment, hop_limit, False)
+
+    def _record(self, source: bytes, segment: bytes, ttl: int, df: bool):
+        if len(segment) < 20:
+            return
+        if segment[13] & 0x12 != 0x12:  # SYN + ACK
+            return
+        sport, dport = struct.unpack('!HH', segment[:4])
+        if len(self._synacks) >= self.MAX_PENDING:
+            self._synacks.clear()
+        # Keep the TCP header; options are only parsed if someone asks
+        offset = (segment[12] >> 4) * 4
+        self._synacks[(source, sport, dport)] = (ttl, df, segment[:offset])
+
+    def close(self):
+        for sock in (self.sock, self.sock6):
+            if sock is not None:
+                try:
+                    sock.close()
+                except Exception:
+                    pass
 
-    return None
+
+def _packed_address(ip: str) -> bytes:
+    """Binary form of an IPv4 or IPv6 address (scope id dropped)"""
+    if ':' in ip:
+        return socket.inet_pton(socket.AF_INET6, ip.split('%')[0])
+    return socket.inet_aton(ip)
 
 
 def is_gateway(ip: str) -> bool:
@@ -148,7 +468,155 @@ def is_gateway(ip: str) -> bool:
     Check if the given IP address is the default gateway.
     Returns True if it's the gateway, False otherwise.
     """
-    gateway = get_default_gateway()
-    if gateway is None:
-        return False
-    return ip == gateway
+    return get_route_cache().is_gateway(ip)
+
+
+# RFC 8305 "Connection Attempt Delay"
+HAPPY_EYEBALLS_DELAY = 0.25
+
+
+def resolve_addresses(host: str, port: int, family: int = socket.AF_UNSPEC,
+                      timeout: Optional[float] = None) -> list:
+    """
+    Resolve host to TCP socket addresses in Happy Eyeballs order: address
+    families interleaved, starting with getaddrinfo's preferred one
+    (IPv6 under the default RFC 6724 policy). Served from the shared
+    resolver cache when possible.
+    Returns a list of (family, sockaddr); raises socket.gaierror.
+    """
+    return get_resolver().resolve(host, port, family, timeout)
+
+
+def happy_eyeballs_connect(addresses: list, timeout: float = 5.0,
+                           attempt_delay: float = HAPPY_EYEBALLS_DELAY,
+                           prepare=None) -> socket.socket:
+    """
+    Race TCP connects to addresses from resolve_addresses() (RFC 8305).
+    The next attempt starts every attempt_delay seconds, or as soon as one
+    fails; the first to connect wins and the others are abandoned.
+    prepare(sock), if given, sets up each socket (bind, options) before
+    it connects; an OSError from it, or from creating the socket, fails
+    that attempt.
+    Returns the connected (blocking) socket; raises socket.timeout if
+    nothing connects within timeout, otherwise the last connect error.
+    """
+    if not addresses:
+        raise OSError(errno.EADDRNOTAVAIL, 'No addresses to connect to')
+    pending = list(addresses)
+    attempts = []
+    selector = selectors.DefaultSelector()
+    last_error = None
+    winner = None
+    deadline = time.monotonic() + timeout
+    next_attempt = time.monotonic()
+    try:
+        while winner is None:
+            now = time.monotonic()
+            if pending and (now >= next_attempt or not attempts):
+                family, sockaddr = pending.pop(0)
+                try:
+                    # No IPv6 stack, out of descriptors: this address fails, the race goes on
+                    sock = socket.socket(family, socket.SOCK_STREAM)
+                except OSError as e:
+                    last_error = e
+                    continue
+                sock.setblocking(False)
+                if prepare:
+                    try:
+                        prepare(sock)
+                    except OSError as e:
+                        last_error = e
+                        sock.close()
+                        continue
+                err = sock.connect_ex(sockaddr)
+                if err == 0:
+                    winner = sock
+                elif err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                    attempts.append(sock)
+                    selector.register(sock, selectors.EVENT_WRITE)
+                    next_attempt = now + attempt_delay
+                else:
+                    last_error = OSError(err, os.strerror(err))
+                    sock.close()
+                continue
+
+            if not attempts:
+                raise last_error
+            if now >= deadline:
+                raise socket.timeout('timed out')
+            wait = deadline - now
+            if pending:
+                wait = min(wait, next_attempt - now)
+            for key, _ in selector.select(max(0.0, wait)):
+                sock = key.fileobj
+                selector.unregister(sock)
+                attempts.remove(sock)
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err == 0:
+                    winner = sock
+                    break
+                last_error = OSError(err, os.strerror(err))
+                sock.close()
+                # A failed attempt lets the next one start immediately
+                next_attempt = time.monotonic()
+    finally:
+        for sock in attempts:
+            if sock is not winner:
+                sock.close()
+        selector.close()
+
+    winner.setblocking(True)
+    return winner
+
+
+def fastopen_connect(addresses: list, payload, timeout: float = 5.0,
+                     prepare=None) -> tuple:
+    """
+    Connect with TCP Fast Open (sendto with MSG_FASTOPEN), so payload, a
+    bytes-like first message, rides in the SYN once the server has handed
+    out a cookie; without one the kernel sends it after the handshake.
+    Either way the call returns only once the handshake has completed.
+    Addresses are tried in order, not raced: each attempt carries data.
+    prepare(sock) is applied as in happy_eyeballs_connect. Where the client
+    side of Fast Open is unavailable (no MSG_FASTOPEN, or disabled by
+    net.ipv4.tcp_fastopen) this is a plain happy_eyeballs_connect.
+    Returns (connected blocking socket, bytes of payload sent); raises
+    like happy_eyeballs_connect.
+    """
+    msg_fastopen = getattr(socket, 'MSG_FASTOPEN', None)
+    if msg_fastopen is None:
+        return happy_eyeballs_connect(addresses, timeout, prepare=prepare), 0
+    if not addresses:
+        raise OSError(errno.EADDRNOTAVAIL, 'No addresses to connect to')
+    deadline = time.monotonic() + timeout
+    last_error = None
+    for family, sockaddr in addresses:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise socket.timeout('timed out')
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError as e:
+            last_error = e
+            continue
+        try:
+            if prepare:
+                prepare(sock)
+            # Blocking, so the kernel waits for the handshake; SO_SNDTIMEO bounds the wait
+            seconds = int(remaining)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                            struct.pack('ll', seconds, int((remaining - seconds) * 1e6)))
+            sent = sock.sendto(payload, msg_fastopen, sockaddr)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, struct.pack('ll', 0, 0))
+        except OSError as e:
+            sock.close()
+            if e.errno == errno.EOPNOTSUPP:
+                return happy_eyeballs_connect(addresses, max(0.0, deadline - time.monotonic()),
+                                              prepare=prepare), 0
+            if e.errno in (errno.EINPROGRESS, errno.EAGAIN):
+                # SO_SNDTIMEO ran out before the handshake finished
+                e = socket.timeout('timed out')
+            last_error = e
+            continue
+        return sock, sent
+    raise last_error
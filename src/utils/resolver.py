@@ -0,0 +1,213 @@
+"""Cached, concurrent hostname resolution"""
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+# getaddrinfo errors that mean "this name does not exist" (worth caching)
+_NEGATIVE_ERRORS = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+
+def interleave_families(addresses: list) -> list:
+    """
+    Order (family, sockaddr) pairs for Happy Eyeballs: families
+    alternate, starting with the first one given (duplicates dropped).
+    """
+    by_family = {}
+    for family, sockaddr in addresses:
+        queue = by_family.setdefault(family, [])
+        if (family, sockaddr) not in queue:
+            queue.append((family, sockaddr))
+
+    ordered = []
+    queues = list(by_family.values())
+    while any(queues):
+        for queue in queues:
+            if queue:
+                ordered.append(queue.pop(0))
+    return ordered
+
+
+class Resolver:
+    """
+    getaddrinfo behind a cache and a small thread pool.
+
+    Numeric addresses are answered inline without touching the cache.
+    Names are looked up on pool threads; concurrent requests for the
+    same name share a single lookup. Answers are cached for `ttl`
+    seconds (getaddrinfo does not expose record TTLs, so this is a fixed
+    cap) and "no such name" errors for `negative_ttl` seconds; temporary
+    failures are not cached. The least recently used names are dropped
+    beyond max_entries.
+    """
+
+    def __init__(self, ttl: float = 60.0, negative_ttl: float = 15.0,
+                 max_entries: int = 1024, workers: int = 8, timeout: float = 5.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='linxtap-dns')
+
+    def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC,
+                timeout: Optional[float] = None) -> list:
+        """
+        Resolve host to TCP (family, sockaddr) pairs in Happy Eyeballs order.
+        Raises socket.gaierror if the name does not resolve (or the lookup
+        takes longer than timeout).
+        """
+        numeric = _numeric(host, port, family)
+        if numeric is not None:
+            return numeric
+        future = self.resolve_async(host, port, family)
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:  # Not the builtin TimeoutError before Python 3.11
+            raise socket.gaierror(socket.EAI_AGAIN, f'Timed out resolving {host}')
+
+    def resolve_async(self, host: str, port: int = 0,
+                      family: int = socket.AF_UNSPEC) -> Future:
+        """
+        Start resolving host; returns a Future for resolve()'s result.
+        Cached answers come back as an already completed Future.
+        """
+        numeric = _numeric(host, port, family)
+        if numeric is not None:
+            return _completed(numeric)
+
+        key = (host.lower(), family)
+        with self._lock:
+            try:
+                cached = self._lookup(key)
+            except socket.gaierror as e:
+                self.hits += 1
+                failed = Future()
+                failed.set_exception(e)
+                return failed
+            if cached is not None:
+                self.hits += 1
+                return _completed(_with_port(cached, port))
+            self.misses += 1
+            lookup = self._inflight.get(key)
+            if lookup is None:
+                lookup = self._pool.submit(self._lookup_and_store, key)
+                self._inflight[key] = lookup
+
+        if port == 0:
+            return lookup
+        result = Future()
+
+        def set_port(done: Future):
+            try:
+                result.set_result(_with_port(done.result(), port))
+            except Exception as e:
+                result.set_exception(e)
+
+        lookup.add_done_callback(set_port)
+        return result
+
+    def cached(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC) -> Optional[list]:
+        """
+        Answer from the cache only: returns the addresses, None on a miss,
+        or raises the cached socket.gaierror for a known-bad name.
+        """
+        numeric = _numeric(host, port, family)
+        if numeric is not None:
+            return numeric
+        with self._lock:
+            cached = self._lookup((host.lower(), family))
+        return None if cached is None else _with_port(cached, port)
+
+    def invalidate(self, host: Optional[str] = None):
+        """Forget one name (all families), or everything"""
+        with self._lock:
+            if host is None:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] == host.lower()]:
+                del self._cache[key]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _lookup(self, key):
+        """Cached addresses for key (lock held); raises cached negative answers"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires, addresses, error = entry
+        if time.monotonic() >= expires:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        if error is not None:
+            raise socket.gaierror(*error.args)
+        return addresses
+
+    def _lookup_and_store(self, key) -> list:
+        host, family = key
+        try:
+            infos = socket.getaddrinfo(host, 0, family, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if e.errno in _NEGATIVE_ERRORS:
+                    self._store(key, (time.monotonic() + self.negative_ttl, None, e))
+            raise
+        except BaseException:
+            with self._lock:
+                self._inflight.pop(key, None)
+            raise
+
+        addresses = interleave_families([(info[0], info[4]) for info in infos])
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._store(key, (time.monotonic() + self.ttl, addresses, None))
+        return addresses
+
+    def _store(self, key, entry):
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+
+def _numeric(host: str, port: int, family: int) -> Optional[list]:
+    """Addresses for a numeric host (no DNS involved), else None"""
+    try:
+        infos = socket.getaddrinfo(host, port, family, socket.SOCK_STREAM, 0,
+                                   socket.AI_NUMERICHOST)
+    except (socket.gaierror, UnicodeError, TypeError):
+        return None
+    return interleave_families([(info[0], info[4]) for info in infos])
+
+
+def _with_port(addresses: list, port: int) -> list:
+    return [(family, (sockaddr[0], port) + tuple(sockaddr[2:])) for family, sockaddr in addresses]
+
+
+def _completed(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver() -> Resolver:
+    """Return the shared process-wide Resolver"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = Resolver()
+        return _resolver
@@ -0,0 +1,571 @@
+"""
+Parallel path discovery with TTL-limited probes (Paris traceroute style).
+
+Every probe for every hop is sent at once and the replies are collected
+as they arrive, so a path resolves in about one round trip to its
+furthest hop instead of hops x timeout. All probes of a trace share one
+flow: the same addresses, ports and checksum (UDP and ICMP), so
+routers that balance traffic per flow send them down a single path and
+the hops that come back form a real path rather than a mix of several.
+Probes are told apart by fields flow hashing ignores: the UDP payload
+(balanced so the checksum does not change), the ICMP sequence number and
+the TCP sequence number.
+
+udp: one connected UDP socket; ICMP errors for it are read back from its
+     error queue (IP_RECVERR), so no privileges are needed.
+icmp: echo requests on a datagram ICMP socket (net.ipv4.ping_group_range)
+     with its error queue, or on a raw socket with CAP_NET_RAW.
+tcp: SYNs to the target port from a raw socket (CAP_NET_RAW); a SYN-ACK
+     or RST marks the destination.
+"""
+import abc
+import errno
+import os
+import random
+import select
+import socket
+import struct
+import time
+from typing import Optional
+
+from src.utils.icmp import icmp_checksum
+from src.utils.interfaces import get_inventory
+from src.utils.network import get_route_cache
+from src.utils.resolver import get_resolver
+
+TRACE_PROTOCOLS = ('udp', 'icmp', 'tcp')
+DEFAULT_PORTS = {'udp': 33434, 'icmp': 0, 'tcp': 80}
+
+# Not exported by the socket module on every Python build (linux/in.h, linux/in6.h, asm/socket.h)
+IP_RECVERR = getattr(socket, 'IP_RECVERR', 11)
+IPV6_RECVERR = getattr(socket, 'IPV6_RECVERR', 25)
+SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35)
+IPV6_CHECKSUM = getattr(socket, 'IPV6_CHECKSUM', 7)
+
+# sock_extended_err.ee_origin (linux/errqueue.h)
+SO_EE_ORIGIN_ICMP = 2
+SO_EE_ORIGIN_ICMP6 = 3
+
+_MAGIC = b'LXTR'
+_UDP_PAYLOAD_SIZE = 12
+
+# Once the destination answers, silent hops get this much more time
+# (or twice the slowest reply so far, if that is longer)
+_GRACE = 0.05
+
+# Errors a socket with IP_RECVERR reports on the next send(): replies to
+# earlier probes, not a problem with this one
+_PENDING_ERRORS = (errno.EHOSTUNREACH, errno.ENETUNREACH, errno.ECONNREFUSED,
+                   errno.EHOSTDOWN, errno.EPROTO, errno.EACCES)
+
+
+def classify_icmp(family: int, icmp_type: int, code: int) -> Optional[str]:
+    """
+    What an ICMP error about one of our probes means: 'hop' (time exceeded),
+    'destination' (port unreachable: the target itself answered) or
+    'unreachable' (any other destination unreachable). None otherwise.
+    """
+    if family == socket.AF_INET:
+        if icmp_type == 11:
+            return 'hop'
+        if icmp_type == 3:
+            return 'destination' if code == 3 else 'unreachable'
+    else:
+        if icmp_type == 3:
+            return 'hop'
+        if icmp_type == 1:
+            return 'destination' if code == 4 else 'unreachable'
+    return None
+
+
+def _set_ttl(sock: socket.socket, family: int, ttl: int):
+    if family == socket.AF_INET:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+    else:
+        sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_UNICAST_HOPS, ttl)
+
+
+def _send(sock: socket.socket, data: bytes, address=None):
+    """Send one probe, skipping errors the socket has queued for earlier ones"""
+    for _ in range(8):
+        try:
+            if address is None:
+                sock.send(data)
+            else:
+                sock.sendto(data, address)
+            return
+        except (BlockingIOError, InterruptedError):
+            select.select([], [sock], [], 0.01)
+        except OSError as e:
+            if e.errno not in _PENDING_ERRORS:
+                raise
+    raise OSError(errno.EAGAIN, 'Could not send probe')
+
+
+def _timestamp(ancdata) -> Optional[float]:
+    """Kernel receive time (SO_TIMESTAMPNS) from ancillary data"""
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(data) >= 16:
+            seconds, nanoseconds = struct.unpack('ll', data[:16])
+            return seconds + nanoseconds / 1e9
+    return None
+
+
+def _offender(raw: bytes) -> Optional[str]:
+    """Address of the router that sent an ICMP error (SO_EE_OFFENDER)"""
+    if len(raw) < 8:
+        return None
+    family = struct.unpack('H', raw[:2])[0]
+    if family == socket.AF_INET:
+        return socket.inet_ntop(socket.AF_INET, raw[4:8])
+    if family == socket.AF_INET6 and len(raw) >= 24:
+        return socket.inet_ntop(socket.AF_INET6, raw[8:24])
+    return None
+
+
+def _udp_payload(seq: int) -> bytes:
+    """
+    UDP probe payload whose checksum does not depend on seq: seq is
+    followed by ~seq, so the one's complement sum stays constant.
+    """
+    payload = _MAGIC + struct.pack('!HH', seq, ~seq & 0xFFFF)
+    return payload.ljust(_UDP_PAYLOAD_SIZE, b'\x00')
+
+
+def _echo_request(family: int, ident: int, seq: int) -> bytes:
+    """
+    Echo request whose checksum does not depend on seq: the payload
+    carries ~seq, so the one's complement sum of the two stays constant.
+    The kernel fills in the checksum (and, for datagram sockets, the id)
+    except on raw IPv4 sockets.
+    """
+    icmp_type = 8 if family == socket.AF_INET else 128
+    payload = _MAGIC + struct.pack('!H', ~seq & 0xFFFF)
+    packet = struct.pack('!BBHHH', icmp_type, 0, 0, ident, seq) + payload
+    if family == socket.AF_INET:
+        checksum = icmp_checksum(packet)
+        packet = packet[:2] + struct.pack('!H', checksum) + packet[4:]
+    return packet
+
+
+def _quoted_packet(family: int, icmp: bytes):
+    """
+    Split the packet quoted by an ICMP error into (protocol, destination,
+    transport header), or None if it is too short.
+    """
+    inner = icmp[8:]
+    if family == socket.AF_INET:
+        if len(inner) < 20:
+            return None
+        ihl = (inner[0] & 0x0F) * 4
+        if len(inner) < ihl + 8:
+            return None
+        return inner[9], socket.inet_ntop(socket.AF_INET, inner[16:20]), inner[ihl:]
+    if len(inner) < 48:
+        return None
+    return inner[6], socket.inet_ntop(socket.AF_INET6, inner[24:40]), inner[40:]
+
+
+def _strip_scope(address: str) -> str:
+    return address.split('%', 1)[0]
+
+
+class _Prober(abc.ABC):
+    """Sends probes of one protocol and matches replies to their sequence numbers"""
+
+    def __init__(self, family: int, address: str, port: int):
+        self.family = family
+        self.address = address
+        self.port = port
+        self.sockets = []
+
+    @abc.abstractmethod
+    def send(self, ttl: int, seq: int):
+        """Send probe seq with the given TTL (hop limit)"""
+
+    @abc.abstractmethod
+    def receive(self, sock: socket.socket) -> list:
+        """Drain sock; returns (seq, kind, responder, received_at) tuples"""
+
+    def close(self):
+        for sock in self.sockets:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def _socket(self, family: int, sock_type: int, proto: int = 0) -> socket.socket:
+        sock = socket.socket(family, sock_type, proto)
+        self.sockets.append(sock)
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        except OSError:
+            pass
+        return sock
+
+    def _read_errors(self, sock: socket.socket, match) -> list:
+        """Read a socket's error queue; match(data) returns the probe seq or None"""
+        results = []
+        while True:
+            try:
+                data, ancdata, _, _ = sock.recvmsg(512, 512, socket.MSG_ERRQUEUE)
+            except OSError:
+                return results
+            error = None
+            for level, kind, cdata in ancdata:
+                if (level, kind) in ((socket.IPPROTO_IP, IP_RECVERR),
+                                     (socket.IPPROTO_IPV6, IPV6_RECVERR)) and len(cdata) >= 16:
+                    error = cdata
+            if error is None:
+                continue
+            _, origin, icmp_type, code = struct.unpack('IBBB', error[:7])
+            if origin not in (SO_EE_ORIGIN_ICMP, SO_EE_ORIGIN_ICMP6):
+                continue
+            kind = classify_icmp(self.family, icmp_type, code)
+            seq = match(data)
+            if kind and seq is not None:
+                results.append((seq, kind, _offender(error[16:]), _timestamp(ancdata)))
+
+
+class _UdpProber(_Prober):
+    """Connected UDP socket: fixed ports and checksum, the sequence number in the payload"""
+
+    def __init__(self, family: int, address: str, port: int):
+        super().__init__(family, address, port)
+        self.sock = self._socket(family, socket.SOCK_DGRAM)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+        else:
+            self.sock.setsockopt(socket.IPPROTO_IPV6, IPV6_RECVERR, 1)
+        self.sock.connect((address, port))
+
+    def send(self, ttl: int, seq: int):
+        _set_ttl(self.sock, self.family, ttl)
+        _send(self.sock, _udp_payload(seq))
+
+    def receive(self, sock: socket.socket) -> list:
+        # The error queue holds the quoted payload (after the UDP header)
+        def match(data):
+            if data[:4] == _MAGIC and len(data) >= 8:
+                seq, check = struct.unpack('!HH', data[4:8])
+                if seq ^ check == 0xFFFF:
+                    return seq
+            return None
+
+        results = self._read_errors(sock, match)
+        # A service on the port may answer; that is the destination too,
+        # but not tied to one probe, so the error queue decides the hop
+        while True:
+            try:
+                sock.recv(2048)
+            except OSError:
+                return results
+
+
+class _PingProber(_Prober):
+    """Datagram ICMP socket: echo replies as data, ICMP errors on the error queue"""
+
+    def __init__(self, family: int, address: str, port: int):
+        super().__init__(family, address, port)
+        proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        self.sock = self._socket(family, socket.SOCK_DGRAM, proto)
+        if family == socket.AF_INET:
+            self.sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+        else:
+            self.sock.setsockopt(socket.IPPROTO_IPV6, IPV6_RECVERR, 1)
+        self.sock.connect((address, 0))
+
+    def send(self, ttl: int, seq: int):
+        _set_ttl(self.sock, self.family, ttl)
+        _send(self.sock, _echo_request(self.family, 0, seq))
+
+    def receive(self, sock: socket.socket) -> list:
+        # The error queue holds the quoted echo request, header included
+        results = self._read_errors(
+            sock, lambda data: struct.unpack('!H', data[6:8])[0] if len(data) >= 8 else None)
+        reply_type = 0 if self.family == socket.AF_INET else 129
+        while True:
+            try:
+                data, ancdata, _, source = sock.recvmsg(2048, 512)
+            except OSError:
+                return results
+            if len(data) >= 8 and data[0] == reply_type:
+                results.append((struct.unpack('!H', data[6:8])[0], 'destination',
+                                _strip_scope(source[0]), _timestamp(ancdata)))
+
+
+class _RawIcmpProber(_Prober):
+    """Raw ICMP socket (CAP_NET_RAW): replies and errors both arrive on it"""
+
+    def __init__(self, family: int, address: str, port: int):
+        super().__init__(family, address, port)
+        proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        self.sock = self._socket(family, socket.SOCK_RAW, proto)
+        self.ident = os.getpid() & 0xFFFF
+
+    def send(self, ttl: int, seq: int):
+        _set_ttl(self.sock, self.family, ttl)
+        _send(self.sock, _echo_request(self.family, self.ident, seq), (self.address, 0))
+
+    def receive(self, sock: socket.socket) -> list:
+        v4 = self.family == socket.AF_INET
+        request_type, reply_type = (8, 0) if v4 else (128, 129)
+        results = []
+        while True:
+            try:
+                packet, ancdata, _, source = sock.recvmsg(2048, 512)
+            except OSError:
+                return results
+            # IPv4 raw sockets see the IP header, IPv6 ones do not
+            icmp = packet[(packet[0] & 0x0F) * 4:] if v4 else packet
+            if len(icmp) < 8:
+                continue
+            responder = _strip_scope(source[0])
+            if icmp[0] == reply_type:
+                ident, seq = struct.unpack('!HH', icmp[4:8])
+                if ident == self.ident and responder == self.address:
+                    results.append((seq, 'destination', responder, _timestamp(ancdata)))
+                continue
+            kind = classify_icmp(self.family, icmp[0], icmp[1])
+            quoted = _quoted_packet(self.family, icmp) if kind else None
+            if not quoted:
+                continue
+            proto, destination, header = quoted
+            if (proto in (socket.IPPROTO_ICMP, socket.IPPROTO_ICMPV6)
+                    and destination == self.address and header[0] == request_type):
+                ident, seq = struct.unpack('!HH', header[4:8])
+                if ident == self.ident:
+                    results.append((seq, kind, responder, _timestamp(ancdata)))
+
+
+class _TcpProber(_Prober):
+    """
+    Raw TCP SYNs from one reserved source port; the probe's sequence
+    number is the SYN's. ICMP errors arrive on a raw ICMP socket, the
+    target's SYN-ACK or RST on the raw TCP one (the kernel resets the
+    half-open connection for us).
+    """
+
+    def __init__(self, family: int, address: str, port: int):
+        super().__init__(family, address, port)
+        self.source = None
+        if family == socket.AF_INET:
+            # Raw IPv4 sockets need the TCP checksum, and with it the source address
+            self.source = get_inventory().source_address(address)
+            if self.source is None:
+                raise OSError(errno.ENETUNREACH, f'No route to {address}')
+        self.tcp = self._socket(family, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        if family == socket.AF_INET6:
+            self.tcp.setsockopt(socket.IPPROTO_IPV6, IPV6_CHECKSUM, 16)
+        icmp_proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        self.icmp = self._socket(family, socket.SOCK_RAW, icmp_proto)
+        # Hold the source port so no real connection picks it meanwhile
+        # (never polled: an idle stream socket always reads as ready)
+        self.reservation = socket.socket(family, socket.SOCK_STREAM)
+        self.reservation.bind((self.source or '', 0))
+        self.sport = self.reservation.getsockname()[1]
+        self.isn = random.getrandbits(32)
+
+    def send(self, ttl: int, seq: int):
+        header = struct.pack('!HHIIBBHHH', self.sport, self.port, (self.isn + seq) & 0xFFFFFFFF,
+                             0, 6 << 4, 0x02, 65535, 0, 0) + b'\x02\x04\x05\xb4'  # MSS 1460
+        if self.source:
+            pseudo = (socket.inet_aton(self.source) + socket.inet_aton(self.address)
+                      + struct.pack('!BBH', 0, socket.IPPROTO_TCP, len(header)))
+            header = header[:16] + struct.pack('!H', icmp_checksum(pseudo + header)) + header[18:]
+        _set_ttl(self.tcp, self.family, ttl)
+        _send(self.tcp, header, (self.address, 0))
+
+    def close(self):
+        super().close()
+        self.reservation.close()
+
+    def receive(self, sock: socket.socket) -> list:
+        v4 = self.family == socket.AF_INET
+        results = []
+        while True:
+            try:
+                packet, ancdata, _, source = sock.recvmsg(2048, 512)
+            except OSError:
+                return results
+            body = packet[(packet[0] & 0x0F) * 4:] if v4 else packet
+            responder = _strip_scope(source[0])
+            received_at = _timestamp(ancdata)
+            if sock is self.tcp:
+                if len(body) < 20 or responder != self.address:
+                    continue
+                sport, dport, _, ack, _, flags = struct.unpack('!HHIIBB', body[:14])
+                # SYN-ACK (open) or RST (closed) for one of our SYNs
+                if sport == self.port and dport == self.sport and flags & 0x14:
+                    seq = (ack - 1 - self.isn) & 0xFFFFFFFF
+                    if seq <= 0xFFFF:
+                        results.append((seq, 'destination', responder, received_at))
+                continue
+            if len(body) < 8:
+                continue
+            kind = classify_icmp(self.family, body[0], body[1])
+            quoted = _quoted_packet(self.family, body) if kind else None
+            if not quoted:
+                continue
+            proto, destination, header = quoted
+            if proto == socket.IPPROTO_TCP and destination == self.address:
+                sport, dport, tcp_seq = struct.unpack('!HHI', header[:8])
+                if sport == self.sport and dport == self.port:
+                    results.append(((tcp_seq - self.isn) & 0xFFFFFFFF, kind, responder,
+                                    received_at))
+
+
+def _open_prober(protocol: str, family: int, address: str, port: int) -> _Prober:
+    """Raises PermissionError if the protocol needs privileges we lack"""
+    if protocol == 'udp':
+        return _UdpProber(family, address, port)
+    if protocol == 'tcp':
+        return _TcpProber(family, address, port)
+    try:
+        return _PingProber(family, address, port)
+    except PermissionError:
+        return _RawIcmpProber(family, address, port)
+
+
+def traceroute(host: str, protocol: str = 'udp', port: Optional[int] = None,
+               max_hops: int = 30, probes: int = 3, timeout: float = 2.0,
+               first_ttl: int = 1) -> dict:
+    """
+    Discover the path to host with `probes` probes per hop, all in flight
+    at once. Waits up to timeout seconds for replies, but stops soon after
+    the destination answers once every earlier hop has too.
+    Returns a dict with 'status' ('complete' or 'error'), 'message',
+    'address', 'reached', 'hop_count' and 'hops': one dict per TTL with
+    'ttl', 'addresses', 'rtt_ms' (one per probe, None if lost), 'loss',
+    'kind' ('hop', 'destination', 'unreachable' or None if silent) and
+    'gateway' (the responder is our default gateway).
+    Raises ValueError for invalid arguments.
+    """
+    if protocol not in TRACE_PROTOCOLS:
+        raise ValueError(f'Unknown protocol: {protocol}')
+    if not 1 <= first_ttl <= max_hops <= 255:
+        raise ValueError('Hops must be between 1 and 255')
+    if not 1 <= probes <= 10:
+        raise ValueError('Probes per hop must be between 1 and 10')
+    port = DEFAULT_PORTS[protocol] if port is None else port
+    if not 0 <= port <= 65535 or (protocol != 'icmp' and not port):
+        raise ValueError('Port must be between 1 and 65535')
+
+    try:
+        family, sockaddr = get_resolver().resolve(host, port)[0]
+    except OSError:
+        return {'status': 'error', 'message': f'Error: Invalid IP address {host}'}
+    address = sockaddr[0]
+
+    try:
+        prober = _open_prober(protocol, family, address, port)
+    except PermissionError:
+        return {'status': 'error',
+                'message': f'Error: {protocol.upper()} traces need raw sockets (CAP_NET_RAW)'}
+    except OSError as e:
+        return {'status': 'error', 'message': f'Error: {str(e)}'}
+
+    sent = {}
+    answers = {}
+    started = time.time()
+    try:
+        seq = 0
+        for ttl in range(first_ttl, max_hops + 1):
+            for _ in range(probes):
+                seq += 1
+                sent[seq] = (ttl, time.time())
+                prober.send(ttl, seq)
+        answers = _collect(prober, sent, timeout)
+    except OSError as e:
+        return {'status': 'error', 'message': f'Error: {str(e)}'}
+    finally:
+        prober.close()
+
+    result = _summarize(family, sent, answers, first_ttl, probes)
+    result.update({
+        'target': host,
+        'address': address,
+        'protocol': protocol,
+        'port': port,
+        'elapsed_ms': (time.time() - started) * 1000.0,
+    })
+    return result
+
+
+def _collect(prober: _Prober, sent: dict, timeout: float) -> dict:
+    """Read replies until every hop up to the end of the path is answered or time runs out"""
+    answers = {}
+    deadline = time.time() + timeout
+    finish = deadline
+    end_ttl = None
+    slowest = 0.0
+    while True:
+        now = time.time()
+        if now >= finish:
+            break
+        if end_ttl is not None and all(
+                seq in answers for seq, (ttl, _) in sent.items() if ttl <= end_ttl):
+            break
+        readable, _, _ = select.select(prober.sockets, [], [], finish - now)
+        for sock in readable:
+            for seq, kind, responder, received_at in prober.receive(sock):
+                if seq not in sent or seq in answers:
+                    continue
+                ttl, sent_at = sent[seq]
+                rtt = max(0.0, (received_at or time.time()) - sent_at)
+                answers[seq] = (kind, responder, rtt * 1000.0)
+                slowest = max(slowest, rtt)
+                if kind != 'hop' and (end_ttl is None or ttl < end_ttl):
+                    end_ttl = ttl
+                    finish = min(deadline, time.time() + max(2 * slowest, _GRACE))
+    return answers
+
+
+def _summarize(family: int, sent: dict, answers: dict, first_ttl: int, probes: int) -> dict:
+    by_ttl = {}
+    for seq, (ttl, _) in sorted(sent.items()):
+        by_ttl.setdefault(ttl, []).append(answers.get(seq))
+
+    end_ttl = min((ttl for ttl, replies in by_ttl.items()
+                   if any(r and r[0] != 'hop' for r in replies)), default=None)
+    answered = [ttl for ttl, replies in by_ttl.items() if any(replies)]
+    last_ttl = end_ttl or (max(answered) if answered else first_ttl - 1)
+    gateway = get_route_cache().default_gateway(family)
+
+    hops = []
+    for ttl in range(first_ttl, last_ttl + 1):
+        replies = by_ttl[ttl]
+        addresses = []
+        for reply in replies:
+            if reply and reply[1] and reply[1] not in addresses:
+                addresses.append(reply[1])
+        kinds = [reply[0] for reply in replies if reply]
+        received = len(kinds)
+        hops.append({
+            'ttl': ttl,
+            'addresses': addresses,
+            'rtt_ms': [reply[2] if reply else None for reply in replies],
+            'sent': probes,
+            'received': received,
+            'loss': 1.0 - received / probes,
+            'kind': max(set(kinds), key=kinds.count) if kinds else None,
+            'gateway': bool(gateway) and gateway in addresses,
+        })
+
+    reached = bool(hops) and hops[-1]['kind'] == 'destination'
+    if reached:
+        message = f"Reached in {last_ttl} hop{'s' if last_ttl > 1 else ''}"
+    elif end_ttl is not None:
+        message = f'Destination unreachable at hop {end_ttl}'
+    elif hops:
+        message = f'No reply beyond hop {last_ttl}'
+    else:
+        message = 'No replies'
+    return {
+        'status': 'complete',
+        'message': message,
+        'reached': reached,
+        'hop_count': last_ttl if reached else None,
+        'hops': hops,
+    }
@@ -1,3 +1,5 @@
+import pytest
+
 from src.core.app_logic import AppLogic
 
 
@@ -46,6 +48,66 @@ def test_connect_refused():
     assert 'refused' in result['message'].lower() or 'timeout' in result['message'].lower()
 
 
+def test_connect_success():
+    """Test connection to a local listening socket"""
+    import socket as sock
+    server = sock.socket(sock.AF_INET, sock.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    logic = AppLogic()
+    result = logic.connect("127.0.0.1", str(port))
+
+    assert result['status'] == 'connected'
+    assert result['remote_os'].startswith('Linux')
+    assert logic.connected is True
+
+    logic.disconnect()
+    server.close()
+
+
+def test_connect_ipv6():
+    """Test connection to an IPv6 loopback listener"""
+    import socket as sock
+    try:
+        server = sock.socket(sock.AF_INET6, sock.SOCK_STREAM)
+        server.bind(("::1", 0))
+    except OSError:
+        pytest.skip("IPv6 loopback not available")
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    logic = AppLogic()
+    result = logic.connect("::1", str(port))
+
+    assert result['status'] == 'connected'
+    assert logic.socket.family == sock.AF_INET6
+    assert result['remote_os'].startswith('Linux')
+
+    logic.disconnect()
+    server.close()
+
+
+def test_connect_hostname_gateway_flag(monkeypatch):
+    """Test that the gateway flag is checked against the peer address, not the host name"""
+    import socket as sock
+    server = sock.socket(sock.AF_INET, sock.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+    monkeypatch.setattr('src.core.app_logic.is_gateway', lambda ip: ip == '127.0.0.1')
+
+    logic = AppLogic()
+    result = logic.connect("localhost", str(port))
+
+    assert result['status'] == 'connected'
+    assert result['is_gateway'] is True
+
+    logic.disconnect()
+    server.close()
+
+
 def test_connect_invalid_ip():
     """Test connection with invalid IP address"""
     logic = AppLogic()
@@ -93,3 +155,100 @@ def test_send_empty_message():
 
     assert result['status'] == 'error'
     assert 'empty' in result['message'].lower()
+
+
+def test_background_receiving():
+    """Test that responses are streamed to a callback while receiving"""
+    import socket as sock
+    import threading
+    from src.core.framing import NewlineFramer
+
+    server = sock.socket(sock.AF_INET, sock.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    logic = AppLogic()
+    logic.connect("127.0.0.1", str(server.getsockname()[1]))
+    peer, _ = server.accept()
+
+    received = []
+    got_reply = threading.Event()
+
+    def on_message(message):
+        received.append(message)
+        got_reply.set()
+
+    assert logic.start_receiving(on_message, NewlineFramer()) is True
+    result = logic.send_message("ping")
+    assert result['status'] == 'success'
+    assert 'response' not in result
+
+    assert peer.recv(16) == b'ping'
+    peer.sendall(b'pong\n')
+    assert got_reply.wait(2)
+    assert received == [b'pong']
+
+    logic.disconnect()
+    assert logic.receiver is None
+    peer.close()
+    server.close()
+
+
+def _echo_peer(server):
+    """Accept one connection and echo a single read back"""
+    import threading
+
+    def run():
+        peer, _ = server.accept()
+        with peer:
+            peer.sendall(peer.recv(65536))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_send_binary_message():
+    """Test that bytes-like messages are sent as-is and responses stay bytes"""
+    import socket as sock
+    server = sock.socket(sock.AF_INET, sock.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    logic = AppLogic()
+    logic.connect("127.0.0.1", str(server.getsockname()[1]))
+    _echo_peer(server)
+
+    payload = bytearray(b'\x00\xffbinary\x80')
+    result = logic.send_message(memoryview(payload))
+    assert result['status'] == 'success'
+    assert result['bytes_sent'] == len(payload)
+    assert result['response'] == bytes(payload)
+
+    logic.disconnect()
+    server.close()
+
+
+def test_send_file(tmp_path):
+    """Test that send_file streams a file's contents"""
+    import socket as sock
+    server = sock.socket(sock.AF_INET, sock.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+
+    logic = AppLogic()
+    logic.connect("127.0.0.1", str(server.getsockname()[1]))
+    _echo_peer(server)
+
+    path = tmp_path / 'payload.bin'
+    contents = bytes(range(256)) * 4
+    path.write_bytes(contents)
+    result = logic.send_file(str(path))
+    assert result['status'] == 'success'
+    assert result['bytes_sent'] == len(contents)
+    assert contents.startswith(result['response'])
+
+    assert logic.send_file(str(tmp_path / 'missing'))['status'] == 'error'
+
+    logic.disconnect()
+    server.close()
@@ -0,0 +1,30 @@
+import json
+
+from benchmarks.bench_connection import compare, run_benchmarks, summarize
+
+
+def test_summarize_percentiles():
+    """Test percentile reduction of timing samples"""
+    stats = summarize([0.001 * i for i in range(1, 101)])
+    assert stats['n'] == 100
+    assert 50 <= round(stats['p50']) <= 51
+    assert round(stats['max']) == 100
+
+
+def test_run_benchmarks_smoke():
+    """Test that a tiny benchmark run produces a JSON-serialisable report"""
+    report = run_benchmarks(iterations=3, throughput_messages=50, message_size=16)
+    json.dumps(report)
+    assert report['results']['throughput']['complete'] is True
+    assert report['results']['connect_latency']['n'] == 3
+
+
+def test_compare_flags_regressions():
+    """Test regression detection in both directions"""
+    baseline = {'results': {'connect_latency': {'p50': 1.0},
+                            'throughput': {'messages_per_s': 1000.0}}}
+    current = {'results': {'connect_latency': {'p50': 2.0},
+                           'throughput': {'messages_per_s': 1100.0}}}
+    rows = {row['name']: row for row in compare(baseline, current, threshold=0.25)}
+    assert rows['connect_latency']['regression'] is True
+    assert rows['throughput']['regression'] is False
@@ -0,0 +1,169 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+
+from src.cli import main
+
+
+def test_info_outputs_json(capsys):
+    """Test that 'info' prints one JSON record"""
+    assert main(['info']) == 0
+    record = json.loads(capsys.readouterr().out)
+    assert isinstance(record['hostname'], str)
+    assert 'local_ip' in record
+    assert 'gateway' in record
+
+
+def test_connect_refused_exit_code(capsys):
+    """Test that a failed connect is reported and returns non-zero"""
+    assert main(['connect', '127.0.0.1', '54321']) == 1
+    record = json.loads(capsys.readouterr().out.splitlines()[0])
+    assert record['step'] == 'connect'
+    assert record['status'] == 'error'
+
+
+def test_connect_json_document(capsys):
+    """Test connect/disconnect records collected into one JSON document"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    assert main(['--format', 'json', 'connect', '127.0.0.1', str(port)]) == 0
+    server.close()
+    records = json.loads(capsys.readouterr().out)
+    assert [r['step'] for r in records] == ['connect', 'disconnect']
+    assert records[0]['status'] == 'connected'
+
+
+def test_connect_hex_payload(capsys):
+    """Test that --payload-format hex sends the decoded bytes, not the hex text"""
+    import threading
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+    received = []
+
+    def echo():
+        peer, _ = server.accept()
+        with peer:
+            data = peer.recv(65536)
+            received.append(data)
+            peer.sendall(data)
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    assert main(['connect', '127.0.0.1', str(port), '-m', '68690a',
+                 '--payload-format', 'hex']) == 0
+    thread.join(timeout=2)
+    server.close()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert received == [b'hi\n']
+    assert records[1]['step'] == 'send'
+    assert records[1]['bytes_sent'] == 3
+    assert bytes.fromhex(records[1]['response']) == b'hi\n'
+
+
+def test_scan_streams_ndjson(capsys):
+    """Test that scan results are streamed one per line"""
+    assert main(['scan', '127.0.0.1', '-p', '1-3']) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert {json.loads(line)['port'] for line in lines} == {1, 2, 3}
+
+
+def test_cli_never_imports_qt():
+    """Test that the CLI runs without importing PySide6 (or http.server, for metrics)"""
+    code = ("import sys; from src.cli import main; main(['info']); "
+            "sys.exit(1 if any(m.startswith('PySide6') or m == 'http.server' "
+            "for m in sys.modules) else 0)")
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, cwd=repo_root)
+    assert proc.returncode == 0
+
+
+def test_load_reports_summary(capsys):
+    """Test that 'load' sends for the duration and reports one summary record"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    assert main(['load', '127.0.0.1', str(port), '-r', '50', '-d', '0.3',
+                 '--no-replies']) == 0
+    server.close()
+    record = json.loads(capsys.readouterr().out)
+    assert record['status'] == 'complete'
+    assert record['sent'] > 0
+    assert record['bytes_sent'] == sum(len(f'ping {i}\n') for i in range(record['sent']))
+
+
+def test_load_payload_keeps_unicode(capsys):
+    """Test that a non-ASCII --payload is sent as UTF-8, with escapes decoded"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    assert main(['load', '127.0.0.1', str(port), '-r', '50', '-d', '0.2', '--no-replies',
+                 '--payload', 'é{seq}\\n']) == 0
+    server.close()
+    record = json.loads(capsys.readouterr().out)
+    assert record['sent'] > 0
+    assert record['bytes_sent'] == sum(len(f'é{i}\n'.encode('utf-8'))
+                                       for i in range(record['sent']))
+
+
+def test_load_json_payload(capsys):
+    """Test that a JSON --payload is sent as written instead of crashing str.format"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    assert main(['load', '127.0.0.1', str(port), '-r', '50', '-d', '0.2', '--no-replies',
+                 '--payload', '{"a":{seq}}\\n']) == 0
+    server.close()
+    record = json.loads(capsys.readouterr().out)
+    assert record['bytes_sent'] == sum(len(f'{{"a":{i}}}\n') for i in range(record['sent']))
+
+
+def test_load_payload_raw_bytes(capsys):
+    """Test that \\xNN escapes in --payload are sent as raw bytes"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    assert main(['load', '127.0.0.1', str(port), '-r', '50', '-d', '0.2', '--no-replies',
+                 '--payload', '\\xff\\x80{seq}']) == 0
+    server.close()
+    record = json.loads(capsys.readouterr().out)
+    assert record['bytes_sent'] == sum(2 + len(str(i)) for i in range(record['sent']))
+
+
+def test_monitor_streams_changes(capsys):
+    """Test that 'monitor' emits state changes and a final summary"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    port = server.getsockname()[1]
+
+    assert main(['monitor', '127.0.0.1', '-p', str(port), '-i', '0.1', '-d', '0.3']) == 0
+    server.close()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]['event'] == 'up'
+    assert records[0]['target'] == f'127.0.0.1:{port}'
+    assert records[-1]['status'] == 'complete' and records[-1]['up'] == 1
+
+
+def test_trace_emits_hops(capsys):
+    """Test that 'trace' emits one record per hop and then a summary"""
+    assert main(['trace', '127.0.0.1', '-q', '2', '-m', '4']) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]['ttl'] == 1 and records[0]['kind'] == 'destination'
+    assert records[-1]['status'] == 'complete' and records[-1]['reached']
+    assert 'hops' not in records[-1]
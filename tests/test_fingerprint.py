@@ -0,0 +1,111 @@
+import socket
+
+import pytest
+
+from src.core.fingerprint import (FingerprintEngine, best_guess, identify, initial_ttl, parse_options,
+                                  synack_features, tcp_info_features)
+from src.utils.network import SynAckSniffer
+
+# MSS 1460, SACK permitted, timestamps, NOP, window scale 7
+LINUX_OPTIONS = bytes.fromhex('020405b40402080a0000000100000000' '01030307')
+
+
+def _listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    return server, server.getsockname()[1]
+
+
+def test_initial_ttl():
+    """Test rounding observed TTLs up to initial TTLs"""
+    assert initial_ttl(57) == 64
+    assert initial_ttl(64) == 64
+    assert initial_ttl(113) == 128
+    assert initial_ttl(250) == 255
+
+
+def test_parse_options_and_features():
+    """Test option parsing into layout, MSS and window scale"""
+    assert [kind for kind, _ in parse_options(LINUX_OPTIONS)] == [2, 4, 8, 1, 3]
+    features = synack_features({'ttl': 58, 'df': True, 'window': 65160,
+                                'options': LINUX_OPTIONS})
+    assert features['layout'] == 'M,S,T,N,W'
+    assert features['mss'] == 1460
+    assert features['wscale'] == 7
+    assert features['timestamps'] and features['sack']
+    assert (features['initial_ttl'], features['hops']) == (64, 6)
+
+
+def test_engine_ranks_guesses():
+    """Test that the most specific matching signature ranks first"""
+    engine = FingerprintEngine()
+    windows = engine.match({'initial_ttl': 128, 'window': 8192, 'wscale': 8,
+                            'layout': 'M,N,W,N,N,S', 'timestamps': False, 'sack': True,
+                            'mss': 1460})
+    assert windows[0]['os'] == 'Windows 7+'
+    assert windows[0]['confidence'] > windows[1]['confidence']
+    assert len({g['os'] for g in windows}) == len(windows)
+
+    cisco = engine.match({'initial_ttl': 255, 'window': 4128, 'layout': 'M',
+                          'timestamps': False, 'sack': False, 'mss': 536})
+    assert cisco[0]['os'] == 'Cisco IOS'
+
+
+def test_engine_ttl_only_falls_back_to_generic():
+    """Test that a bare TTL yields the generic family names"""
+    assert FingerprintEngine().match({'initial_ttl': 64})[0]['os'] == 'Linux/Unix'
+    assert FingerprintEngine().match({'initial_ttl': 128})[0]['os'] == 'Windows'
+    assert FingerprintEngine().match({}) == []
+
+
+def test_tcp_info_windows_synack_is_ambiguous():
+    """Test that TCP_INFO alone cannot tell Windows versions apart or pass for Linux"""
+    features = {'source': 'tcp_info', 'timestamps': False, 'sack': True,
+                'wscale': 8, 'mss': 1460}
+    guesses = FingerprintEngine().match(features)
+    assert {g['os'] for g in guesses[:2]} == {'Windows 7+', 'Windows Server 2016+'}
+    linux = next(g for g in guesses if g['os'] == 'Linux (no timestamps)')
+    assert linux['confidence'] < guesses[0]['confidence']
+    # No TTL, window or layout: less sure than a full SYN-ACK match
+    full = FingerprintEngine().match({'initial_ttl': 128, 'window': 8192, 'layout': 'M,N,W,N,N,S',
+                                      **features})
+    assert guesses[0]['confidence'] < full[0]['confidence']
+
+    remote_os, ambiguous = best_guess(guesses)
+    assert ambiguous
+    assert remote_os == 'Windows 7+ / Windows Server 2016+ (ambiguous)'
+    assert best_guess(full) == ('Windows 7+', False)
+    assert best_guess([]) == ('Unknown', False)
+
+
+def test_identify_without_raw_socket():
+    """Test TCP_INFO based identification of a local (Linux) peer"""
+    server, port = _listener()
+    client = socket.create_connection(('127.0.0.1', port))
+    features = tcp_info_features(client)
+    assert features['timestamps'] is True
+    assert features['sack'] is True
+
+    result = identify(client)
+    assert result['ttl'] is None
+    assert result['remote_os'].startswith('Linux') and not result['ambiguous']
+    client.close()
+    server.close()
+
+
+def test_identify_with_sniffer():
+    """Test SYN-ACK based identification when raw sockets are permitted"""
+    sniffer = SynAckSniffer.open()
+    if sniffer is None:
+        pytest.skip('raw sockets not permitted')
+    server, port = _listener()
+    client = socket.create_connection(('127.0.0.1', port))
+    result = identify(client, sniffer)
+    assert result['features']['source'] == 'synack'
+    assert result['ttl'] == 64
+    assert result['features']['layout'] == 'M,S,T,N,W'
+    assert result['remote_os'] == 'Linux 3.x+'
+    client.close()
+    server.close()
+    sniffer.close()
@@ -0,0 +1,110 @@
+import socket
+import struct
+import threading
+
+import pytest
+
+from src.core.framing import (Framer, RingBuffer, RawFramer, NewlineFramer, LengthPrefixFramer,
+                              FixedSizeFramer, StreamReceiver, make_framer)
+
+
+def test_ring_buffer_wraps_and_grows():
+    """Test reads and searches across the wrap point and growth"""
+    ring = RingBuffer(8)
+    ring.write(b'abcdef')
+    assert ring.read(4) == b'abcd'
+    ring.write(b'ghij')  # wraps around the end
+    assert len(ring) == 6
+    assert ring.find(b'gh') == 2
+    assert ring.peek(6) == b'efghij'
+
+    ring.write(b'0123456789')  # exceeds capacity
+    assert ring.capacity >= 16
+    assert ring.read(100) == b'efghij0123456789'
+    assert len(ring) == 0
+
+
+def test_newline_framer_handles_split_lines():
+    """Test that lines split across chunks are reassembled"""
+    framer = NewlineFramer()
+    assert framer.feed(b'hel') == []
+    assert framer.feed(b'lo\r\nwor') == [b'hello']
+    assert framer.feed(b'ld\n\n') == [b'world', b'']
+
+
+def test_length_prefix_framer():
+    """Test length-prefixed messages arriving byte by byte"""
+    framer = LengthPrefixFramer(header_size=2)
+    stream = struct.pack('!H', 3) + b'abc' + struct.pack('!H', 0) + struct.pack('!H', 2) + b'xy'
+    messages = []
+    for i in range(len(stream)):
+        messages.extend(framer.feed(stream[i:i + 1]))
+    assert messages == [b'abc', b'', b'xy']
+
+    with pytest.raises(ValueError):
+        LengthPrefixFramer(header_size=3)
+
+
+def test_length_prefix_framer_rejects_oversized_frames():
+    """Test that a garbage length header fails instead of buffering forever"""
+    framer = LengthPrefixFramer(header_size=4, max_length=1024)
+    assert framer.feed(struct.pack('!I', 1024) + b'x') == []
+    framer.reset()
+    with pytest.raises(ValueError):
+        framer.feed(struct.pack('!I', 0xFFFFFFF0) + b'junk')
+
+    a, b = socket.socketpair()
+    reasons = []
+    closed = threading.Event()
+
+    def on_closed(reason):
+        reasons.append(reason)
+        closed.set()
+
+    receiver = StreamReceiver(b, LengthPrefixFramer(max_length=1024), lambda m: None,
+                              on_closed=on_closed)
+    receiver.start()
+    a.sendall(struct.pack('!I', 1 << 30))
+    assert closed.wait(2)
+    assert 'exceeds' in reasons[0]
+    receiver.stop()
+    a.close()
+    b.close()
+
+
+def test_fixed_and_raw_framers():
+    """Test fixed-size and pass-through framing"""
+    assert FixedSizeFramer(4).feed(b'abcdefghij') == [b'abcd', b'efgh']
+    assert RawFramer().feed(b'anything') == [b'anything']
+    assert isinstance(make_framer('newline'), NewlineFramer)
+    with pytest.raises(TypeError):
+        Framer()
+    with pytest.raises(ValueError):
+        make_framer('nope')
+
+
+def test_stream_receiver_delivers_messages():
+    """Test the background reader on a socket pair"""
+    a, b = socket.socketpair()
+    received = []
+    closed = threading.Event()
+    done = threading.Event()
+
+    def on_message(message):
+        received.append(message)
+        if len(received) == 2:
+            done.set()
+
+    receiver = StreamReceiver(b, NewlineFramer(), on_message,
+                              on_closed=lambda reason: closed.set())
+    receiver.start()
+    a.sendall(b'one\ntw')
+    a.sendall(b'o\n')
+    assert done.wait(2)
+    a.close()
+    assert closed.wait(2)
+    receiver.stop()
+    b.close()
+
+    assert received == [b'one', b'two']
+    assert receiver.bytes_received == 8
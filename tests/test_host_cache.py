@@ -0,0 +1,133 @@
+import socket
+import sqlite3
+import time
+
+from src.core.app_logic import AppLogic
+from src.core.host_cache import HostCache, probe_host
+
+
+def _listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    return server, server.getsockname()[1]
+
+
+def test_put_get_persists(tmp_path):
+    """Test that entries survive reopening the database"""
+    path = str(tmp_path / 'hosts.sqlite')
+    cache = HostCache(path)
+    cache.put('10.0.0.1', 64, 'Linux/Unix', rtt_ms=1.5)
+    cache.close()
+
+    entry = HostCache(path).get('10.0.0.1')
+    assert entry['ttl'] == 64
+    assert entry['remote_os'] == 'Linux/Unix'
+    assert 'is_gateway' not in entry
+    assert entry['rtt_ms'] == 1.5
+    assert entry['stale'] is False
+
+
+def test_staleness(tmp_path):
+    """Test that entries older than max_age are flagged stale"""
+    cache = HostCache(str(tmp_path / 'hosts.sqlite'), max_age=0.05)
+    cache.put('10.0.0.1', 128, 'Windows')
+    time.sleep(0.1)
+    assert cache.get('10.0.0.1')['stale'] is True
+    cache.put('10.0.0.1', 128, 'Windows')
+    assert cache.get('10.0.0.1')['stale'] is False
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently seen host is evicted first"""
+    cache = HostCache(str(tmp_path / 'hosts.sqlite'), max_entries=2)
+    cache.put('10.0.0.1', 64, 'Linux/Unix')
+    cache.put('10.0.0.2', 64, 'Linux/Unix')
+    cache.get('10.0.0.1')
+    cache.put('10.0.0.3', 64, 'Linux/Unix')
+
+    assert len(cache) == 2
+    assert cache.get('10.0.0.2') is None
+    assert cache.get('10.0.0.1') is not None
+
+
+def test_refresh_async_updates_entry(tmp_path):
+    """Test that a background re-probe stores its results once"""
+    cache = HostCache(str(tmp_path / 'hosts.sqlite'))
+    calls = []
+
+    def probe(ip, port):
+        calls.append((ip, port))
+        time.sleep(0.05)
+        return {'ttl': 255, 'remote_os': 'Cisco/Network Device', 'rtt_ms': 2.0}
+
+    assert cache.refresh_async('10.0.0.9', 22, probe) is True
+    assert cache.refresh_async('10.0.0.9', 22, probe) is False
+    deadline = time.monotonic() + 2
+    while cache.get('10.0.0.9') is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get('10.0.0.9')['remote_os'] == 'Cisco/Network Device'
+    assert calls == [('10.0.0.9', 22)]
+
+
+def test_probe_host():
+    """Test probing a reachable and an unreachable port"""
+    server, port = _listener()
+    result = probe_host('127.0.0.1', port)
+    assert result['ttl'] is not None
+    assert result['rtt_ms'] >= 0
+    server.close()
+    assert probe_host('127.0.0.1', port) is None
+
+
+def test_app_logic_uses_cache(tmp_path):
+    """Test that a known host is reported from the cache without probing"""
+    server, port = _listener()
+    cache = HostCache(str(tmp_path / 'hosts.sqlite'))
+    logic = AppLogic(host_cache=cache)
+
+    first = logic.connect('127.0.0.1', str(port))
+    assert first['status'] == 'connected'
+    assert 'cached' not in first
+    logic.disconnect()
+
+    cache.put('127.0.0.1', 255, 'Cisco/Network Device')
+    second = logic.connect('127.0.0.1', str(port))
+    assert second['cached'] is True
+    assert second['remote_os'] == 'Cisco/Network Device'
+    assert cache.get('127.0.0.1')['rtt_ms'] is not None
+    logic.disconnect()
+    server.close()
+
+
+def test_cache_hit_checks_gateway_live(tmp_path, monkeypatch):
+    """Test that the gateway flag comes from the routing table even on a cache hit"""
+    server, port = _listener()
+    cache = HostCache(str(tmp_path / 'hosts.sqlite'))
+    cache.put('127.0.0.1', 64, 'Linux/Unix')
+    monkeypatch.setattr('src.core.app_logic.is_gateway', lambda ip: ip == '127.0.0.1')
+    logic = AppLogic(host_cache=cache)
+    result = logic.connect('127.0.0.1', str(port))
+    assert result['cached'] is True
+    assert result['is_gateway'] is True
+    logic.disconnect()
+    server.close()
+
+
+def test_legacy_database_and_errors(tmp_path):
+    """Test that old databases still work and a broken cache never raises"""
+    path = str(tmp_path / 'hosts.sqlite')
+    db = sqlite3.connect(path)
+    db.execute('CREATE TABLE hosts (ip TEXT PRIMARY KEY, ttl INTEGER, remote_os TEXT, '
+               'is_gateway INTEGER NOT NULL DEFAULT 0, rtt_ms REAL, probed_at REAL NOT NULL, '
+               'last_seen REAL NOT NULL)')
+    db.close()
+
+    cache = HostCache(path)
+    cache.put('10.0.0.1', 64, 'Linux/Unix')
+    assert cache.get('10.0.0.1')['remote_os'] == 'Linux/Unix'
+    cache.close()
+    cache.remove('10.0.0.1')
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.get('10.0.0.1') is None
@@ -0,0 +1,52 @@
+import struct
+
+import pytest
+
+from src.utils.icmp import IcmpPinger, build_echo_request, icmp_checksum
+from src.utils.network import get_remote_ttl
+
+
+@pytest.fixture
+def pinger():
+    pinger = IcmpPinger.open()
+    if pinger is None:
+        pytest.skip('ICMP sockets not permitted')
+    yield pinger
+    pinger.close()
+
+
+def test_checksum_and_packet():
+    """Test that a built echo request checksums to zero"""
+    packet = build_echo_request(0x1234, 7, b'abc')
+    assert packet[0] == 8
+    assert struct.unpack('!HH', packet[4:8]) == (0x1234, 7)
+    assert icmp_checksum(packet) == 0
+
+
+def test_ping_localhost(pinger):
+    """Test a single echo returns TTL and RTT"""
+    result = pinger.ping('127.0.0.1')
+    assert result['status'] == 'alive'
+    assert result['ttl'] == 64
+    assert result['rtt_ms'] >= 0
+
+
+def test_ping_many_batches(pinger):
+    """Test many outstanding echoes on one socket, each reported once"""
+    hosts = [f'127.0.{i // 200}.{i % 200 + 1}' for i in range(1000)]
+    results = list(pinger.ping_many(hosts, timeout=2.0, max_outstanding=256))
+    assert sorted(r['ip'] for r in results) == sorted(hosts)
+    assert all(r['status'] == 'alive' for r in results)
+
+
+def test_ping_reports_errors_and_timeouts(pinger):
+    """Test unresolvable hosts and silent hosts"""
+    results = {r['ip']: r for r in pinger.ping_many(['bad host name', '192.0.2.123'],
+                                                      timeout=0.2)}
+    assert results['bad host name']['status'] == 'error'
+    assert results['192.0.2.123']['status'] in ('timeout', 'error')
+
+
+def test_get_remote_ttl_without_ping(pinger):
+    """Test that the legacy probe gets the TTL in-process"""
+    assert get_remote_ttl('127.0.0.1', 1, timeout=1.0) == 64
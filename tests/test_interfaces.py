@@ -0,0 +1,121 @@
+import socket
+import struct
+
+import pytest
+
+from src.utils import interfaces as interfaces_module
+from src.utils.interfaces import (IFA_LOCAL, IFF_RUNNING, IFF_UP, IFLA_IFNAME, IFLA_MTU,
+                                  RTM_DELADDR, RTM_DELLINK, RTM_NEWADDR, RTM_NEWLINK,
+                                  InterfaceInventory, _sysfs_inventory)
+
+
+def _attr(kind, payload):
+    length = 4 + len(payload)
+    return struct.pack('=HH', length, kind) + payload + b'\0' * (-length % 4)
+
+
+def _message(msg_type, body):
+    return struct.pack('=IHHII', 16 + len(body), msg_type, 0, 0, 0) + body
+
+
+def _link(msg_type, index, name, mtu=1500, flags=IFF_UP | IFF_RUNNING):
+    body = struct.pack('=BxHiII', 0, 1, index, flags, 0)
+    body += _attr(IFLA_IFNAME, name.encode() + b'\0') + _attr(IFLA_MTU, struct.pack('=I', mtu))
+    return _message(msg_type, body)
+
+
+def _address(msg_type, index, address, prefix):
+    family = socket.AF_INET6 if ':' in address else socket.AF_INET
+    body = struct.pack('=BBBBI', family, prefix, 0, 0, index)
+    return _message(msg_type, body + _attr(IFA_LOCAL, socket.inet_pton(family, address)))
+
+
+class _Routes:
+    def __init__(self, *routes):
+        self._routes = [dict(zip(('family', 'destination', 'prefix', 'interface', 'metric'), r))
+                        for r in routes]
+
+    def routes(self):
+        return self._routes
+
+
+def test_live_inventory_has_loopback():
+    """Test the netlink dump against the loopback interface"""
+    inventory = InterfaceInventory(watch=False)
+    lo = next(iface for iface in inventory.interfaces() if iface['loopback'])
+    assert lo['up'] is True
+    assert lo['mtu'] > 0
+    assert '127.0.0.1' in [a['address'] for a in lo['addresses']]
+    assert inventory.source_address('127.0.0.1') == '127.0.0.1'
+    assert inventory.source_address('not an ip') is None
+
+
+def test_source_address_matches_kernel():
+    """Test that source selection agrees with the kernel's route lookup"""
+    inventory = InterfaceInventory(watch=False)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            s.connect(('198.51.100.1', 9))
+        except OSError:
+            pytest.skip('no IPv4 route')
+        expected = s.getsockname()[0]
+    assert inventory.source_address('198.51.100.1') == expected
+    assert inventory.primary_address() == expected
+
+
+def test_events_update_incrementally(monkeypatch):
+    """Test that link and address events are applied without re-reading"""
+    monkeypatch.setattr(interfaces_module, '_netlink_inventory', lambda: {})
+    inventory = InterfaceInventory(watch=False)
+    assert inventory.interfaces() == []
+
+    inventory.apply(_link(RTM_NEWLINK, 42, 'tap9', mtu=9000)
+                    + _address(RTM_NEWADDR, 42, '10.9.0.5', 24))
+    (tap,) = inventory.interfaces()
+    assert (tap['name'], tap['mtu'], tap['up'], tap['running']) == ('tap9', 9000, True, True)
+    assert inventory.source_address('10.9.0.77') == '10.9.0.5'
+
+    # A link update keeps the addresses; the source cache follows address changes
+    inventory.apply(_link(RTM_NEWLINK, 42, 'tap9', mtu=1400))
+    assert inventory.interface('tap9')['mtu'] == 1400
+    inventory.apply(_address(RTM_NEWADDR, 42, '10.9.0.6', 25))
+    assert inventory.source_address('10.9.0.77') == '10.9.0.6'
+    inventory.apply(_address(RTM_DELADDR, 42, '10.9.0.6', 25))
+    assert [a['address'] for a in inventory.addresses()] == ['10.9.0.5']
+
+    inventory.apply(_link(RTM_DELLINK, 42, 'tap9'))
+    assert inventory.interfaces() == []
+
+
+def test_ipv6_source_prefers_matching_scope(monkeypatch):
+    """Test RFC 6724 selection between a ULA and a global address on one link"""
+    monkeypatch.setattr(interfaces_module, '_netlink_inventory', lambda: {})
+    inventory = InterfaceInventory(watch=False, route_cache=_Routes(
+        (socket.AF_INET6, '::', 0, 'tap9', 1024)))
+    inventory.interfaces()
+    # ULA listed first: plain first-address order would pick it
+    inventory.apply(_link(RTM_NEWLINK, 42, 'tap9')
+                    + _address(RTM_NEWADDR, 42, 'fd00::5', 64)
+                    + _address(RTM_NEWADDR, 42, '2a00:1450::5', 64))
+    assert inventory.source_address('2001:db8::1') == '2a00:1450::5'
+    assert inventory.source_address('fd12:3456::1') == 'fd00::5'
+
+    # Among global addresses the longest shared prefix wins
+    inventory.apply(_address(RTM_NEWADDR, 42, '2001:db8:1::5', 64))
+    assert inventory.source_address('2001:db8::1') == '2001:db8:1::5'
+
+
+def test_sysfs_fallback(tmp_path):
+    """Test the /sys/class/net and /proc/net/if_inet6 fallback"""
+    sys_dir = tmp_path / 'net'
+    for name, values in {'ifindex': '7', 'flags': '0x1003', 'mtu': '1280',
+                         'address': 'aa:bb:cc:dd:ee:ff', 'operstate': 'up', 'carrier': '1'}.items():
+        (sys_dir / 'nosuch0').mkdir(parents=True, exist_ok=True)
+        (sys_dir / 'nosuch0' / name).write_text(values + '\n')
+    if_inet6 = tmp_path / 'if_inet6'
+    if_inet6.write_text('fd000000000000000000000000000002 07 40 00 80  nosuch0\n')
+
+    (iface,) = _sysfs_inventory(str(sys_dir), str(if_inet6)).values()
+    assert (iface['index'], iface['mtu'], iface['up'], iface['running']) == (7, 1280, True, True)
+    assert iface['addresses'] == [{'family': socket.AF_INET6, 'address': 'fd00::2',
+                                   'prefix': 64, 'scope': 0, 'flags': 0x80}]
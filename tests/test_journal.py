@@ -0,0 +1,134 @@
+import json
+import os
+
+from src.core.journal import SessionJournal, journal_enabled, prune_journals
+
+
+def test_journal_creates_session_file(tmp_path):
+    """Test that a new journal file is created in the given directory"""
+    journal = SessionJournal(directory=str(tmp_path))
+    journal.record('system', 'Connected to 127.0.0.1:8080')
+    journal.close()
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1
+    assert files[0].name.endswith('.jsonl')
+
+
+def test_journal_records_are_jsonl(tmp_path):
+    """Test that every event is one JSON line with timestamp and byte count"""
+    path = tmp_path / "session.jsonl"
+    journal = SessionJournal(path=str(path))
+    journal.record('sent', 'SENT: hello', nbytes=5)
+    journal.record('response', 'RESPONSE: world', nbytes=5)
+    journal.close()
+
+    lines = path.read_bytes().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record['type'] == 'sent'
+    assert record['text'] == 'SENT: hello'
+    assert record['bytes'] == 5
+    assert isinstance(record['ts'], float)
+
+
+def test_journal_iter_flushes_pending_writes(tmp_path):
+    """Test that reading back includes buffered, unflushed records"""
+    journal = SessionJournal(path=str(tmp_path / "s.jsonl"), flush_interval=3600)
+    for i in range(100):
+        journal.record('sent', f'message {i}')
+    records = list(journal.iter_records())
+    journal.close()
+    assert len(records) == 100
+    assert records[-1]['text'] == 'message 99'
+
+
+def test_journal_flush_pending_writes_quiet_session(tmp_path):
+    """Test that buffered records reach the file once the interval passes, with no new record"""
+    import time
+    path = tmp_path / "s.jsonl"
+    journal = SessionJournal(path=str(path), flush_interval=0.2)
+    journal.flush()
+    journal.record('sent', 'last words')
+    journal.flush_pending()
+    assert path.read_bytes() == b''  # Not due yet
+
+    time.sleep(0.25)
+    journal.flush_pending()
+    assert json.loads(path.read_bytes())['text'] == 'last words'
+    journal.close()
+
+
+def test_journal_export_text_and_filter(tmp_path):
+    """Test plain-text export with a type filter"""
+    journal = SessionJournal(path=str(tmp_path / "s.jsonl"))
+    journal.record('system', 'Connected')
+    journal.record('sent', 'SENT: a', nbytes=1)
+    journal.record('error', 'boom')
+
+    dest = tmp_path / "export.txt"
+    assert journal.export(str(dest), types={'sent', 'error'}) == 2
+    lines = dest.read_text().splitlines()
+    assert lines[0].endswith('] SENT: a')
+    assert lines[1].endswith('] boom')
+
+    dest_jsonl = tmp_path / "export.jsonl"
+    assert journal.export(str(dest_jsonl), fmt='jsonl') == 3
+    journal.close()
+
+
+def test_journal_prunes_old_sessions(tmp_path):
+    """Test that starting a session keeps at most max_files journals"""
+    for i in range(5):
+        old = tmp_path / f"session_2020010{i}_000000_1.jsonl"
+        old.write_text('{}\n')
+        os.utime(old, (1000 + i, 1000 + i))
+    (tmp_path / "notes.txt").write_text('keep me')
+
+    journal = SessionJournal(directory=str(tmp_path), max_files=3)
+    journal.close()
+    sessions = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith('session_'))
+    assert len(sessions) == 3
+    assert "session_20200104_000000_1.jsonl" in sessions
+    assert "session_20200102_000000_1.jsonl" not in sessions
+    assert (tmp_path / "notes.txt").exists()
+
+    # The new, still empty session fits any byte budget; the older two do not
+    assert prune_journals(str(tmp_path), max_files=10, max_bytes=0) == 2
+
+
+def test_journal_stops_at_max_bytes(tmp_path):
+    """Test that a session stops recording, with a note, at its size limit"""
+    journal = SessionJournal(path=str(tmp_path / "session.jsonl"), max_session_bytes=500)
+    for i in range(50):
+        journal.record('sent', 'x' * 40, 40)
+    records = list(journal.iter_records())
+    journal.close()
+    assert journal.truncated
+    assert records[-1]['type'] == 'system' and 'limit' in records[-1]['text']
+    assert len(records) < 10
+    assert os.path.getsize(tmp_path / "session.jsonl") <= 500
+
+
+def test_journal_directory_stays_within_max_bytes(tmp_path):
+    """Test that old journals plus the new session fit the total byte budget"""
+    for i in range(3):
+        old = tmp_path / f"session_2020010{i}_000000_1.jsonl"
+        old.write_bytes(b'x' * 399 + b'\n')
+        os.utime(old, (1000 + i, 1000 + i))
+
+    journal = SessionJournal(directory=str(tmp_path), max_bytes=1000, max_session_bytes=500)
+    for i in range(50):
+        journal.record('sent', 'x' * 40, 40)
+    journal.close()
+    # One old journal is kept next to the new session's 500 bytes (final note included)
+    assert len(list(tmp_path.iterdir())) == 2
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 1000
+
+
+def test_journal_opt_out(monkeypatch):
+    """Test that LINXTAP_JOURNAL=0 disables the journal"""
+    monkeypatch.delenv('LINXTAP_JOURNAL', raising=False)
+    assert journal_enabled()
+    monkeypatch.setenv('LINXTAP_JOURNAL', '0')
+    assert not journal_enabled()
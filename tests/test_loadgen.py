@@ -0,0 +1,172 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from src.core.loadgen import LatencyHistogram, LoadGenerator
+
+
+def test_histogram_percentiles_within_precision():
+    """Test that percentiles stay within the histogram's relative error"""
+    histogram = LatencyHistogram()
+    values = list(range(1, 100001))
+    random.shuffle(values)
+    for value in values:
+        histogram.record(value)
+
+    assert histogram.count == 100000
+    assert histogram.min == 1
+    assert histogram.max == 100000
+    for p, expected in ((50, 50000), (90, 90000), (99, 99000)):
+        assert abs(histogram.percentile(p) - expected) / expected < 0.01
+
+
+def test_histogram_small_values_exact_and_merge():
+    """Test exact small values and merging of histograms"""
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for value in (1, 2, 3):
+        a.record(value)
+    b.record(200)
+    a.merge(b)
+    assert a.count == 4
+    assert a.percentile(50) == 2
+    assert a.percentile(100) == 200
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_load_generator_rejects_bad_input():
+    """Test validation of target and rate"""
+    with pytest.raises(ValueError):
+        LoadGenerator('127.0.0.1', '0')
+    with pytest.raises(ValueError):
+        LoadGenerator('127.0.0.1', '80', rate=0)
+
+
+def test_load_generator_against_echo_server():
+    """Test achieved rate and latency recording against a local echo server"""
+    async def handle(reader, writer):
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        progress = []
+        generator = LoadGenerator('127.0.0.1', port, rate=400, connections=4,
+                                  duration=0.5, on_progress=progress.append,
+                                  progress_interval=0.1)
+        report = await generator.run()
+        server.close()
+        await server.wait_closed()
+        return report, progress
+
+    report, progress = asyncio.run(scenario())
+    assert report['status'] == 'complete'
+    assert report['errors'] == 0
+    assert 150 <= report['sent'] <= 210
+    assert report['received'] == report['sent']
+    assert report['latency']['count'] == report['sent']
+    assert report['latency']['p99_ms'] is not None
+    assert progress
+
+
+def test_load_generator_json_template():
+    """Test that only {seq} is substituted, so literal braces (JSON) are sent as written"""
+    received = bytearray()
+
+    async def handle(reader, writer):
+        while data := await reader.read(65536):
+            received.extend(data)
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        generator = LoadGenerator('127.0.0.1', port, payload_template='{"a":{seq}}\n',
+                                  rate=100, duration=0.2, framer=None)
+        report = await generator.run()
+        await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+        return report
+
+    report = asyncio.run(scenario())
+    assert report['errors'] == 0 and report['sent'] > 0
+    assert received.decode().splitlines() == [f'{{"a":{i}}}' for i in range(report['sent'])]
+    binary = LoadGenerator('127.0.0.1', '80', payload_template=b'\xff{seq}')
+    assert binary._payload(7) == b'\xff7'
+
+
+def test_load_generator_fastopen_profile():
+    """Test that with a fastopen profile the first message goes out with the connect"""
+    async def handle(reader, writer):
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        generator = LoadGenerator('127.0.0.1', port, rate=100, duration=0.2,
+                                  profile='low-latency')
+        report = await generator.run()
+        server.close()
+        await server.wait_closed()
+        return report
+
+    report = asyncio.run(scenario())
+    assert report['errors'] == 0 and report['sent'] > 1
+    assert report['received'] == report['sent']
+    assert report['bytes_sent'] == sum(len(f'ping {i}\n') for i in range(report['sent']))
+    with pytest.raises(ValueError):
+        LoadGenerator('127.0.0.1', '80', profile='no-such-profile')
+
+
+def test_load_generator_counts_connect_errors():
+    """Test that refused connections are reported as errors"""
+    generator = LoadGenerator('127.0.0.1', '54321', connections=2, duration=0.1)
+    report = asyncio.run(generator.run())
+    assert report['errors'] == 2
+    assert report['sent'] == 0
+
+
+def test_load_generator_bounded_at_unreachable_rate():
+    """Test that an impossible rate still ends on time and honours stop()"""
+    async def handle(reader, writer):
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        writer.close()
+
+    async def scenario():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        progress = []
+        generator = LoadGenerator('127.0.0.1', port, rate=1e7, connections=2,
+                                  duration=0.5, on_progress=progress.append,
+                                  progress_interval=0.05)
+        start = time.monotonic()
+        report = await generator.run()
+        elapsed = time.monotonic() - start
+
+        stopper = LoadGenerator('127.0.0.1', port, rate=1e7, connections=2, duration=30)
+        asyncio.get_running_loop().call_later(0.2, stopper.stop)
+        stop_start = time.monotonic()
+        stopped = await stopper.run()
+        stop_elapsed = time.monotonic() - stop_start
+
+        server.close()
+        await server.wait_closed()
+        return report, progress, elapsed, stopped, stop_elapsed
+
+    report, progress, elapsed, stopped, stop_elapsed = asyncio.run(scenario())
+    assert report['sent'] > 0
+    # Duration plus the 1 s grace for in-flight replies, not many seconds
+    assert elapsed < 2.0
+    assert len(progress) >= 5
+    assert stopped['status'] == 'stopped'
+    assert stop_elapsed < 1.5
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication
+from src.ui.log_view import LogModel, LogView
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance() or QApplication([])
+    yield app
+
+
+def _texts(model):
+    return [text for _, _, text in model.records()]
+
+
+def test_appends_are_batched_until_flush(qapp):
+    """Test that queued records appear in one insertion on flush"""
+    model = LogModel()
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    for i in range(500):
+        model.append('info', f"message {i}")
+    assert model.rowCount() == 0
+
+    model.flush()
+    assert model.rowCount() == 500
+    assert inserted == [(0, 499)]
+    assert model.data(model.index(499)).endswith("message 499")
+    assert model.data(model.index(0), Qt.ForegroundRole) is not None
+
+
+def test_model_caps_at_max_records(qapp):
+    """Test that the oldest records are dropped beyond max_records"""
+    model = LogModel(max_records=100)
+    for i in range(80):
+        model.append('info', str(i))
+    model.flush()
+    for i in range(80, 250):
+        model.append('sent', str(i))
+    model.flush()
+    assert model.rowCount() == 100
+    assert _texts(model)[0] == '150' and _texts(model)[-1] == '249'
+
+
+def test_multiline_messages_become_rows(qapp):
+    """Test that each line of a message gets its own row"""
+    model = LogModel()
+    model.append('response', "RESPONSE: line one\r\nline two\nline three")
+    model.append('info', "")
+    model.flush()
+    assert _texts(model) == ["RESPONSE: line one", "line two", "line three", ""]
+    assert {kind for _, kind, _ in model.records()} == {'response', 'info'}
+
+
+def test_clear_drops_records_and_pending(qapp):
+    """Test that clear() empties the model, including unflushed appends"""
+    model = LogModel()
+    model.append('info', "shown")
+    model.flush()
+    model.append('info', "queued")
+    model.clear()
+    model.flush()
+    assert model.rowCount() == 0
+
+    view = LogView(model)
+    model.append('system', "after clear")
+    model.flush()
+    assert view.model().rowCount() == 1
@@ -0,0 +1,101 @@
+import socket
+import urllib.request
+
+from src.core.app_logic import AppLogic
+from src.core.metrics import Metrics
+
+
+def test_disabled_metrics_record_nothing():
+    """Test that disabled metrics hand out the shared no-op span"""
+    metrics = Metrics(enabled=False)
+    with metrics.span('a') as first, metrics.span('b') as second:
+        metrics.inc('bytes_sent', 10)
+    assert first is second
+    assert metrics.snapshot() == {'spans': {}, 'counters': {}}
+
+
+def test_spans_and_counters():
+    """Test span statistics and labelled counters"""
+    metrics = Metrics(enabled=True)
+    metrics.observe('connect', 0.002)
+    metrics.observe('connect', 0.004)
+    metrics.inc('connections', result='connected')
+    metrics.inc('connections', result='connected')
+    metrics.inc('bytes_sent', 42)
+
+    snapshot = metrics.snapshot()
+    assert snapshot['spans'][('connect', ())]['count'] == 2
+    assert abs(snapshot['spans'][('connect', ())]['mean_ms'] - 3.0) < 1e-9
+    assert abs(snapshot['spans'][('connect', ())]['max_ms'] - 4.0) < 1e-9
+    assert metrics.counter('connections', result='connected') == 2
+    assert metrics.counter('bytes_sent') == 42
+
+
+def test_prometheus_text_format(tmp_path):
+    """Test histogram/counter exposition and the atomic textfile"""
+    metrics = Metrics(enabled=True, buckets=(0.001, 0.01))
+    metrics.observe('send.sendall', 0.0005)
+    metrics.observe('send.sendall', 0.005)
+    metrics.observe('send.sendall', 0.5)
+    metrics.inc('errors', op='send')
+
+    text = metrics.render_prometheus()
+    assert 'linxtap_span_seconds_bucket{phase="send.sendall",le="0.001"} 1' in text
+    assert 'linxtap_span_seconds_bucket{phase="send.sendall",le="0.01"} 2' in text
+    assert 'linxtap_span_seconds_bucket{phase="send.sendall",le="+Inf"} 3' in text
+    assert 'linxtap_span_seconds_count{phase="send.sendall"} 3' in text
+    assert '# TYPE linxtap_errors_total counter' in text
+    assert 'linxtap_errors_total{op="send"} 1' in text
+
+    path = tmp_path / 'linxtap.prom'
+    metrics.write_textfile(str(path))
+    assert path.read_text() == text
+    assert list(tmp_path.iterdir()) == [path]
+
+    metrics.observe('connect', 0.002, target='10.0.0.1:502')
+    assert 'linxtap_span_seconds_count{phase="connect",target="10.0.0.1:502"} 1' in metrics.render_prometheus()
+
+
+def test_http_endpoint():
+    """Test that /metrics serves the current exposition"""
+    metrics = Metrics(enabled=True)
+    metrics.inc('messages_sent', 3)
+    host, port = metrics.serve(port=0)
+    try:
+        with urllib.request.urlopen(f'http://{host}:{port}/metrics', timeout=5) as response:
+            body = response.read().decode('utf-8')
+        assert 'linxtap_messages_sent_total 3' in body
+    finally:
+        metrics.stop_serving()
+
+
+def test_app_logic_instrumentation():
+    """Test that connect and send phases are timed and traffic is counted"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    metrics = Metrics(enabled=True)
+    logic = AppLogic(metrics=metrics)
+    assert logic.connect('127.0.0.1', str(port))['status'] == 'connected'
+    peer, _ = server.accept()
+    peer.sendall(b'ack')
+    result = logic.send_message('hello')
+    assert result['response'] == 'ack'
+    logic.disconnect()
+    peer.close()
+    server.close()
+
+    target = (('target', f'127.0.0.1:{port}'),)
+    spans = metrics.snapshot()['spans']
+    for phase in ('connect', 'connect.resolve', 'connect.handshake', 'connect.gateway',
+                  'connect.fingerprint', 'send.sendall', 'send.first_byte'):
+        assert spans[(phase, target)]['count'] == 1, phase
+    assert metrics.counter('connections', result='connected', target=f'127.0.0.1:{port}') == 1
+    assert metrics.counter('bytes_sent', target=f'127.0.0.1:{port}') == 5
+    assert metrics.counter('bytes_received', target=f'127.0.0.1:{port}') == 3
+
+    assert logic.connect('127.0.0.1', str(port))['status'] == 'error'
+    assert metrics.counter('connections', result='error', target=f'127.0.0.1:{port}') == 1
+    assert metrics.counter('connections', result='error') == 0
@@ -0,0 +1,228 @@
+import asyncio
+import errno
+import os
+import socket
+import threading
+
+import pytest
+
+from src.core.monitor import HealthMonitor, TimeSeries
+
+
+def _listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(64)
+    return server, server.getsockname()[1]
+
+
+def _closed_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def test_time_series_ring():
+    """Test that the history keeps the newest samples and reports availability"""
+    series = TimeSeries(capacity=4, epoch=1000.0)
+    assert series.availability() is None
+    for i, rtt in enumerate((1.5, None, 3.0, 4.0, None, 6.0)):
+        series.append(1000.0 + i, rtt)
+    assert len(series) == 4
+    samples = series.samples()
+    assert [round(t) for t, _ in samples] == [1002, 1003, 1004, 1005]
+    assert [rtt for _, rtt in samples] == [3.0, 4.0, None, 6.0]
+    assert series.samples(last=2)[-1] == (1005.0, 6.0)
+    assert series.availability() == 0.75
+
+
+def test_time_series_outlives_uint32_offsets():
+    """Test that timestamps stay right past the 49.7 days a uint32 of milliseconds holds"""
+    day = 86400.0
+    series = TimeSeries(capacity=4, epoch=1000.0)
+    series.append(1000.0 + 20 * day, 1.0)
+    series.append(1000.0 + 40 * day, 2.0)
+    series.append(1000.0 + 60 * day, 3.0)  # 60 days after the epoch: past the uint32 range
+    assert [t for t, _ in series.samples()] == pytest.approx(
+        [1000.0 + 20 * day, 1000.0 + 40 * day, 1000.0 + 60 * day], abs=0.001)
+
+    # Across a gap wider than the range the new sample stays exact; older ones clamp
+    series.append(1000.0 + 130 * day, 4.0)
+    times = [t for t, _ in series.samples()]
+    assert times[-1] == pytest.approx(1000.0 + 130 * day, abs=0.001)
+    assert times == sorted(times) and times[-1] - times[0] < 50 * day
+    assert [rtt for _, rtt in series.samples()] == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_socket_exhaustion_is_a_failed_probe(monkeypatch):
+    """Test that EMFILE from socket() is recorded on the target, not lost in the task"""
+    server, port = _listener()
+    monitor = HealthMonitor(interval=0.05, timeout=0.5)
+    key = monitor.add_target('127.0.0.1', port)
+
+    async def run():
+        with monkeypatch.context() as patch:
+            # Patched inside the loop: the loop itself needs real sockets to start
+            patch.setattr(socket, 'socket', _no_descriptors)
+            return await monitor.run(duration=0.3)
+
+    asyncio.run(run())
+    info = monitor.snapshot()[0]
+    assert info['target'] == key
+    assert info['state'] == 'down' and info['checks'] >= 2
+    assert 'Too many open files' in info['last_error']
+    server.close()
+
+
+def _no_descriptors(*args, **kwargs):
+    raise OSError(errno.EMFILE, os.strerror(errno.EMFILE))
+
+
+def test_up_and_down_targets():
+    """Test that an open port goes up with an RTT and a closed one goes down"""
+    server, port = _listener()
+    closed = _closed_port()
+    events = []
+    monitor = HealthMonitor(interval=0.05, timeout=0.5,
+                            on_event=lambda event, info: events.append((event, info['target'])))
+    up_key = monitor.add_target('127.0.0.1', port)
+    down_key = monitor.add_targets('127.0.0.1', str(closed))[0]
+    asyncio.run(monitor.run(duration=0.4))
+
+    info = {entry['target']: entry for entry in monitor.snapshot()}
+    assert info[up_key]['state'] == 'up'
+    assert info[up_key]['checks'] >= 3
+    assert info[up_key]['rtt_avg_ms'] is not None
+    assert info[up_key]['availability'] == 1.0
+    assert info[down_key]['state'] == 'down'
+    assert info[down_key]['last_error'] == 'Connection refused'
+    assert ('up', up_key) in events and ('down', down_key) in events
+    assert monitor.summary()['up'] == 1 and monitor.summary()['down'] == 1
+    server.close()
+
+
+def test_echo_probe_times_reply():
+    """Test that echo mode sends the payload and waits for a reply"""
+    server, port = _listener()
+    received = []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            data = conn.recv(64)
+            received.append(data)
+            conn.sendall(data)
+            conn.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    monitor = HealthMonitor(interval=0.05, timeout=0.5, mode='echo', payload=b'hello\n')
+    key = monitor.add_target('127.0.0.1', port)
+    asyncio.run(monitor.run(duration=0.3))
+    assert monitor.snapshot()[0]['state'] == 'up'
+    assert received and received[0] == b'hello\n'
+    monitor.remove_target(key)
+    assert monitor.snapshot() == []
+    server.close()
+
+
+class _Resolver:
+    """Stands in for the shared resolver: answers with addresses, or never"""
+
+    def __init__(self, addresses=None):
+        self.addresses = addresses
+
+    def resolve_async(self, host, port=0, family=socket.AF_UNSPEC):
+        from concurrent.futures import Future
+        future = Future()
+        if self.addresses is not None:
+            future.set_result(list(self.addresses))
+        return future
+
+
+def test_slow_resolve_counts_against_timeout(monkeypatch):
+    """Test that a resolver that never answers fails the probe within its timeout"""
+    monkeypatch.setattr('src.core.monitor.get_resolver', lambda: _Resolver())
+    monitor = HealthMonitor(interval=0.05, timeout=0.1)
+    monitor.add_target('slow.example', 80)
+    asyncio.run(monitor.run(duration=0.35))
+    info = monitor.snapshot()[0]
+    assert info['checks'] >= 2
+    assert info['last_error'] == 'Timeout'
+
+
+def test_probe_falls_back_to_other_address(monkeypatch):
+    """Test that a dual-stack target is up when only a later address answers"""
+    server, port = _listener()
+    blackhole = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    blackhole.bind(('127.0.0.1', 0))
+    blackhole.listen(0)
+    # Fill the accept queue: further SYNs to it go unanswered
+    filler = socket.create_connection(blackhole.getsockname())
+    monkeypatch.setattr('src.core.monitor.get_resolver', lambda: _Resolver([
+        (socket.AF_INET, ('127.0.0.1', _closed_port())),
+        (socket.AF_INET, blackhole.getsockname()),
+        (socket.AF_INET, ('127.0.0.1', port)),
+    ]))
+    monitor = HealthMonitor(interval=0.2, timeout=1.0)
+    monitor.add_target('dual.example', port)
+    asyncio.run(monitor.run(duration=0.5))
+    info = monitor.snapshot()[0]
+    assert info['state'] == 'up' and info['checks'] >= 1
+    filler.close()
+    blackhole.close()
+    server.close()
+
+
+def test_rise_fall_and_flapping():
+    """Test state hysteresis and flap detection from recorded results"""
+    events = []
+    monitor = HealthMonitor(fall=2, rise=2, flap_threshold=3, flap_window=10.0,
+                            on_event=lambda event, info: events.append(event))
+    monitor.add_target('192.0.2.1', 80)
+    target = monitor.targets['192.0.2.1:80']
+
+    monitor._record(target, 1.0, None, 0.0)
+    assert target.state == 'up'
+    monitor._record(target, None, 'Timeout', 1.0)
+    assert target.state == 'up'
+    monitor._record(target, None, 'Timeout', 2.0)
+    assert target.state == 'down'
+    for now in (3.0, 4.0):
+        monitor._record(target, 2.0, None, now)
+    for now in (5.0, 6.0):
+        monitor._record(target, None, 'Timeout', now)
+    assert target.flapping
+    assert events == ['up', 'down', 'up', 'down', 'flapping']
+
+    # Quiet for longer than the window: the flapping flag clears
+    monitor._record(target, None, 'Timeout', 30.0)
+    assert not target.flapping and events[-1] == 'stable'
+
+
+def test_thousands_of_targets():
+    """Test that 2000 targets are all probed within one interval without skips"""
+    server, port = _listener()
+    monitor = HealthMonitor(interval=1.0, timeout=0.5, concurrency=256)
+    monitor.add_targets('127.0.0.0/21', str(port))
+    assert monitor.summary()['targets'] == 2046
+    asyncio.run(monitor.run(duration=1.5))
+    checked = [entry for entry in monitor.snapshot() if entry['checks']]
+    assert len(checked) == 2046
+    assert monitor.skipped == 0
+    server.close()
+
+
+def test_invalid_targets():
+    """Test that bad ports and options are rejected"""
+    monitor = HealthMonitor()
+    with pytest.raises(ValueError):
+        monitor.add_target('127.0.0.1', 0)
+    with pytest.raises(ValueError):
+        monitor.add_targets('', '80')
+    with pytest.raises(ValueError):
+        HealthMonitor(mode='udp')
@@ -1,5 +1,12 @@
+import errno
+import socket
+
+import pytest
+
 from src.utils.network import (get_local_ip, get_hostname, get_default_gateway,
-                              detect_os_from_ttl, is_gateway)
+                              detect_os_from_ttl, is_gateway,
+                              SynAckSniffer, RouteCache, happy_eyeballs_connect,
+                              resolve_addresses)
 
 
 def test_get_local_ip_returns_string():
@@ -67,3 +74,190 @@ def test_is_gateway():
 
     # Test with localhost
     assert is_gateway('127.0.0.1') is False
+
+
+def _local_connection():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client.connect(server.getsockname())
+    return server, client
+
+
+def test_syn_ack_sniffer_captures_ttl():
+    """Test that the SYN-ACK TTL is captured when raw sockets are permitted"""
+    sniffer = SynAckSniffer.open()
+    if sniffer is None:
+        pytest.skip("raw sockets not permitted")
+
+    server, client = _local_connection()
+    ttl = sniffer.ttl_for(client.getsockname(), client.getpeername())
+    sniffer.close()
+    client.close()
+    server.close()
+    # Loopback SYN-ACKs carry the local default TTL
+    assert ttl == 64
+
+
+IPV4_ROUTES = """Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0
+wlan0\t00000000\t0102A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0
+eth0\t0001A8C0\t00000000\t0001\t0\t0\t100\t00FFFFFF\t0\t0\t0
+"""
+
+IPV6_ROUTES = (
+    "00000000000000000000000000000000 00 00000000000000000000000000000000 00 "
+    "fd000000000000000000000000000001 00000400 00000001 00000000 00000003     eth0\n"
+    "fd000000000000000000000000000000 40 00000000000000000000000000000000 00 "
+    "00000000000000000000000000000000 00000100 00000001 00000000 00000001     eth0\n"
+)
+
+
+def _route_cache(tmp_path, ttl=60.0):
+    route = tmp_path / "route"
+    route.write_text(IPV4_ROUTES)
+    ipv6_route = tmp_path / "ipv6_route"
+    ipv6_route.write_text(IPV6_ROUTES)
+    return RouteCache(ttl=ttl, watch=False, route_path=str(route),
+                      ipv6_route_path=str(ipv6_route))
+
+
+def test_route_cache_default_gateways(tmp_path):
+    """Test that the lowest-metric default route wins for each family"""
+    cache = _route_cache(tmp_path)
+    assert cache.default_gateway(socket.AF_INET) == '192.168.1.1'
+    assert cache.default_gateway(socket.AF_INET6) == 'fd00::1'
+    assert cache.is_gateway('192.168.1.1') is True
+    assert cache.is_gateway('fd00:0::1') is True
+    assert cache.is_gateway('fd00::1%eth0') is True
+    assert cache.is_gateway('192.168.1.20') is False
+    assert cache.is_gateway('not-an-ip') is False
+
+
+def test_route_cache_secondary_default_route(tmp_path):
+    """Test that a higher-metric default route's next hop still counts as a gateway"""
+    cache = _route_cache(tmp_path)
+    assert cache.default_gateway(socket.AF_INET) == '192.168.1.1'
+    assert cache.is_gateway('192.168.2.1') is True
+
+
+def test_route_watcher_survives_dropped_events(tmp_path):
+    """Test that ENOBUFS from the netlink socket invalidates the cache and keeps watching"""
+    class OverrunSocket:
+        def __init__(self):
+            self.calls = 0
+
+        def recv(self, size):
+            self.calls += 1
+            if self.calls == 1:
+                raise OSError(errno.ENOBUFS, 'No buffer space available')
+            raise OSError(errno.EBADF, 'Bad file descriptor')
+
+    cache = _route_cache(tmp_path)
+    cache.default_gateway()
+    sock = OverrunSocket()
+    cache._watch(sock)
+    assert sock.calls == 2
+    assert cache._loaded_at is None
+
+
+def test_route_cache_reads_once(tmp_path):
+    """Test that lookups are served from cache until invalidated"""
+    cache = _route_cache(tmp_path)
+    assert cache.default_gateway() == '192.168.1.1'
+
+    (tmp_path / "route").write_text(IPV4_ROUTES.replace('0101A8C0', '0A01A8C0'))
+    assert cache.default_gateway() == '192.168.1.1'
+
+    cache.invalidate()
+    assert cache.default_gateway() == '192.168.1.10'
+
+
+def test_route_cache_ttl_expiry(tmp_path):
+    """Test that a zero TTL re-reads the table on every lookup"""
+    cache = _route_cache(tmp_path, ttl=0)
+    assert cache.default_gateway() == '192.168.1.1'
+    (tmp_path / "route").write_text(IPV4_ROUTES.replace('0101A8C0', '0A01A8C0'))
+    assert cache.default_gateway() == '192.168.1.10'
+
+
+def _ipv6_listener():
+    try:
+        server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        server.bind(('::1', 0))
+    except OSError:
+        pytest.skip('IPv6 loopback not available')
+    server.listen(8)
+    return server, server.getsockname()[1]
+
+
+def test_resolve_addresses_interleaves_families(monkeypatch):
+    """Test Happy Eyeballs ordering: families alternate, preferred first"""
+    infos = [
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::1', 80, 0, 0)),
+        (socket.AF_INET6, socket.SOCK_STREAM, 6, '', ('2001:db8::2', 80, 0, 0)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 80)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', ('192.0.2.1', 80)),
+    ]
+    monkeypatch.setattr(socket, 'getaddrinfo', lambda *args: infos)
+    assert [addr[1][0] for addr in resolve_addresses('dual.example', 80)] == [
+        '2001:db8::1', '192.0.2.1', '2001:db8::2']
+
+
+def test_happy_eyeballs_falls_back_to_other_family():
+    """Test that a refused IPv4 attempt immediately yields to IPv6"""
+    server, port = _ipv6_listener()
+    sock = happy_eyeballs_connect([(socket.AF_INET, ('127.0.0.1', port)),
+                                   (socket.AF_INET6, ('::1', port, 0, 0))], timeout=2)
+    assert sock.family == socket.AF_INET6
+    assert sock.getblocking() is True
+    sock.close()
+    server.close()
+
+
+def test_happy_eyeballs_errors():
+    """Test that the last connect error (or a timeout) is raised"""
+    server, port = _ipv6_listener()
+    server.close()
+    with pytest.raises(ConnectionRefusedError):
+        happy_eyeballs_connect([(socket.AF_INET6, ('::1', port, 0, 0))], timeout=2)
+    with pytest.raises(OSError):
+        happy_eyeballs_connect([])
+
+
+def test_happy_eyeballs_survives_socket_failure(monkeypatch):
+    """Test that a family whose socket cannot be created only fails its own attempt"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    port = server.getsockname()[1]
+    real_socket = socket.socket
+
+    def no_ipv6(family=socket.AF_INET, *args, **kwargs):
+        if family == socket.AF_INET6:
+            raise OSError(errno.EAFNOSUPPORT, 'Address family not supported by protocol')
+        return real_socket(family, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'socket', no_ipv6)
+    sock = happy_eyeballs_connect([(socket.AF_INET6, ('::1', port, 0, 0)),
+                                   (socket.AF_INET, ('127.0.0.1', port))], timeout=2)
+    assert sock.family == socket.AF_INET
+    sock.close()
+    with pytest.raises(OSError) as info:
+        happy_eyeballs_connect([(socket.AF_INET6, ('::1', port, 0, 0))], timeout=2)
+    assert info.value.errno == errno.EAFNOSUPPORT
+    server.close()
+
+
+def test_sniffer_captures_ipv6_hop_limit():
+    """Test that the SYN-ACK hop limit is captured for IPv6 connects"""
+    sniffer = SynAckSniffer.open()
+    if sniffer is None or sniffer.sock6 is None:
+        pytest.skip('raw sockets not permitted')
+    server, port = _ipv6_listener()
+    client = socket.create_connection(('::1', port))
+    assert sniffer.ttl_for(client.getsockname(), client.getpeername()) == 64
+    client.close()
+    server.close()
+    sniffer.close()
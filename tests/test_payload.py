@@ -0,0 +1,46 @@
+import pytest
+
+from src.core.payload import decode_escapes, hexdump, parse_payload
+
+
+def test_parse_payload_formats():
+    """Test text, hex and base64 input conversion"""
+    assert parse_payload('héllo') == 'héllo'.encode('utf-8')
+    assert parse_payload('de ad:BE 0xef', 'hex') == b'\xde\xad\xbe\xef'
+    assert parse_payload('3q2+\n7w==', 'base64') == b'\xde\xad\xbe\xef'
+
+
+def test_decode_escapes_keeps_unicode():
+    """Test that escapes become raw bytes and other text, non-ASCII included, UTF-8"""
+    assert decode_escapes('café\\n') == 'café\n'.encode('utf-8')
+    assert decode_escapes('a\\tb\\r\\n\\x41\\0') == b'a\tb\r\nA\0'
+    assert decode_escapes('\\\\n stays, \\q too') == b'\\n stays, \\q too'
+    assert decode_escapes('{seq}\\n') == b'{seq}\n'
+
+
+def test_decode_escapes_high_bytes():
+    """Test that \\x escapes above 0x7f are sent as single bytes, not UTF-8 encoded"""
+    assert decode_escapes('\\xff\\x80') == b'\xff\x80'
+    assert decode_escapes('é\\xe9') == b'\xc3\xa9\xe9'
+
+
+def test_parse_payload_rejects_bad_input():
+    """Test that malformed input raises ValueError"""
+    with pytest.raises(ValueError):
+        parse_payload('abc', 'hex')
+    with pytest.raises(ValueError):
+        parse_payload('not base64!', 'base64')
+    with pytest.raises(ValueError):
+        parse_payload('x', 'morse')
+
+
+def test_hexdump():
+    """Test the offset / hex / ASCII layout and truncation"""
+    lines = hexdump(b'GET /\r\n' + bytes(range(16)))
+    assert lines[0] == '00000000  47 45 54 20 2f 0d 0a 00 01 02 03 04 05 06 07 08  |GET /...........|'
+    assert lines[1].startswith('00000010  09 0a 0b 0c 0d 0e 0f')
+    assert lines[1].endswith('|.......|')
+
+    lines = hexdump(bytes(100), max_lines=2)
+    assert len(lines) == 3
+    assert lines[-1] == '... 68 more bytes'
@@ -0,0 +1,111 @@
+import socket
+import time
+
+from src.core.app_logic import AppLogic
+from src.core.pool import ConnectionPool, is_healthy
+
+
+def _listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    return server, server.getsockname()[1]
+
+
+def test_release_and_acquire_enables_keepalive():
+    """Test that a released socket is reused with keep-alive enabled"""
+    server, port = _listener()
+    pool = ConnectionPool()
+    sock = socket.create_connection(('127.0.0.1', port))
+
+    assert pool.release('127.0.0.1', port, sock, {'remote_os': 'Linux/Unix'}) is True
+    assert pool.idle_count() == 1
+
+    reused, metadata = pool.acquire('127.0.0.1', port)
+    assert reused is sock
+    assert metadata['remote_os'] == 'Linux/Unix'
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) == 1
+    assert pool.acquire('127.0.0.1', port) is None
+    assert (pool.hits, pool.misses) == (1, 1)
+
+    sock.close()
+    server.close()
+
+
+def test_dead_connection_is_not_reused():
+    """Test that a connection closed by the peer fails the health check"""
+    server, port = _listener()
+    pool = ConnectionPool()
+    sock = socket.create_connection(('127.0.0.1', port))
+    peer, _ = server.accept()
+    pool.release('127.0.0.1', port, sock)
+
+    peer.close()
+    time.sleep(0.05)  # Let the FIN arrive
+    assert is_healthy(sock) is False
+    assert pool.acquire('127.0.0.1', port) is None
+    server.close()
+
+
+def test_pool_limits():
+    """Test per-target and total idle limits"""
+    server, port = _listener()
+    pool = ConnectionPool(max_idle_per_target=1, max_idle=1)
+    first = socket.create_connection(('127.0.0.1', port))
+    second = socket.create_connection(('127.0.0.1', port))
+    pool.release('127.0.0.1', port, first)
+    pool.release('127.0.0.1', port, second)
+    assert pool.idle_count() == 1
+    assert first.fileno() == -1  # evicted and closed
+
+    pool.clear()
+    assert pool.idle_count() == 0
+    server.close()
+
+
+def test_app_logic_reuses_pooled_connection():
+    """Test that reconnecting to the same target skips the handshake"""
+    server, port = _listener()
+    pool = ConnectionPool()
+    logic = AppLogic(pool=pool)
+
+    first = logic.connect('127.0.0.1', str(port))
+    assert first['status'] == 'connected'
+    assert 'reused' not in first
+    sock = logic.socket
+    logic.disconnect()
+    assert pool.idle_count() == 1
+
+    second = logic.connect('127.0.0.1', str(port))
+    assert second['status'] == 'connected'
+    assert second['reused'] is True
+    assert second['remote_os'] == first['remote_os']
+    assert logic.socket is sock
+
+    logic.disconnect()
+    pool.clear()
+    server.close()
+
+
+def test_broken_stream_is_not_pooled():
+    """Test that a connection whose reader stopped on an error is closed, not pooled"""
+    import threading
+    from src.core.framing import make_framer
+    server, port = _listener()
+    pool = ConnectionPool()
+    logic = AppLogic(pool=pool)
+    assert logic.connect('127.0.0.1', str(port))['status'] == 'connected'
+    peer, _ = server.accept()
+
+    closed = threading.Event()
+    logic.start_receiving(lambda message: None, make_framer('length', max_length=16),
+                          on_closed=lambda reason: closed.set())
+    peer.sendall(b'\xff\xff\xff\xff')  # Oversized frame header: the stream position is lost
+    assert closed.wait(2)
+    sock = logic.socket
+    logic.disconnect()
+    assert pool.idle_count() == 0
+    assert sock.fileno() == -1
+
+    peer.close()
+    server.close()
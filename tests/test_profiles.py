@@ -0,0 +1,203 @@
+import json
+import os
+import socket
+
+import pytest
+
+from src.core import profiles as profiles_module
+from src.core.app_logic import AppLogic
+from src.core.pool import ConnectionPool
+from src.core.profiles import (PROFILES, TCP_USER_TIMEOUT, ConnectionProfile, get_profile,
+                               load_profiles)
+
+
+def _listener(host='127.0.0.1'):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind((host, 0))
+    server.listen(8)
+    return server, server.getsockname()[1]
+
+
+def test_low_latency_profile_tunes_socket():
+    """Test that the low-latency preset sets NODELAY, user timeout and timeouts"""
+    server, port = _listener()
+    logic = AppLogic()
+    result = logic.connect('127.0.0.1', str(port), 'low-latency')
+    assert result['status'] == 'connected'
+    assert result['profile'] == 'low-latency'
+
+    sock = logic.socket
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    assert sock.getsockopt(socket.IPPROTO_TCP, TCP_USER_TIMEOUT) == 3000
+    assert sock.gettimeout() == 2.0
+
+    logic.disconnect()
+    server.close()
+
+
+def test_low_latency_connect_completes_handshake():
+    """Test that "connected" means a finished handshake, not a deferred Fast Open connect"""
+    server, port = _listener()
+    logic = AppLogic()
+    assert logic.connect('127.0.0.1', str(port), 'low-latency')['status'] == 'connected'
+    sock = logic.socket
+    assert sock.getsockopt(socket.IPPROTO_TCP, getattr(socket, 'TCP_FASTOPEN_CONNECT', 30)) == 0
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, 1)[0] == 1  # TCP_ESTABLISHED
+
+    # Server speaks first: its banner arrives without us writing anything
+    conn, _ = server.accept()
+    conn.sendall(b'220 ready\r\n')
+    assert sock.recv(64) == b'220 ready\r\n'
+    conn.close()
+    logic.disconnect()
+    server.close()
+
+    # Nobody listening any more: an error, not a connection
+    result = AppLogic().connect('127.0.0.1', str(port), 'low-latency')
+    assert result['status'] == 'error'
+    with pytest.raises(ValueError):
+        ConnectionProfile.from_dict('tfo', {'fast_open': True})
+
+
+def test_fastopen_first_payload():
+    """Test that a fastopen connect with a first payload delivers it and collects the reply"""
+    import threading
+    server, port = _listener()
+    server.setsockopt(socket.IPPROTO_TCP, getattr(socket, 'TCP_FASTOPEN', 23), 16)
+    received = []
+
+    def echo():
+        for _ in range(2):
+            conn, _ = server.accept()
+            with conn:
+                received.append(conn.recv(64))
+                conn.sendall(received[-1])
+
+    thread = threading.Thread(target=echo, daemon=True)
+    thread.start()
+    logic = AppLogic()
+    for _ in range(2):  # The second connect may carry the payload in the SYN
+        result = logic.connect('127.0.0.1', str(port), 'low-latency', first_payload=b'hello')
+        assert result['status'] == 'connected'
+        assert result['send']['status'] == 'success'
+        assert result['send']['bytes_sent'] == 5
+        assert result['send']['response'] == b'hello'
+        logic.disconnect()
+    thread.join(timeout=2)
+    assert received == [b'hello', b'hello']
+    server.close()
+
+    result = AppLogic().connect('127.0.0.1', str(port), 'low-latency', first_payload=b'hello')
+    assert result['status'] == 'error'
+    assert 'send' not in result
+    assert ConnectionProfile.from_dict('tfo', {'fastopen': True}).fastopen is True
+
+
+def test_bulk_profile_enlarges_buffers():
+    """Test that the bulk preset asks for larger socket buffers than the default"""
+    server, port = _listener()
+    sizes = {}
+    for name in ('default', 'bulk'):
+        logic = AppLogic()
+        assert logic.connect('127.0.0.1', str(port), name)['status'] == 'connected'
+        sizes[name] = logic.socket.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        logic.disconnect()
+    assert sizes['bulk'] > sizes['default']
+    server.close()
+
+
+def test_bind_address_sets_source():
+    """Test that bind_address pins the source IP and the address family"""
+    server, port = _listener()
+    profile = ConnectionProfile('pinned', bind_address='127.0.0.2')
+    logic = AppLogic(profile=profile)
+    assert logic.connect('127.0.0.1', str(port))['status'] == 'connected'
+    accepted, peer = server.accept()
+    assert peer[0] == '127.0.0.2'
+    accepted.close()
+    logic.disconnect()
+
+    v6_only = ConnectionProfile('v6', bind_address='::1')
+    result = logic.connect('127.0.0.1', str(port), v6_only)
+    assert result['status'] == 'error'
+    assert 'bind address' in result['message']
+    server.close()
+
+
+def test_pool_keeps_profiles_apart():
+    """Test that a pooled connection is only reused with the profile it was made with"""
+    server, port = _listener()
+    pool = ConnectionPool()
+    logic = AppLogic(pool=pool)
+
+    assert logic.connect('127.0.0.1', str(port), 'bulk')['status'] == 'connected'
+    logic.disconnect()
+    other = logic.connect('127.0.0.1', str(port), 'low-latency')
+    assert 'reused' not in other
+    logic.disconnect()
+    again = logic.connect('127.0.0.1', str(port), 'bulk')
+    assert again['reused'] is True
+    assert logic.socket.gettimeout() == PROFILES['bulk'].read_timeout
+
+    logic.disconnect()
+    pool.clear()
+    server.close()
+
+
+def test_profiles_file(tmp_path):
+    """Test that profiles.json adds and overrides profiles and is validated"""
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({
+        'plc': {'description': 'Modbus', 'nodelay': True, 'read_timeout': 0.5},
+        'bulk': {'rcvbuf': 1 << 20},
+    }))
+    profiles = load_profiles(str(path))
+    assert list(profiles)[:3] == ['default', 'low-latency', 'bulk']
+    assert profiles['plc'].nodelay and profiles['plc'].response_wait == 0.5
+    assert profiles['bulk'].rcvbuf == 1 << 20 and profiles['bulk'].sndbuf is None
+    assert get_profile('plc', str(path)) is not None
+    assert load_profiles(str(tmp_path / 'missing.json')).keys() == PROFILES.keys()
+
+    path.write_text(json.dumps({'bad': {'no_such_option': 1}}))
+    with pytest.raises(ValueError):
+        load_profiles(str(path))
+    with pytest.raises(ValueError):
+        get_profile('nonexistent', str(tmp_path / 'missing.json'))
+
+
+def test_profiles_file_cached_until_changed(tmp_path, monkeypatch):
+    """Test that profiles.json is parsed once per version, not on every lookup"""
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({'plc': {'read_timeout': 0.5}}))
+    first = get_profile('plc', str(path))
+    assert get_profile('plc', str(path)) is first
+
+    reads = []
+    monkeypatch.setattr(profiles_module, '_read_profiles',
+                        lambda p: reads.append(p) or dict(PROFILES))
+    get_profile('plc', str(path))
+    assert reads == []
+    path.write_text(json.dumps({'plc': {'read_timeout': 0.25}}))
+    os.utime(path, ns=(1, 1))  # A new version even on coarse mtime file systems
+    load_profiles(str(path))
+    assert reads == [str(path)]
+
+
+def test_default_profile_override(tmp_path, monkeypatch):
+    """Test that AppLogic starts with the user's 'default' profile from profiles.json"""
+    monkeypatch.setenv('XDG_CONFIG_HOME', str(tmp_path))
+    (tmp_path / 'linxtap').mkdir()
+    path = tmp_path / 'linxtap' / 'profiles.json'
+    path.write_text(json.dumps({'default': {'read_timeout': 7.0}}))
+    assert AppLogic().profile.read_timeout == 7.0
+
+    # A broken file does not stop AppLogic from starting
+    path.write_text('{not json')
+    assert AppLogic().profile is PROFILES['default']
+
+
+def test_connect_unknown_profile():
+    """Test that an unknown profile name is reported, not raised"""
+    result = AppLogic().connect('127.0.0.1', '9', 'nonexistent')
+    assert result['status'] == 'error'
+    assert 'nonexistent' in result['message']
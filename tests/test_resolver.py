@@ -0,0 +1,135 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from src.utils import resolver as resolver_module
+from src.utils.resolver import Resolver, interleave_families
+
+
+class _FakeDns:
+    """Stands in for socket.getaddrinfo, counting name lookups"""
+
+    def __init__(self, answers, delay=0.0):
+        self.answers = answers
+        self.delay = delay
+        self.calls = 0
+        self.real = socket.getaddrinfo
+
+    def __call__(self, host, port, family=0, type=0, proto=0, flags=0):
+        if flags & socket.AI_NUMERICHOST:
+            return self.real(host, port, family, type, proto, flags)
+        self.calls += 1
+        time.sleep(self.delay)
+        answer = self.answers.get(host)
+        if isinstance(answer, int):
+            raise socket.gaierror(answer, 'fake failure')
+        return [(fam, socket.SOCK_STREAM, 6, '', (addr, port) if fam == socket.AF_INET
+                 else (addr, port, 0, 0)) for fam, addr in answer]
+
+
+@pytest.fixture
+def dns(monkeypatch):
+    fake = _FakeDns({
+        'dual.test': [(socket.AF_INET6, 'fd00::10'), (socket.AF_INET6, 'fd00::11'),
+                      (socket.AF_INET, '192.0.2.10')],
+        'missing.test': socket.EAI_NONAME,
+        'flaky.test': socket.EAI_AGAIN,
+    })
+    monkeypatch.setattr(resolver_module.socket, 'getaddrinfo', fake)
+    return fake
+
+
+def test_numeric_hosts_skip_dns(dns):
+    """Test that IP literals are answered without a lookup or cache entry"""
+    resolver = Resolver()
+    assert resolver.resolve('127.0.0.1', 80) == [(socket.AF_INET, ('127.0.0.1', 80))]
+    assert resolver.resolve('::1', 80)[0][0] == socket.AF_INET6
+    assert dns.calls == 0 and resolver.misses == 0
+    resolver.shutdown()
+
+
+def test_answers_are_cached_and_interleaved(dns):
+    """Test that a name is looked up once and families alternate"""
+    resolver = Resolver()
+    first = resolver.resolve('dual.test', 443)
+    assert [addr[1][0] for addr in first] == ['fd00::10', '192.0.2.10', 'fd00::11']
+    assert all(addr[1][1] == 443 for addr in first)
+
+    second = resolver.resolve('DUAL.test', 8080)
+    assert [addr[1][1] for addr in second] == [8080] * 3
+    assert dns.calls == 1
+    assert resolver.hits == 1 and resolver.misses == 1
+    assert resolver.cached('dual.test', 22)[0][1][:2] == ('fd00::10', 22)
+    resolver.shutdown()
+
+
+def test_ttl_expiry_and_invalidate(dns):
+    """Test that answers expire after the TTL and can be dropped early"""
+    resolver = Resolver(ttl=0.05)
+    resolver.resolve('dual.test', 80)
+    time.sleep(0.1)
+    assert resolver.cached('dual.test') is None
+    resolver.resolve('dual.test', 80)
+    assert dns.calls == 2
+
+    resolver.ttl = 60
+    resolver.invalidate()
+    resolver.resolve('dual.test', 80)
+    resolver.resolve('dual.test', 80)
+    assert dns.calls == 3
+    resolver.invalidate('dual.test')
+    resolver.resolve('dual.test', 80)
+    assert dns.calls == 4
+    resolver.shutdown()
+
+
+def test_negative_caching(dns):
+    """Test that unknown names are cached as failures but temporary errors are not"""
+    resolver = Resolver()
+    for _ in range(3):
+        with pytest.raises(socket.gaierror):
+            resolver.resolve('missing.test', 80)
+    assert dns.calls == 1
+    with pytest.raises(socket.gaierror):
+        resolver.cached('missing.test')
+
+    for _ in range(2):
+        with pytest.raises(socket.gaierror):
+            resolver.resolve('flaky.test', 80)
+    assert dns.calls == 3
+    resolver.shutdown()
+
+
+def test_concurrent_lookups_share_one_query(dns):
+    """Test that simultaneous requests for a name wait on the same lookup"""
+    dns.delay = 0.1
+    resolver = Resolver()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve('dual.test', 80)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8
+    assert dns.calls == 1
+    resolver.shutdown()
+
+
+def test_lookup_timeout(dns):
+    """Test that a slow resolver surfaces as EAI_AGAIN"""
+    dns.delay = 0.3
+    resolver = Resolver()
+    with pytest.raises(socket.gaierror) as exc:
+        resolver.resolve('dual.test', 80, timeout=0.05)
+    assert exc.value.errno == socket.EAI_AGAIN
+    resolver.shutdown()
+
+
+def test_interleave_families():
+    """Test family alternation and duplicate removal"""
+    v4 = (socket.AF_INET, ('192.0.2.1', 80))
+    v6 = (socket.AF_INET6, ('fd00::1', 80, 0, 0))
+    assert interleave_families([v4, v4, v6]) == [v4, v6]
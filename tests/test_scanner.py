@@ -0,0 +1,108 @@
+import socket
+
+import pytest
+
+from src.core.scanner import PortScanner, expand_targets, parse_ports
+
+
+def test_parse_ports():
+    """Test port list and range parsing"""
+    assert parse_ports("22") == [22]
+    assert parse_ports("80,22,8000-8002") == [22, 80, 8000, 8001, 8002]
+    assert parse_ports("22,22") == [22]
+
+    with pytest.raises(ValueError):
+        parse_ports("0")
+    with pytest.raises(ValueError):
+        parse_ports("100-90")
+    with pytest.raises(ValueError):
+        parse_ports("abc")
+
+
+def test_expand_targets():
+    """Test IP and CIDR expansion"""
+    assert list(expand_targets("10.0.0.1")) == ["10.0.0.1"]
+    assert list(expand_targets("10.0.0.0/30")) == ["10.0.0.1", "10.0.0.2"]
+    assert len(list(expand_targets(["10.0.0.0/24", "10.0.1.5"]))) == 255
+
+    with pytest.raises(ValueError):
+        expand_targets("10.0.0.300")
+
+
+def test_scan_open_and_closed_ports():
+    """Test that results are classified per port"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    open_port = server.getsockname()[1]
+
+    # Grab a free port and release it so it is (very likely) closed
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    probe.bind(("127.0.0.1", 0))
+    closed_port = probe.getsockname()[1]
+    probe.close()
+
+    streamed = []
+    results = PortScanner(concurrency=4, timeout=2.0).run(
+        "127.0.0.1", f"{open_port},{closed_port}", callback=streamed.append)
+    server.close()
+
+    assert streamed == results
+    by_port = {r['port']: r for r in results}
+    assert by_port[open_port]['status'] == 'open'
+    assert by_port[open_port]['remote_os'].startswith('Linux')
+    assert by_port[open_port]['rtt_ms'] is not None
+    assert by_port[open_port]['is_gateway'] is False
+    assert by_port[closed_port]['status'] == 'closed'
+
+
+def test_scan_many_targets():
+    """Test scanning more jobs than the concurrency limit"""
+    results = PortScanner(concurrency=8, timeout=1.0).run("127.0.0.0/28", "1")
+    assert len(results) == 14
+    assert {r['status'] for r in results} <= {'closed', 'filtered', 'error'}
+
+
+def test_per_host_rate_limit():
+    """Test that per-host rate limiting spaces out attempts to one host"""
+    import time
+    start = time.monotonic()
+    PortScanner(concurrency=8, per_host_rate=20).run("127.0.0.1", "1-5")
+    # 5 attempts at 20/s need at least 4 intervals of 50ms
+    assert time.monotonic() - start >= 0.19
+
+
+def test_rate_limit_does_not_slow_other_hosts():
+    """Test that one host's rate limit does not hold back another host's ports"""
+    import time
+    start = time.monotonic()
+    first_seen = {}
+
+    def record(result):
+        first_seen.setdefault(result['ip'], time.monotonic() - start)
+
+    results = PortScanner(concurrency=10, timeout=1.0, per_host_rate=20).run(
+        "127.0.0.1,127.0.0.2", "1-10", callback=record)
+    elapsed = time.monotonic() - start
+    assert len(results) == 20
+    # Both hosts start at once and run side by side: ~9 intervals, not ~19
+    assert first_seen['127.0.0.2'] < 0.2
+    assert elapsed < 0.8
+
+
+def test_socket_errors_become_results(monkeypatch):
+    """Test that failing to create a socket (e.g. EMFILE) yields an 'error' result"""
+    import asyncio
+
+    def no_sockets(*args, **kwargs):
+        raise OSError(24, 'Too many open files')
+
+    async def scenario():
+        # Patched only inside the running loop, which already has its sockets
+        with monkeypatch.context() as patch:
+            patch.setattr(socket, 'socket', no_sockets)
+            return await PortScanner().probe("127.0.0.1", 1)
+
+    result = asyncio.run(scenario())
+    assert result['status'] == 'error'
+    assert 'Too many open files' in result['message']
@@ -0,0 +1,228 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from src.core.framing import LengthPrefixFramer, NewlineFramer
+from src.core.session_manager import SessionManager
+
+
+class _EchoServer:
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(64)
+        self.port = self.sock.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._echo, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _echo(conn):
+        with conn:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    return
+                conn.sendall(data)
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+        self.cond = threading.Condition()
+
+    def __call__(self, event, session_id, payload):
+        with self.cond:
+            self.events.append((event, session_id, payload))
+            self.cond.notify_all()
+
+    def wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while not predicate(self.events):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+
+def test_open_session_validation():
+    """Test that invalid targets are rejected with AppLogic's error dicts"""
+    manager = SessionManager()
+    result = manager.open_session("", "")
+    assert result['status'] == 'error'
+    assert manager.send("missing", "x")['status'] == 'error'
+    manager.shutdown()
+
+
+def test_many_sessions_one_loop():
+    """Test a dozen concurrent sessions with independent state and counters"""
+    server = _EchoServer()
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+
+    ids = [manager.open_session('127.0.0.1', str(server.port), NewlineFramer())['session_id']
+           for _ in range(12)]
+    assert recorder.wait_for(lambda ev: sum(e[0] == 'connected' for e in ev) == 12)
+
+    for i, session_id in enumerate(ids):
+        assert manager.send(session_id, f'hello {i}\n')['status'] == 'queued'
+    assert recorder.wait_for(lambda ev: sum(e[0] == 'message' for e in ev) == 12)
+
+    messages = {sid: payload for event, sid, payload in recorder.events if event == 'message'}
+    for i, session_id in enumerate(ids):
+        assert messages[session_id] == f'hello {i}'.encode()
+        info = manager.get(session_id)
+        assert info['state'] == 'connected'
+        assert info['remote_os'].startswith('Linux')
+        assert info['bytes_out'] == info['bytes_in'] == len(f'hello {i}\n')
+        assert info['messages_in'] == 1
+
+    # All sessions share the manager's single loop thread
+    assert sum(1 for t in threading.enumerate() if t.name == 'linxtap-sessions') == 1
+
+    manager.close_session(ids[0])
+    assert recorder.wait_for(lambda ev: any(e[0] == 'closed' and e[1] == ids[0] for e in ev))
+    assert manager.get(ids[0]) is None
+    assert len(manager.list_sessions()) == 11
+
+    manager.shutdown()
+    server.sock.close()
+
+
+def test_refused_session_reports_error():
+    """Test that a refused connect is reported as an error event"""
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+    session_id = manager.open_session('127.0.0.1', '54321')['session_id']
+    assert recorder.wait_for(lambda ev: any(e[0] == 'error' for e in ev))
+    info = manager.get(session_id)
+    assert info['state'] == 'error'
+    assert 'refused' in info['last_error'].lower()
+    manager.shutdown()
+
+
+def test_failing_command_keeps_loop_running():
+    """Test that an exception in a queued command does not stop the loop thread"""
+    server = _EchoServer()
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+
+    def broken():
+        raise RuntimeError('boom')
+
+    manager._call(broken)
+    session_id = manager.open_session('127.0.0.1', str(server.port))['session_id']
+    assert recorder.wait_for(lambda ev: any(e[0] == 'connected' for e in ev))
+    assert manager.get(session_id)['state'] == 'connected'
+    manager.shutdown()
+    server.sock.close()
+
+
+def test_bad_frame_closes_only_its_session():
+    """Test that a framing error closes that session and the others keep working"""
+    server = _EchoServer()
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+    bad = manager.open_session('127.0.0.1', str(server.port), LengthPrefixFramer())['session_id']
+    good = manager.open_session('127.0.0.1', str(server.port), NewlineFramer())['session_id']
+    assert recorder.wait_for(lambda ev: sum(e[0] == 'connected' for e in ev) == 2)
+
+    # Echoed back, the 4 GiB length prefix is over the framer's limit
+    manager.send(bad, b'\xff\xff\xff\xff')
+    assert recorder.wait_for(lambda ev: any(e[0] == 'closed' and e[1] == bad for e in ev))
+    assert manager.get(bad)['state'] == 'closed'
+
+    manager.send(good, 'still here\n')
+    assert recorder.wait_for(lambda ev: ('message', good, b'still here') in ev)
+    assert manager.get(good)['state'] == 'connected'
+    manager.shutdown()
+    server.sock.close()
+
+
+def test_ipv6_session():
+    """Test that sessions connect to IPv6 addresses"""
+    try:
+        server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        server.bind(('::1', 0))
+    except OSError:
+        pytest.skip('IPv6 loopback not available')
+    server.listen(1)
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+    session_id = manager.open_session('::1', str(server.getsockname()[1]))['session_id']
+    assert recorder.wait_for(lambda ev: any(e[0] == 'connected' for e in ev))
+    assert manager.get(session_id)['state'] == 'connected'
+    manager.shutdown()
+    server.close()
+
+
+class _FixedResolver:
+    """Stands in for the shared resolver: every host resolves to addresses"""
+
+    def __init__(self, addresses):
+        self.addresses = addresses
+
+    def resolve_async(self, host, port=0, family=socket.AF_UNSPEC):
+        from concurrent.futures import Future
+        future = Future()
+        future.set_result(list(self.addresses))
+        return future
+
+
+def test_session_races_past_blackholed_address(monkeypatch):
+    """Test that a silent first address does not use up the deadline for the next one"""
+    blackhole = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    blackhole.bind(('127.0.0.1', 0))
+    blackhole.listen(0)
+    # Fill the accept queue: further SYNs to it go unanswered
+    filler = socket.create_connection(blackhole.getsockname())
+    server = _EchoServer()
+    monkeypatch.setattr('src.core.session_manager.get_resolver', lambda: _FixedResolver([
+        (socket.AF_INET, blackhole.getsockname()),
+        (socket.AF_INET, ('127.0.0.1', server.port)),
+    ]))
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder, connect_timeout=1.0)
+    session_id = manager.open_session('dual.example', str(server.port))['session_id']
+    assert recorder.wait_for(lambda ev: any(e[0] in ('connected', 'error') for e in ev))
+    info = manager.get(session_id)
+    assert info['state'] == 'connected'
+    manager.shutdown()
+    filler.close()
+    blackhole.close()
+    server.sock.close()
+
+
+def test_session_survives_socket_failure(monkeypatch):
+    """Test that a family whose socket cannot be created falls through to the next address"""
+    import errno
+    server = _EchoServer()
+    recorder = _Recorder()
+    manager = SessionManager(on_event=recorder)
+    real_socket = socket.socket
+
+    def no_ipv6(family=socket.AF_INET, *args, **kwargs):
+        if family == socket.AF_INET6:
+            raise OSError(errno.EAFNOSUPPORT, 'Address family not supported by protocol')
+        return real_socket(family, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'socket', no_ipv6)
+    monkeypatch.setattr('src.core.session_manager.get_resolver', lambda: _FixedResolver([
+        (socket.AF_INET6, ('::1', server.port, 0, 0)),
+        (socket.AF_INET, ('127.0.0.1', server.port)),
+    ]))
+    session_id = manager.open_session('dual.example', str(server.port))['session_id']
+    assert recorder.wait_for(lambda ev: any(e[0] in ('connected', 'error') for e in ev))
+    assert manager.get(session_id)['state'] == 'connected'
+    manager.shutdown()
+    server.sock.close()
@@ -0,0 +1,137 @@
+import socket
+import struct
+
+import pytest
+
+from src.utils import traceroute as traceroute_module
+from src.utils.icmp import icmp_checksum
+from src.utils.traceroute import (_echo_request, _Prober, _quoted_packet, _summarize,
+                                  _udp_payload, classify_icmp, traceroute)
+
+
+def _trace_or_skip(*args, **kwargs):
+    result = traceroute(*args, **kwargs)
+    if result['status'] == 'error' and 'CAP_NET_RAW' in result['message']:
+        pytest.skip('raw sockets not permitted')
+    return result
+
+
+def test_udp_trace_localhost():
+    """Test that a UDP trace to localhost is answered at hop 1 by port unreachable"""
+    result = traceroute('127.0.0.1', 'udp', probes=3, timeout=2.0)
+    assert result['status'] == 'complete'
+    assert result['reached'] and result['hop_count'] == 1
+    hop = result['hops'][0]
+    assert hop['addresses'] == ['127.0.0.1'] and hop['kind'] == 'destination'
+    assert hop['received'] == 3 and hop['loss'] == 0.0
+    assert all(rtt is not None for rtt in hop['rtt_ms'])
+    # Done as soon as everything up to the destination answered, not at the timeout
+    assert result['elapsed_ms'] < 1000
+
+
+def test_icmp_trace_localhost():
+    """Test that an ICMP trace matches echo replies back to their probes"""
+    result = _trace_or_skip('127.0.0.1', 'icmp', max_hops=5, probes=2, timeout=2.0)
+    assert result['reached'] and result['hop_count'] == 1
+    assert result['hops'][0]['received'] == 2
+
+
+def test_tcp_trace_open_and_closed():
+    """Test that a TCP trace ends at a SYN-ACK from an open port and a RST from a closed one"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    port = server.getsockname()[1]
+    result = _trace_or_skip('127.0.0.1', 'tcp', port=port, max_hops=5, probes=2)
+    assert result['reached'] and result['hops'][0]['received'] == 2
+    server.close()
+
+    result = _trace_or_skip('127.0.0.1', 'tcp', port=port, max_hops=5, probes=2)
+    assert result['reached'] and result['hop_count'] == 1
+
+
+def test_echo_checksum_constant():
+    """Test that echo probes keep one checksum whatever their sequence number (same flow)"""
+    checksums = set()
+    for seq in (1, 2, 300, 0xFFFF):
+        packet = _echo_request(socket.AF_INET, 0x4242, seq)
+        assert icmp_checksum(packet) == 0
+        assert struct.unpack('!H', packet[6:8])[0] == seq
+        checksums.add(packet[2:4])
+    assert len(checksums) == 1
+
+
+def test_udp_checksum_constant():
+    """Test that UDP probes keep one length and checksum whatever their sequence number"""
+    payloads = [_udp_payload(seq) for seq in (1, 2, 300, 0xFFFF)]
+    assert len({len(payload) for payload in payloads}) == 1
+    # Same payload sum (and so the same UDP checksum), different payloads
+    assert len({icmp_checksum(payload) for payload in payloads}) == 1
+    assert len(set(payloads)) == len(payloads)
+    assert struct.unpack('!H', payloads[2][4:6])[0] == 300
+
+
+def test_classify_and_quoted_packet():
+    """Test ICMP error classification and parsing of the quoted probe"""
+    assert classify_icmp(socket.AF_INET, 11, 0) == 'hop'
+    assert classify_icmp(socket.AF_INET, 3, 3) == 'destination'
+    assert classify_icmp(socket.AF_INET, 3, 1) == 'unreachable'
+    assert classify_icmp(socket.AF_INET6, 3, 0) == 'hop'
+    assert classify_icmp(socket.AF_INET6, 1, 4) == 'destination'
+    assert classify_icmp(socket.AF_INET, 0, 0) is None
+
+    inner_ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 28, 0, 0, 1, socket.IPPROTO_TCP, 0,
+                           socket.inet_aton('10.0.0.1'), socket.inet_aton('192.0.2.7'))
+    inner_tcp = struct.pack('!HHI', 40000, 443, 12345)
+    icmp = struct.pack('!BBHI', 11, 0, 0, 0) + inner_ip + inner_tcp
+    proto, destination, header = _quoted_packet(socket.AF_INET, icmp)
+    assert (proto, destination) == (socket.IPPROTO_TCP, '192.0.2.7')
+    assert struct.unpack('!HHI', header[:8]) == (40000, 443, 12345)
+    assert _quoted_packet(socket.AF_INET, icmp[:20]) is None
+
+
+def test_summary_prunes_and_marks_path():
+    """Test that hops past the destination or the last reply are dropped"""
+    sent = {seq: ((seq - 1) // 2 + 1, 0.0) for seq in range(1, 21)}  # 10 hops x 2 probes
+    answers = {
+        1: ('hop', '10.0.0.1', 1.0), 2: ('hop', '10.0.0.1', 1.2),
+        5: ('hop', '10.0.0.3', 3.0),
+        7: ('destination', '10.0.0.9', 4.0), 9: ('destination', '10.0.0.9', 4.1),
+    }
+    result = _summarize(socket.AF_INET, sent, answers, 1, 2)
+    assert result['reached'] and result['hop_count'] == 4
+    assert [hop['addresses'] for hop in result['hops']] == [
+        ['10.0.0.1'], [], ['10.0.0.3'], ['10.0.0.9']]
+    assert result['hops'][1]['kind'] is None and result['hops'][1]['loss'] == 1.0
+    assert result['hops'][2]['rtt_ms'] == [3.0, None]
+
+    unanswered_tail = {1: ('hop', '10.0.0.1', 1.0)}
+    result = _summarize(socket.AF_INET, sent, unanswered_tail, 1, 2)
+    assert not result['reached'] and len(result['hops']) == 1
+
+    unreachable = {3: ('unreachable', '10.0.0.2', 2.0)}
+    result = _summarize(socket.AF_INET, sent, unreachable, 1, 2)
+    assert not result['reached'] and result['hops'][-1]['kind'] == 'unreachable'
+
+
+class _FailingResolver:
+    def resolve(self, host, port):
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+
+def test_invalid_arguments(monkeypatch):
+    """Test that bad protocols, hop counts and ports are rejected"""
+    with pytest.raises(ValueError):
+        traceroute('127.0.0.1', 'sctp')
+    with pytest.raises(ValueError):
+        traceroute('127.0.0.1', max_hops=0)
+    with pytest.raises(ValueError):
+        traceroute('127.0.0.1', first_ttl=5, max_hops=4)
+    with pytest.raises(ValueError):
+        traceroute('127.0.0.1', 'tcp', port=0)
+    # Resolution failures are results, not exceptions (no real DNS lookup here)
+    monkeypatch.setattr(traceroute_module, 'get_resolver', _FailingResolver)
+    result = traceroute('no.such.host.invalid')
+    assert result['status'] == 'error' and 'no.such.host.invalid' in result['message']
+    with pytest.raises(TypeError):
+        _Prober(socket.AF_INET, '127.0.0.1', 33434)
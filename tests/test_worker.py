@@ -0,0 +1,117 @@
+import socket
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, Qt, QTimer
+from src.core.app_logic import AppLogic
+from src.core.framing import make_framer
+from src.core.worker import LogicExecutor
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    yield app
+
+
+def _wait_for_result(executor, start=None, timeout_ms=10000):
+    """
+    Spin a local event loop until the executor reports one result.
+    start() (if given) submits the job once the listener is connected.
+    """
+    results = []
+    loop = QEventLoop()
+
+    def on_finished(name, args, result):
+        results.append((name, args, result))
+        loop.quit()
+
+    # Queued: results emitted from another thread still arrive inside loop.exec()
+    executor.job_finished.connect(on_finished, Qt.QueuedConnection)
+    if start:
+        start()
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    executor.job_finished.disconnect(on_finished)
+    return results
+
+
+def test_connect_job_reports_through_signal(qapp):
+    """Test that a connect job runs off-thread and returns its result dict"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    logic = AppLogic()
+    executor = LogicExecutor(logic)
+    executor.submit_connect("127.0.0.1", str(port))
+    assert executor.is_busy()
+
+    results = _wait_for_result(executor)
+    assert len(results) == 1
+    name, args, result = results[0]
+    assert name == 'connect'
+    assert args == ("127.0.0.1", str(port))
+    assert result['status'] == 'connected'
+    assert not executor.is_busy()
+
+    executor.submit_disconnect()
+    name, _, result = _wait_for_result(executor)[0]
+    assert name == 'disconnect'
+    assert result['status'] == 'disconnected'
+
+    executor.shutdown()
+    server.close()
+
+
+def test_start_receiving_job(qapp):
+    """Test that (re)starting the reader runs as a job on the worker thread"""
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    port = server.getsockname()[1]
+
+    logic = AppLogic()
+    executor = LogicExecutor(logic)
+    executor.submit_start_receiving(lambda message: None, make_framer('newline'))
+    name, _, result = _wait_for_result(executor)[0]
+    assert name == 'receive' and result['status'] == 'error'
+
+    executor.submit_connect("127.0.0.1", str(port))
+    _wait_for_result(executor)
+    executor.submit_start_receiving(lambda message: None, make_framer('newline'))
+    name, _, result = _wait_for_result(executor)[0]
+    assert result['status'] == 'receiving'
+    assert logic.receiver is not None and logic.receiver.framer.name == 'newline'
+
+    executor.submit_disconnect()
+    _wait_for_result(executor)
+    executor.shutdown()
+    server.close()
+
+
+def test_invalid_input_job(qapp):
+    """Test that validation errors are delivered like any other result"""
+    executor = LogicExecutor(AppLogic())
+    executor.submit_connect("", "")
+    name, _, result = _wait_for_result(executor)[0]
+    assert name == 'connect'
+    assert result['status'] == 'error'
+    executor.shutdown()
+
+
+def test_async_bridge_delivers_results(qapp):
+    """Test that coroutine results reach the Qt thread through AsyncBridge"""
+    from src.core.async_engine import AsyncAppLogic
+    from src.core.worker import AsyncBridge
+
+    bridge = AsyncBridge()
+    # The bridge emits from the loop thread: listen before submitting
+    name, args, result = _wait_for_result(
+        bridge, lambda: bridge.submit('connect', AsyncAppLogic().connect, "", ""))[0]
+    assert name == 'connect'
+    assert result['status'] == 'error'
+    bridge.shutdown()